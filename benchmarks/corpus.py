@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic Java projects for benchmarking.
+
+The same parameters and seed always produce byte-identical sources, so
+timings taken on different revisions are comparable.
+"""
+import io
+import os
+import random
+import zipfile
+from typing import Dict
+
+REST_VERBS = ['GET', 'POST', 'PUT', 'DELETE']
+FIELD_TYPES = ['int', 'long', 'String', 'boolean', 'double']
+
+def generate_corpus(files: int = 100, classes_per_file: int = 1, inheritance_depth: int = 3,
+                    interface_fanout: int = 1, rest_density: float = 0.2, soap_density: float = 0.05,
+                    javadoc_density: float = 0.5, methods_per_class: int = 4,
+                    files_per_package: int = 25, seed: int = 0) -> Dict[str, str]:
+    """
+    Generate a Java project as {path: source}.
+
+    One file in ten declares an interface; the rest declare classes_per_file
+    classes each. Classes form inheritance chains of inheritance_depth,
+    implement interface_fanout interfaces and hold fields typed with other
+    generated classes. rest_density, soap_density and javadoc_density are the
+    probabilities that a method is a REST endpoint, a SOAP operation or
+    documented.
+    """
+    classes_per_file = max(1, classes_per_file)
+    rng = random.Random(seed)
+    interface_files = max(1, files // 10) if files > 1 else 0
+    class_files = files - interface_files
+
+    def package_of(file_index):
+        return f"com.bench.p{file_index // files_per_package}"
+
+    interfaces = [(package_of(index), f"Service{index}") for index in range(interface_files)]
+    classes = [(package_of(interface_files + file_index), f"Type{file_index}_{class_index}")
+               for file_index in range(class_files) for class_index in range(classes_per_file)]
+
+    def javadoc(indent, summary, params=(), returns=False):
+        if rng.random() >= javadoc_density:
+            return []
+        lines = [f"{indent}/**", f"{indent} * {summary}"]
+        lines.extend(f"{indent} * @param {param} the {param} value" for param in params)
+        if returns:
+            lines.append(f"{indent} * @return the computed result")
+        lines.append(f"{indent} */")
+        return lines
+
+    corpus = {}
+
+    for index, (package, name) in enumerate(interfaces):
+        lines = [f"package {package};", ""]
+        lines.extend(javadoc("", f"Service contract {index}."))
+        lines.append(f"public interface {name} {{")
+        for method in range(methods_per_class):
+            lines.extend(javadoc("    ", f"Operation {method}.", ['input'], True))
+            lines.append(f"    String op{method}(String input);")
+        lines.append("}")
+        corpus[f"src/{package.replace('.', '/')}/{name}.java"] = '\n'.join(lines) + '\n'
+
+    for file_index in range(class_files):
+        package = package_of(interface_files + file_index)
+        imports = {'java.util.List', 'java.util.ArrayList'}
+        bodies = []
+        for class_index in range(classes_per_file):
+            position = file_index * classes_per_file + class_index
+            _, name = classes[position]
+
+            header = f"class {name}" if class_index else f"public class {name}"
+            if inheritance_depth > 1 and position % inheritance_depth:
+                parent_package, parent = classes[position - 1]
+                header += f" extends {parent}"
+                if parent_package != package:
+                    imports.add(f"{parent_package}.{parent}")
+            implemented = rng.sample(interfaces, min(interface_fanout, len(interfaces)))
+            if implemented:
+                header += " implements " + ', '.join(iface for _, iface in implemented)
+                imports.update(f"{iface_package}.{iface}" for iface_package, iface in implemented
+                               if iface_package != package)
+
+            soap = rng.random() < soap_density
+            lines = []
+            lines.extend(javadoc("", f"Generated type {name}."))
+            if soap:
+                lines.append("@WebService")
+            lines.append(header + " {")
+
+            # A field typed with an earlier class creates an association
+            if position > 0:
+                other_package, other = classes[rng.randrange(position)]
+                if other_package != package:
+                    imports.add(f"{other_package}.{other}")
+                lines.append(f"    private {other} peer;")
+            lines.append(f"    private {rng.choice(FIELD_TYPES)} value;")
+            lines.append("    private List<String> names = new ArrayList<>();")
+
+            lines.append("")
+            for method in range(methods_per_class):
+                lines.extend(javadoc("    ", f"Handles request {method}.", ['input'], True))
+                if rng.random() < rest_density:
+                    lines.append(f"    @{rng.choice(REST_VERBS)}")
+                elif soap:
+                    lines.append("    @WebMethod")
+                lines.append(f"    public String handle{method}(String input) {{")
+                lines.append("        names.add(input);")
+                lines.append(f"        return input.trim() + names.size() + {method};")
+                lines.append("    }")
+                lines.append("")
+
+            # All generated interfaces share the same operations
+            if implemented:
+                for method in range(methods_per_class):
+                    lines.append(f"    public String op{method}(String input) {{ return handle{method}(input); }}")
+
+            lines.append("}")
+            bodies.append('\n'.join(lines))
+
+        header = [f"package {package};", ""]
+        header.extend(f"import {name};" for name in sorted(imports))
+        header.append("")
+        _, primary = classes[file_index * classes_per_file]
+        corpus[f"src/{package.replace('.', '/')}/{primary}.java"] = '\n'.join(header) + '\n' + '\n\n'.join(bodies) + '\n'
+
+    return corpus
+
+class CorpusUpload(io.BytesIO):
+    """
+    In-memory stand-in for a Streamlit UploadedFile
+    """
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+def corpus_to_zip(corpus: Dict[str, str], name: str = 'corpus.zip') -> CorpusUpload:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, source in corpus.items():
+            # Fixed timestamps keep the archive byte-identical across runs
+            archive.writestr(zipfile.ZipInfo(path, date_time=(2020, 1, 1, 0, 0, 0)), source,
+                             compress_type=zipfile.ZIP_DEFLATED)
+    return CorpusUpload(name, buffer.getvalue())
+
+def write_corpus(corpus: Dict[str, str], directory: str):
+    for path, source in corpus.items():
+        target = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(source)
@@ -0,0 +1,187 @@
+"""
+Time and measure each analysis stage over synthetic projects of several sizes.
+
+    python -m benchmarks.run --sizes 100,1000,3000
+    python -m benchmarks.run --update-baseline
+
+Results are compared against benchmarks/baseline.json and the run exits
+with status 1 when a stage is slower or allocates more than the baseline
+allows. Baselines are machine specific; refresh them with --update-baseline
+on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from benchmarks.corpus import generate_corpus, corpus_to_zip
+from utils.file_handler import process_uploaded_files
+from utils.code_parser import parse_java_files, get_worker_count
+from utils.compact_model import COMPACT_MIN_FILES
+from utils.relationship_analyzer import analyze_relationships
+from utils import visualizer
+from components.uml_diagram import build_uml_sources
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = [100, 1000, 3000]
+# Allowed slowdown or memory growth relative to the baseline
+DEFAULT_TOLERANCE = 0.25
+# Timing differences below this many seconds are treated as noise
+MIN_TIME_DELTA = 0.05
+# Memory growth below this many bytes is treated as noise
+MIN_MEMORY_DELTA = 1024 * 1024
+STAGES = ['ingest', 'parse', 'relationships', 'graph', 'uml']
+
+def _measure(run: Callable[[], Any], repeat: int,
+             traced: Optional[Callable[[], Any]] = None) -> Tuple[Any, Dict[str, float]]:
+    """
+    Best wall time over repeat runs, then one traced run for peak Python
+    memory. Tracing slows Python down, so it is kept out of the timed runs.
+    traced replaces run for the memory measurement when given.
+    """
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        (traced or run)()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {'seconds': round(best, 4), 'peak_bytes': peak}
+
+def benchmark_size(files: int, corpus_options: Dict[str, Any], repeat: int,
+                   max_workers: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Time every stage over a generated project with the given number of files
+    """
+    upload = corpus_to_zip(generate_corpus(files, **corpus_options))
+    stages = {}
+
+    processed, stages['ingest'] = _measure(lambda: process_uploaded_files([upload]), repeat)
+
+    # Parser processes are invisible to tracemalloc, so the traced run parses in-process
+    parsed_data, stages['parse'] = _measure(
+        lambda: parse_java_files(processed, max_workers=max_workers, compact_min_files=COMPACT_MIN_FILES),
+        repeat,
+        traced=lambda: parse_java_files(processed, isolate=False, compact_min_files=COMPACT_MIN_FILES)
+    )
+
+    relationships, stages['relationships'] = _measure(lambda: analyze_relationships(parsed_data), repeat)
+
+    def graph():
+        # Measure the cold layout rather than the layout cache
+        visualizer._layout_cache.clear()
+        return visualizer.create_relationship_graph(relationships)
+    _, stages['graph'] = _measure(graph, repeat)
+
+    _, stages['uml'] = _measure(lambda: build_uml_sources(relationships, 4), repeat)
+
+    return stages
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of results against a baseline, as human-readable lines
+    """
+    regressions = []
+    for size, stages in results['sizes'].items():
+        for stage, measured in stages.items():
+            expected = baseline['sizes'].get(size, {}).get(stage)
+            if expected is None:
+                continue
+            slower = measured['seconds'] - expected['seconds']
+            if slower > MIN_TIME_DELTA and measured['seconds'] > expected['seconds'] * (1 + tolerance):
+                regressions.append(f"{stage} @ {size} files: {measured['seconds']:.3f}s "
+                                   f"vs baseline {expected['seconds']:.3f}s")
+            grown = measured['peak_bytes'] - expected['peak_bytes']
+            if grown > MIN_MEMORY_DELTA and measured['peak_bytes'] > expected['peak_bytes'] * (1 + tolerance):
+                regressions.append(f"{stage} @ {size} files: peak {measured['peak_bytes'] / 2**20:.1f} MiB "
+                                   f"vs baseline {expected['peak_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+def _print_table(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    print(f"{'files':>7} {'stage':<14} {'seconds':>9} {'baseline':>9} {'peak MiB':>9} {'baseline':>9}")
+    for size, stages in results['sizes'].items():
+        for stage, measured in stages.items():
+            expected = (baseline or {}).get('sizes', {}).get(size, {}).get(stage)
+            base_seconds = f"{expected['seconds']:.3f}" if expected else '-'
+            base_peak = f"{expected['peak_bytes'] / 2**20:.1f}" if expected else '-'
+            print(f"{size:>7} {stage:<14} {measured['seconds']:>9.3f} {base_seconds:>9} "
+                  f"{measured['peak_bytes'] / 2**20:>9.1f} {base_peak:>9}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline on synthetic Java projects")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated project sizes in files")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage; the best is kept")
+    parser.add_argument('--workers', type=int, help="Number of parser processes")
+    parser.add_argument('--classes-per-file', type=int, default=1)
+    parser.add_argument('--inheritance-depth', type=int, default=3)
+    parser.add_argument('--interface-fanout', type=int, default=1)
+    parser.add_argument('--rest-density', type=float, default=0.2)
+    parser.add_argument('--soap-density', type=float, default=0.05)
+    parser.add_argument('--javadoc-density', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown or memory growth before a stage is flagged")
+    parser.add_argument('-o', '--output', help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    corpus_options = {
+        'classes_per_file': args.classes_per_file,
+        'inheritance_depth': args.inheritance_depth,
+        'interface_fanout': args.interface_fanout,
+        'rest_density': args.rest_density,
+        'soap_density': args.soap_density,
+        'javadoc_density': args.javadoc_density,
+        'seed': args.seed
+    }
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'workers': get_worker_count(args.workers)
+        },
+        'corpus': corpus_options,
+        'sizes': {}
+    }
+    for size in (int(value) for value in args.sizes.split(',') if value.strip()):
+        print(f"Benchmarking {size} files...", file=sys.stderr)
+        results['sizes'][str(size)] = benchmark_size(size, corpus_options, args.repeat, args.workers)
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != corpus_options:
+            print("Baseline was recorded with different corpus options; not comparing", file=sys.stderr)
+            baseline = None
+
+    _print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance) if baseline else []
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 from utils.visualizer import create_relationship_graph
+from utils.graph_aggregation import get_package_aggregate, expand_package, packages_by_size
+from utils.dependency_graph import get_dependency_graph, get_package_dependency_graph
+
+# Graphs with more class nodes than this open in the package view
+PACKAGE_VIEW_THRESHOLD = 200
 
 def show_class_relationships(relationships):
     """
@@ -30,5 +35,64 @@ def show_class_relationships(relationships):
     with col2:
         # Show visualization
         st.subheader("Relationship Graph")
-        fig = create_relationship_graph(relationships)
+        graph = relationships['graph']
+        aggregate = get_package_aggregate(relationships)
+
+        views = ["Packages", "Package classes", "All classes"]
+        default_view = 0 if graph.number_of_nodes() > PACKAGE_VIEW_THRESHOLD else 2
+        view = st.radio("Level of detail", views, index=default_view, horizontal=True,
+                        help="Collapse classes into packages, or expand a single package")
+
+        if view == "Packages":
+            view_graph = aggregate['graph']
+            st.caption(f"{view_graph.number_of_nodes()} packages, edge weights count class relationships")
+        elif view == "Package classes":
+            package = st.selectbox("Package", packages_by_size(aggregate))
+            view_graph = expand_package(graph, aggregate, package) if package else aggregate['graph']
+        else:
+            view_graph = graph
+
+        fig = create_relationship_graph({'graph': view_graph})
         st.plotly_chart(fig, use_container_width=True)
+
+    show_dependency_analysis(relationships)
+
+def show_dependency_analysis(relationships):
+    """
+    Package cycles and the most depended-on and most dependent classes,
+    over inheritance, implementation and import/API dependencies
+    """
+    with st.expander("Dependency analysis"):
+        dependency_graph = get_dependency_graph(relationships)
+        package_cycles = get_package_dependency_graph(relationships).cycles()
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Dependency Edges", dependency_graph.edge_count)
+        with col2:
+            st.metric("Package Cycles", len(package_cycles))
+        with col3:
+            depths = dependency_graph.depths()
+            st.metric("Max Dependency Depth", int(depths.max()) if len(depths) else 0)
+
+        if package_cycles:
+            st.subheader("Package Cycles")
+            st.dataframe(pd.DataFrame([{
+                "Packages": len(cycle),
+                "Members": ', '.join(cycle)
+            } for cycle in package_cycles]), hide_index=True)
+
+        metrics = dependency_graph.metrics()
+        nodes = pd.DataFrame({
+            "Class": dependency_graph.names,
+            "Fan-in": metrics['fan_in'],
+            "Fan-out": metrics['fan_out'],
+            "Depth": metrics['depth']
+        })
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Most Depended On")
+            st.dataframe(nodes.nlargest(10, "Fan-in"), hide_index=True)
+        with col2:
+            st.subheader("Most Dependencies")
+            st.dataframe(nodes.nlargest(10, "Fan-out"), hide_index=True)
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from utils.doc_analyzer import extract_documentation, analyze_code_quality
-from typing import Dict
+from typing import Dict, Optional
+from utils.view_cache import memoize
+from components.pagination import filter_items, paginate, search_box
 
 def show_documentation_quality(quality_metrics: Dict):
     """
@@ -48,15 +50,16 @@ def format_javadoc(javadoc: Dict) -> str:
 
     return "\n".join(formatted)
 
-def show_code_documentation(parsed_data: Dict):
+def show_code_documentation(parsed_data: Dict, cache: Optional[Dict] = None):
     """
-    Display code documentation in an organized format
+    Display code documentation in an organized format.
+    cache memoizes the extracted documentation per analysis.
     """
     st.header("Code Documentation")
 
     # Extract and analyze documentation
-    documentation = extract_documentation(parsed_data)
-    quality_metrics = analyze_code_quality(documentation)
+    documentation = memoize(cache, 'documentation', lambda: extract_documentation(parsed_data))
+    quality_metrics = memoize(cache, 'documentation_quality', lambda: analyze_code_quality(documentation))
 
     # Show quality metrics
     show_documentation_quality(quality_metrics)
@@ -66,17 +69,25 @@ def show_code_documentation(parsed_data: Dict):
 
     with package_tab:
         st.subheader("Package Documentation")
-        if documentation['packages']:
-            for package in documentation['packages']:
+        query = search_box("doc_packages", "Filter packages by name")
+        packages = filter_items(documentation['packages'], query, lambda package: package['name'])
+        page_packages, _ = paginate(packages, "doc_packages")
+        if page_packages:
+            for package in page_packages:
                 with st.expander(f"📦 {package['name']}"):
                     st.write(f"**Files:** {', '.join(package['files'])}")
                     st.write(f"**Description:** {package['description']}")
 
     with class_tab:
         st.subheader("Class Documentation")
-        if documentation['classes']:
-            for class_doc in documentation['classes']:
+        query = search_box("doc_classes", "Filter by class, package or file")
+        classes = filter_items(documentation['classes'], query,
+                               lambda doc: f"{doc['package']}.{doc['name']} {doc['file']}")
+        page_classes, _ = paginate(classes, "doc_classes")
+        if page_classes:
+            for class_doc in page_classes:
                 with st.expander(f"🔷 {class_doc['name']}"):
+                    st.write(f"**Type:** {' '.join(class_doc['modifiers'] + [class_doc['type']])}")
                     st.write(f"**Package:** {class_doc['package']}")
                     st.write(f"**File:** {class_doc['file']}")
 
@@ -84,17 +95,31 @@ def show_code_documentation(parsed_data: Dict):
                         st.write(f"**Extends:** `{class_doc['extends']}`")
 
                     if class_doc['implements']:
-                        st.write(f"**Implements:** {', '.join(f'`{impl}`' for impl in class_doc['implements'])}")
+                        # Interfaces list their super-interfaces here
+                        label = "Extends" if class_doc['type'] == 'Interface' else "Implements"
+                        st.write(f"**{label}:** {', '.join(f'`{impl}`' for impl in class_doc['implements'])}")
+
+                    if class_doc['annotations']:
+                        st.write(f"**Annotations:** {', '.join(f'`@{a}`' for a in class_doc['annotations'])}")
+
+                    if class_doc['fields']:
+                        st.markdown("**Fields:**")
+                        for field in class_doc['fields']:
+                            st.markdown(f"- `{' '.join(field['modifiers'] + [field['type'], field['name']])}`")
 
                     st.markdown("---")
                     st.markdown(format_javadoc(class_doc['javadoc']))
 
     with method_tab:
         st.subheader("Method Documentation")
-        if documentation['methods']:
-            # Group methods by class
+        query = search_box("doc_methods", "Filter by method or class")
+        methods = filter_items(documentation['methods'], query,
+                               lambda doc: f"{doc['package']}.{doc['class']}.{doc['name']}")
+        page_methods, _ = paginate(methods, "doc_methods")
+        if page_methods:
+            # Group the visible methods by class
             methods_by_class = {}
-            for method in documentation['methods']:
+            for method in page_methods:
                 class_name = method['class']
                 if class_name not in methods_by_class:
                     methods_by_class[class_name] = []
@@ -106,12 +131,14 @@ def show_code_documentation(parsed_data: Dict):
                 for method in methods:
                     with st.expander(f"🔸 {method['name']}"):
                         # Method signature
-                        signature = f"{' '.join(method['modifiers'])} {method['return_type']} {method['name']}"
+                        signature = ' '.join(method['modifiers'] + [method['return_type'], method['name']])
                         if method['parameters']:
                             params = [f"{param['type']} {param['name']}" for param in method['parameters']]
                             signature += f"({', '.join(params)})"
                         else:
                             signature += "()"
+                        if method['throws']:
+                            signature += f" throws {', '.join(method['throws'])}"
 
                         st.code(signature, language="java")
 
@@ -1,10 +1,37 @@
 import streamlit as st
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
+from utils.view_cache import memoize
+from utils.compact_model import iter_api_methods
 
-def show_data_flow(relationships: Dict):
+def collect_endpoints(parsed_data) -> Dict[str, list]:
     """
-    Display data flow information including API endpoints
+    Collect REST and SOAP endpoints in a single pass
+    """
+    rest_endpoints = []
+    soap_services = []
+    for class_name, api_type, method, annotations, parameters in iter_api_methods(parsed_data):
+        formatted_parameters = ', '.join([f"{p['name']}: {p['type']}" for p in parameters])
+        if api_type == 'REST':
+            rest_endpoints.append({
+                'Class': class_name,
+                'Endpoint': method,
+                'HTTP Method': next((a for a in annotations
+                                   if a in ['GET', 'POST', 'PUT', 'DELETE']), 'N/A'),
+                'Parameters': formatted_parameters
+            })
+        elif api_type == 'SOAP':
+            soap_services.append({
+                'Service Class': class_name,
+                'Operation': method,
+                'Parameters': formatted_parameters
+            })
+    return {'rest': rest_endpoints, 'soap': soap_services}
+
+def show_data_flow(relationships: Dict, cache: Optional[Dict] = None):
+    """
+    Display data flow information including API endpoints.
+    cache memoizes the derived tables per analysis.
     """
     st.header("Data Flow Analysis")
 
@@ -19,9 +46,9 @@ def show_data_flow(relationships: Dict):
     # Show dependencies
     st.subheader("Dependencies")
     if relationships['dependencies']:
-        dependencies_list = [{"from": dep[0], "to": dep[1]} 
-                           for dep in relationships['dependencies']]
-        df_dependencies = pd.DataFrame(dependencies_list)
+        df_dependencies = memoize(cache, 'dependencies_frame', lambda: pd.DataFrame(
+            [{"from": dep[0], "to": dep[1]} for dep in relationships['dependencies']]
+        ))
         st.dataframe(df_dependencies)
     else:
         st.info("No dependencies found")
@@ -29,42 +56,20 @@ def show_data_flow(relationships: Dict):
     # Show API Endpoints
     st.subheader("API Endpoints")
 
+    endpoints = memoize(cache, 'endpoints', lambda: collect_endpoints(relationships.get('parsed_data', {})))
+    rest_endpoints = endpoints['rest']
+    soap_services = endpoints['soap']
+
     # REST API Tab
     tab1, tab2 = st.tabs(["REST API Endpoints", "SOAP Services"])
 
     with tab1:
-        rest_endpoints = []
-        for file_data in relationships.get('parsed_data', {}).values():
-            for class_info in file_data.get('classes', []):
-                for api_method in class_info.get('api_methods', []):
-                    if api_method['type'] == 'REST':
-                        rest_endpoints.append({
-                            'Class': class_info['name'],
-                            'Endpoint': api_method['method'],
-                            'HTTP Method': next((a for a in api_method['annotations'] 
-                                               if a in ['GET', 'POST', 'PUT', 'DELETE']), 'N/A'),
-                            'Parameters': ', '.join([f"{p['name']}: {p['type']}" 
-                                                   for p in api_method['parameters']])
-                        })
-
         if rest_endpoints:
             st.dataframe(pd.DataFrame(rest_endpoints))
         else:
             st.info("No REST endpoints found")
 
     with tab2:
-        soap_services = []
-        for file_data in relationships.get('parsed_data', {}).values():
-            for class_info in file_data.get('classes', []):
-                for api_method in class_info.get('api_methods', []):
-                    if api_method['type'] == 'SOAP':
-                        soap_services.append({
-                            'Service Class': class_info['name'],
-                            'Operation': api_method['method'],
-                            'Parameters': ', '.join([f"{p['name']}: {p['type']}" 
-                                                   for p in api_method['parameters']])
-                        })
-
         if soap_services:
             st.dataframe(pd.DataFrame(soap_services))
         else:
@@ -0,0 +1,42 @@
+import math
+import streamlit as st
+from typing import Callable, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+def filter_items(items: List[T], query: str, text_of: Callable[[T], str]) -> List[T]:
+    """
+    Case-insensitive substring filter evaluated on the server
+    """
+    query = query.strip().lower()
+    if not query:
+        return items
+    return [item for item in items if query in text_of(item).lower()]
+
+def paginate(items: List[T], key: str, default_page_size: int = 50) -> Tuple[List[T], int]:
+    """
+    Show page controls and return only the visible window of items,
+    together with the index of its first item
+    """
+    if not items:
+        return [], 0
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Items per page", PAGE_SIZES, index=PAGE_SIZES.index(default_page_size),
+                                 key=f"{key}_page_size")
+    page_count = max(1, math.ceil(len(items) / page_size))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1,
+                               key=f"{key}_page")
+    page = min(int(page), page_count)
+    start = (page - 1) * page_size
+    with col3:
+        st.caption(f"Showing {start + 1}–{min(start + page_size, len(items))} of {len(items)}")
+
+    return items[start:start + page_size], start
+
+def search_box(key: str, placeholder: str) -> str:
+    return st.text_input("Search", key=f"{key}_search", placeholder=placeholder)
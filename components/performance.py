@@ -0,0 +1,58 @@
+import json
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from utils.instrumentation import Profiler
+
+def show_performance(profiler: Profiler, parse_failures=None):
+    """
+    Display per-stage measurements of the current analysis and view renders
+    """
+    st.header("Performance")
+
+    report = profiler.to_dict()
+    stages = report['stages']
+    if not stages:
+        st.info("No measurements recorded yet.")
+        return
+
+    pipeline = [record for record in stages if not record['stage'].startswith('view: ') and record['parent'] is None]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Analysis Time (s)", f"{sum(record['wall_seconds'] for record in pipeline):.2f}")
+    with col2:
+        st.metric("Slow Files", len(report['slow_files']))
+    with col3:
+        peaks = [record['peak_rss_mb'] for record in stages if record['peak_rss_mb'] is not None]
+        st.metric("Peak Memory (MB)", f"{max(peaks):.0f}" if peaks else "n/a")
+
+    st.subheader("Stages")
+    st.caption("CPU time includes parser processes. Peak memory is the process high-water mark after each stage.")
+    st.dataframe(
+        pd.DataFrame([{
+            "Stage": record['stage'],
+            "Within": record['parent'] or "",
+            "Items": record['items'],
+            "Wall (s)": record['wall_seconds'],
+            "CPU (s)": record['cpu_seconds'],
+            "Peak RSS (MB)": record['peak_rss_mb'],
+            "RSS Growth (MB)": record['peak_rss_growth_mb'],
+            "Finished": datetime.fromtimestamp(record['finished_at']).strftime('%H:%M:%S')
+        } for record in stages]),
+        hide_index=True
+    )
+
+    st.subheader("Slowest Files")
+    if report['slow_files']:
+        st.dataframe(pd.DataFrame(report['slow_files']).rename(columns={'file': 'File', 'seconds': 'Parse Time (s)'}),
+                     hide_index=True)
+    else:
+        st.info(f"No file took longer than {report['slow_file_seconds']}s to parse.")
+
+    report['parse_failures'] = parse_failures or []
+    st.download_button(
+        "Export as JSON",
+        data=json.dumps(report, indent=2),
+        file_name="java_analyzer_performance.json",
+        mime="application/json"
+    )
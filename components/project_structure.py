@@ -1,43 +1,62 @@
 import streamlit as st
 from utils.file_handler import get_file_structure
-from typing import Dict, List
-import os
+from typing import Dict, List, Optional
+from utils.view_cache import memoize
+from utils.manifest import type_label
+from components.pagination import filter_items, paginate, search_box
 
-def extract_file_info(files: Dict[str, str]) -> List[Dict]:
+def extract_file_info(manifest: Dict[str, Dict]) -> List[Dict]:
     """
-    Extract detailed file information for tabular display
+    Build the detailed file table from the ingestion manifest
     """
-    file_info = []
-    for filepath, content in files.items():
-        # Get file details
-        filename = os.path.basename(filepath)
-        directory = os.path.dirname(filepath)
-        file_size = len(content.encode('utf-8'))
+    return [
+        {
+            "File Name": entry['name'],
+            "Directory": entry['directory'] if entry['directory'] else "Root",
+            "Type": type_label(entry),
+            "Size (bytes)": entry['size_bytes'],
+            "Lines": entry['lines'],
+            "Lines of Code": entry['code'],
+            "Comment Lines": entry['comment'],
+            "Blank Lines": entry['blank'],
+            "Full Path": entry['path']
+        } for entry in manifest.values()
+    ]
 
-        # Determine file type based on content analysis
-        file_type = "Java Class"
-        if "interface" in content.lower():
-            file_type = "Java Interface"
-        elif "enum" in content.lower():
-            file_type = "Java Enum"
-
-        # Count lines of code
-        loc = len(content.splitlines())
-
-        file_info.append({
-            "File Name": filename,
-            "Directory": directory if directory else "Root",
-            "Type": file_type,
-            "Size (bytes)": file_size,
-            "Lines of Code": loc,
-            "Full Path": filepath
-        })
+def flatten_structure(structure: Dict, path: str = '', level: int = 0) -> List[Dict]:
+    """
+    Flatten the file tree into rows in display order
+    """
+    rows = []
+    for key, value in structure.items():
+        full_path = f"{path}/{key}" if path else key
+        is_dir = isinstance(value, dict)
+        rows.append({'name': key, 'path': full_path, 'level': level, 'is_dir': is_dir})
+        if is_dir:
+            rows.extend(flatten_structure(value, full_path, level + 1))
+    return rows
 
-    return file_info
+def filter_tree_rows(rows: List[Dict], query: str) -> List[Dict]:
+    """
+    Keep files whose path matches the query, plus their parent directories
+    """
+    matching_files = filter_items([row for row in rows if not row['is_dir']], query, lambda row: row['path'])
+    if len(matching_files) == sum(1 for row in rows if not row['is_dir']):
+        return rows
+    keep = set()
+    for row in matching_files:
+        keep.add(row['path'])
+        parent = row['path']
+        while '/' in parent:
+            parent = parent.rsplit('/', 1)[0]
+            keep.add(parent)
+    return [row for row in rows if row['path'] in keep]
 
-def show_project_structure(files: Dict[str, str]):
+def show_project_structure(manifest: Dict[str, Dict], cache: Optional[Dict] = None):
     """
-    Display project structure in both tree and table formats
+    Display project structure in both tree and table formats from the file
+    manifest computed at ingestion; no source text is processed here.
+    cache memoizes the derived structure and file details per analysis.
     """
     st.header("Project Structure")
 
@@ -45,22 +64,18 @@ def show_project_structure(files: Dict[str, str]):
     tree_tab, table_tab = st.tabs(["Tree View", "Detailed View"])
 
     with tree_tab:
-        structure = get_file_structure(files)
-
-        def render_structure(struct, level=0):
-            for key, value in struct.items():
-                prefix = "    " * level
-                if isinstance(value, dict):
-                    st.markdown(f"`{prefix}📁 {key}`")
-                    render_structure(value, level + 1)
-                else:
-                    st.markdown(f"`{prefix}📄 {key}`")
+        rows = memoize(cache, 'file_tree_rows', lambda: flatten_structure(get_file_structure(manifest)))
 
-        render_structure(structure)
+        # Only the visible page is rendered, as a single text block
+        query = search_box("structure_tree", "Filter files by path")
+        page_rows, _ = paginate(filter_tree_rows(rows, query), "structure_tree", default_page_size=100)
+        st.code('\n'.join(
+            f"{'    ' * row['level']}{'📁' if row['is_dir'] else '📄'} {row['name']}" for row in page_rows
+        ) or "No matching files", language=None)
 
     with table_tab:
         # Create detailed table view
-        file_info = extract_file_info(files)
+        file_info = memoize(cache, 'file_info', lambda: extract_file_info(manifest))
 
         # Add project summary metrics
         col1, col2, col3 = st.columns(3)
@@ -73,16 +88,20 @@ def show_project_structure(files: Dict[str, str]):
             total_size = sum(info["Size (bytes)"] for info in file_info)
             st.metric("Total Size (KB)", f"{total_size/1024:.2f}")
 
-        # Show detailed table
+        # Show detailed table; st.dataframe already virtualizes rows, filtering happens here
         st.subheader("File Details")
+        query = search_box("structure_table", "Filter files by path")
         st.dataframe(
-            file_info,
+            filter_items(file_info, query, lambda info: info["Full Path"]),
             column_config={
                 "File Name": st.column_config.TextColumn("File Name", width="medium"),
                 "Directory": st.column_config.TextColumn("Directory", width="medium"),
                 "Type": st.column_config.TextColumn("Type", width="small"),
                 "Size (bytes)": st.column_config.NumberColumn("Size (bytes)", format="%d"),
+                "Lines": st.column_config.NumberColumn("Lines", format="%d"),
                 "Lines of Code": st.column_config.NumberColumn("Lines of Code", format="%d"),
+                "Comment Lines": st.column_config.NumberColumn("Comment Lines", format="%d"),
+                "Blank Lines": st.column_config.NumberColumn("Blank Lines", format="%d"),
                 "Full Path": st.column_config.TextColumn("Full Path", width="large")
             },
             hide_index=True
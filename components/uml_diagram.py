@@ -1,21 +1,22 @@
 import streamlit as st
 from typing import Dict, List
 import math
-import plantuml
-import io
-import base64
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from utils.symbol_table import FileScope, qualified_name
+from utils.uml_renderer import get_uml_renderer
+from utils.instrumentation import stage
 
-def generate_plantuml_class(class_info: Dict) -> str:
+def generate_plantuml_class(class_info: Dict, name: Optional[str] = None) -> str:
     """
-    Generate PlantUML class definition
+    Generate PlantUML class definition, optionally under a fully-qualified name
     """
     uml = []
+    name = name or class_info["name"]
     # Class definition
     if class_info.get('implements'):
-        uml.append(f'class {class_info["name"]} implements {",".join(class_info["implements"])} {{')
+        uml.append(f'class {name} implements {",".join(class_info["implements"])} {{')
     else:
-        uml.append(f'class {class_info["name"]} {{')
+        uml.append(f'class {name} {{')
 
     # Fields
     for field in class_info.get('fields', []):
@@ -33,73 +34,188 @@ def split_classes(classes: List[Dict], num_sections: int) -> List[List[Dict]]:
     """
     Split classes into sections for manageable visualization
     """
-    section_size = math.ceil(len(classes) / num_sections)
+    section_size = max(1, math.ceil(len(classes) / num_sections))
     return [classes[i:i + section_size] for i in range(0, len(classes), section_size)]
 
+def build_edge_index(relationships: Dict) -> Dict[str, List[str]]:
+    """
+    Map each class name to the PlantUML lines of the edges that touch it,
+    so a section's edges can be gathered without scanning every relationship
+    """
+    edge_index = {}
+    for key, arrow in (('inheritance', '--|>'), ('implementation', '..|>')):
+        for rel in relationships[key]:
+            line = f"{rel['from']} {arrow} {rel['to']}"
+            edge_index.setdefault(rel['from'], []).append(line)
+            if rel['to'] != rel['from']:
+                edge_index.setdefault(rel['to'], []).append(line)
+    return edge_index
+
+def _class_groups_by_connectivity(classes: List[Dict], relationships: Dict) -> List[List[Dict]]:
+    # Union-find over the edges between project classes
+    parent = {c['fqn']: c['fqn'] for c in classes}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for key in ('inheritance', 'implementation'):
+        for rel in relationships[key]:
+            if rel['from'] in parent and rel['to'] in parent:
+                parent[find(rel['from'])] = find(rel['to'])
+
+    groups = {}
+    for class_info in classes:
+        groups.setdefault(find(class_info['fqn']), []).append(class_info)
+    return list(groups.values())
+
+def _class_groups_by_package(classes: List[Dict]) -> List[List[Dict]]:
+    groups = {}
+    for class_info in classes:
+        groups.setdefault(class_info['fqn'].rpartition('.')[0], []).append(class_info)
+    return list(groups.values())
+
+def partition_classes(classes: List[Dict], num_sections: int, relationships: Dict,
+                      mode: str = "Connectivity") -> List[List[Dict]]:
+    """
+    Split classes into sections, keeping connected classes ("Connectivity")
+    or classes of the same package ("Package") together where they fit.
+    "Sequential" cuts the class list into contiguous slices.
+    """
+    if mode == "Sequential" or num_sections <= 1 or not classes:
+        return split_classes(classes, num_sections)
+
+    if mode == "Package":
+        groups = _class_groups_by_package(classes)
+    else:
+        groups = _class_groups_by_connectivity(classes, relationships)
+
+    # Groups larger than a section are cut into section-sized pieces
+    section_size = math.ceil(len(classes) / num_sections)
+    pieces = []
+    for group in groups:
+        pieces.extend(group[i:i + section_size] for i in range(0, len(group), section_size))
+
+    # Largest pieces first, each into the currently smallest section
+    sections = [[] for _ in range(num_sections)]
+    for piece in sorted(pieces, key=len, reverse=True):
+        min(sections, key=len).extend(piece)
+    return [section for section in sections if section]
+
+def section_edges(section_classes: List[Dict], edge_index: Dict[str, List[str]]) -> List[str]:
+    """
+    PlantUML lines for the edges touching a section, in first-seen order
+    """
+    lines = {}
+    for class_info in section_classes:
+        for line in edge_index.get(class_info['fqn'], []):
+            lines[line] = None
+    return list(lines)
+
+def build_uml_sources(relationships: Dict, num_sections: int = 1,
+                      partition_mode: str = "Connectivity") -> Tuple[List[List[Dict]], List[str]]:
+    """
+    Partition the analysed classes into sections and build the PlantUML
+    source of each section
+    """
+    # Get all classes from relationships, keyed by fully-qualified names
+    symbols = relationships.get('symbol_table')
+    all_classes = []
+    for file_data in relationships.get('parsed_data', {}).values():
+        scope = FileScope(file_data.get('package'), file_data.get('imports', []))
+        for class_info in file_data.get('classes', []):
+            implements = class_info.get('implements', [])
+            if symbols is not None:
+                implements = [symbols.resolve(name, scope) for name in implements]
+            all_classes.append(dict(
+                class_info,
+                fqn=qualified_name(scope.package, class_info['name']),
+                implements=implements
+            ))
+
+    # Split classes into sections
+    class_sections = partition_classes(all_classes, num_sections, relationships, partition_mode)
+    edge_index = build_edge_index(relationships)
+
+    # Generate PlantUML code for each section
+    sources = []
+    for section_idx, section_classes in enumerate(class_sections):
+        uml_code = [
+            "@startuml", 
+            "skinparam monochrome true", 
+            "skinparam shadowing false",
+            "skinparam classFontSize 14",
+            "skinparam defaultFontSize 12",
+            f"title Section {section_idx + 1} - {len(section_classes)} Classes"
+        ]
+
+        # Add classes
+        for class_info in section_classes:
+            uml_code.append(generate_plantuml_class(class_info, class_info['fqn']))
+
+        # Add relationships
+        uml_code.extend(section_edges(section_classes, edge_index))
+
+        uml_code.append("@enduml")
+        sources.append('\n'.join(uml_code))
+
+    return class_sections, sources
+
+@st.fragment
 def show_uml_diagram(relationships: Dict):
     """
-    Display UML class diagram with interactive zoom functionality
+    Display UML class diagram with interactive zoom functionality.
+    Runs as a fragment so the sliders only rerun this view.
     """
     st.header("UML Class Diagram")
 
     with st.container():
         # Controls for diagram layout
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             num_sections = st.slider("Split diagram into sections", 1, 8, 1, 
                                    help="Split the diagram into multiple sections for better visibility")
         with col2:
+            partition_mode = st.selectbox("Group sections by", ["Connectivity", "Package", "Sequential"],
+                                          help="Keep related classes or packages in the same section")
+        with col3:
             zoom_level = st.slider("Zoom level", 50, 400, 100, step=10, 
                                 help="Adjust diagram size (50% to 400%)")
 
-        # Get all classes from relationships
-        all_classes = []
-        for file_data in relationships.get('parsed_data', {}).values():
-            all_classes.extend(file_data.get('classes', []))
-
-        # Split classes into sections
-        class_sections = split_classes(all_classes, num_sections)
+        class_sections, sources = build_uml_sources(relationships, num_sections, partition_mode)
 
-        # Create tabs for each section
+        # Create tabs for each section, with placeholders filled as diagrams finish
         tabs = st.tabs([f"Section {i+1}" for i in range(len(class_sections))])
-
-        # Create PlantUML instance for local rendering
-        output_directory = io.StringIO()
-        puml = plantuml.PlantUML(output_directory=output_directory)
-
-        # Create diagram for each section
+        placeholders = []
         for section_idx, (tab, section_classes) in enumerate(zip(tabs, class_sections)):
             with tab:
-                # Generate PlantUML code
-                uml_code = [
-                    "@startuml", 
-                    "skinparam monochrome true", 
-                    "skinparam shadowing false",
-                    "skinparam classFontSize 14",
-                    "skinparam defaultFontSize 12",
-                    f"title Section {section_idx + 1} - {len(section_classes)} Classes"
-                ]
-
-                # Add classes
-                for class_info in section_classes:
-                    uml_code.append(generate_plantuml_class(class_info))
-
-                # Add relationships
-                for rel in relationships['inheritance']:
-                    if any(c['name'] in [rel['from'], rel['to']] for c in section_classes):
-                        uml_code.append(f"{rel['from']} --|> {rel['to']}")
-
-                for rel in relationships['implementation']:
-                    if any(c['name'] in [rel['from'], rel['to']] for c in section_classes):
-                        uml_code.append(f"{rel['from']} ..|> {rel['to']}")
-
-                uml_code.append("@enduml")
-
-                # Generate diagram locally
-                diagram = puml.generate_diagram('\n'.join(uml_code), outfile=None)
+                placeholder = st.empty()
+                placeholder.info("Rendering diagram...")
+                placeholders.append(placeholder)
+
+                # Show section info
+                st.caption(f"Displaying {len(section_classes)} classes in section {section_idx + 1}")
+
+        renderer = get_uml_renderer()
+        if not renderer.available:
+            st.info("Diagrams are not rendered: install PlantUML locally (or set JAVA_ANALYZER_PLANTUML), "
+                    "or set JAVA_ANALYZER_PLANTUML_SERVER to send them to a PlantUML server. "
+                    "The PlantUML source of each section is shown instead.")
+            for placeholder, uml_source in zip(placeholders, sources):
+                placeholder.code(uml_source, language='text')
+            return
+
+        # Render sections concurrently; cached sections appear immediately
+        with stage('plantuml render', items=len(sources)):
+            for section_idx, diagram, error in renderer.render_many(sources):
+                if error is not None:
+                    placeholders[section_idx].error(f"Could not render section {section_idx + 1}: {error}")
+                    continue
 
                 # Display SVG with zoom control
-                st.markdown(f"""
+                placeholders[section_idx].markdown(f"""
                     <div style="width: 100%; overflow: auto;">
                         <div style="width: {zoom_level}%;">
                             {diagram.decode()}
@@ -108,6 +224,3 @@ def show_uml_diagram(relationships: Dict):
                     """, 
                     unsafe_allow_html=True
                 )
-
-                # Show section info
-                st.caption(f"Displaying {len(section_classes)} classes in section {section_idx + 1}")
\ No newline at end of file
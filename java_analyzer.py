@@ -1,13 +1,187 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import os
-from utils.file_handler import process_uploaded_files
-from utils.code_parser import parse_java_files
-from utils.relationship_analyzer import analyze_relationships
+import time
+import pandas as pd
+from datetime import datetime
+from utils.pipeline import upload_digest, run_pipeline, ensure_full_detail
+from utils.analysis_store import get_analysis_store
+from utils.jobs import get_job_manager
 from components.project_structure import show_project_structure
 from components.class_relationships import show_class_relationships
 from components.data_flow import show_data_flow
 from components.uml_diagram import show_uml_diagram
 from components.code_documentation import show_code_documentation
+from components.performance import show_performance
+
+VIEWS = {
+    "Project Structure": lambda analysis: show_project_structure(analysis['manifest'], analysis['views']),
+    "Class Relationships": lambda analysis: show_class_relationships(analysis['relationships']),
+    "Data Flow": lambda analysis: show_data_flow(analysis['relationships'], analysis['views']),
+    "UML Diagram": lambda analysis: show_uml_diagram(analysis['relationships']),
+    "Documentation": lambda analysis: show_code_documentation(analysis['parsed_data'], analysis['views']),
+    "Performance": lambda analysis: show_performance(analysis['performance'], analysis['parse_failures'])
+}
+
+# Views that need member-level detail (methods, fields, Javadoc) from the full parse
+FULL_DETAIL_VIEWS = {"Data Flow", "UML Diagram", "Documentation"}
+
+# Seconds between progress refreshes while an analysis job runs
+PROGRESS_POLL_SECONDS = 0.5
+
+def viewer_id() -> str:
+    """
+    Identifier of this browser session for attaching to analysis jobs: the
+    Streamlit session id, so a job outlives throttled polling for as long
+    as its page stays connected
+    """
+    return get_script_run_ctx().session_id
+
+def release_analysis_job():
+    """
+    Detach this session from its in-flight analysis job. The job is
+    cancelled unless another session is waiting for the same upload.
+    """
+    key = st.session_state.pop('analysis_job', None)
+    if key is not None:
+        get_job_manager().release(key, viewer_id())
+
+def get_analysis(uploaded_files, encoding=None):
+    """
+    Return the analysis for the current upload, or None while it is still
+    running. The pipeline runs as a background job keyed by the uploaded
+    bytes and the pinned encoding, so identical submissions from any session
+    attach to the same job, and a new upload cancels the previous one.
+    Widget interactions reuse the stored result.
+    """
+    digest = f"{upload_digest(uploaded_files)}:{encoding or ''}"
+    cached = st.session_state.get('analysis')
+    if cached is not None and cached['digest'] == digest:
+        return session_analysis(cached)
+
+    if st.session_state.get('cancelled_analysis') == digest:
+        st.info("Analysis cancelled.")
+        if not st.button("Restart analysis"):
+            return None
+        del st.session_state['cancelled_analysis']
+
+    if st.session_state.get('analysis_job') != digest:
+        release_analysis_job()
+    job = get_job_manager().submit(
+        digest, lambda progress: run_pipeline(uploaded_files, encoding, progress=progress), viewer_id())
+    st.session_state['analysis_job'] = digest
+
+    if not job.finished:
+        show_job_progress(job)
+        return None
+
+    release_analysis_job()
+    if job.status == 'failed':
+        raise RuntimeError(job.error)
+    if job.status == 'cancelled':
+        st.session_state['cancelled_analysis'] = digest
+        st.rerun()
+
+    # Keep only the latest analysis so old uploads are released
+    st.session_state['analysis'] = {'digest': digest, 'shared': job.result, 'result': None}
+    return session_analysis(st.session_state['analysis'])
+
+def session_analysis(cached):
+    """
+    This session's copy of an analysis, with its own memo of the expensive
+    computations behind each view. Analyses from background jobs are shared
+    by every session that uploaded the same files, so sessions never write
+    into them directly; the copy is refreshed once the shared analysis has
+    been upgraded to full detail.
+    """
+    shared = cached['shared']
+    if cached['result'] is None or cached['result']['detail'] != shared['detail']:
+        cached['result'] = dict(shared, views={})
+    return cached['result']
+
+def full_detail_analysis():
+    """
+    Upgrade the current analysis to full detail, once for all sessions
+    sharing it, and return this session's refreshed copy
+    """
+    cached = st.session_state['analysis']
+    ensure_full_detail(cached['shared'])
+    return session_analysis(cached)
+
+@st.fragment(run_every=PROGRESS_POLL_SECONDS)
+def show_job_progress(job):
+    """
+    Live progress of a running analysis job, with a cancel button and a
+    preview of the project structure as files are ingested. The job is
+    cancelled once every page waiting for it has been closed.
+    """
+    job.touch(viewer_id())
+    if job.finished:
+        st.rerun()
+
+    snapshot = job.progress.snapshot()
+    stage = (snapshot['stage'] or 'starting').capitalize()
+    if snapshot['total']:
+        st.progress(min(snapshot['done'] / snapshot['total'], 1.0),
+                    text=f"{stage}: {snapshot['done']} of {snapshot['total']} files")
+    else:
+        st.progress(0.0, text=f"{stage}: {snapshot['done']} files")
+    st.caption(f"Running for {time.time() - job.started_at:.0f}s · stages: {' → '.join(snapshot['stages'])}")
+
+    if st.button("Cancel analysis"):
+        st.session_state['cancelled_analysis'] = job.key
+        release_analysis_job()
+        st.rerun()
+
+    # Partial results: the file manifest, republished as batches are ingested
+    manifest = job.progress.partial.get('manifest')
+    if manifest:
+        preview = st.session_state.get('analysis_preview')
+        if preview is None or preview['key'] != job.key or preview['manifest'] is not manifest:
+            preview = st.session_state['analysis_preview'] = {'key': job.key, 'manifest': manifest, 'views': {}}
+        with st.expander("Preview: project structure"):
+            show_project_structure(manifest, preview['views'])
+
+def get_stored_analysis(store, stored):
+    """
+    Return a stored analysis, loading it from the store once per session
+    """
+    digest = f"stored:{stored['id']}:{stored['created_at']}"
+    cached = st.session_state.get('analysis')
+    if cached is not None and cached['digest'] == digest:
+        return session_analysis(cached)
+
+    with st.spinner('Loading stored analysis...'):
+        result = store.load(stored['id'])
+    st.session_state['analysis'] = {'digest': digest, 'shared': result, 'result': None}
+    return session_analysis(st.session_state['analysis'])
+
+def choose_stored_analysis(store):
+    """
+    Selector for analyses saved in the local store; returns the chosen entry or None
+    """
+    with st.expander("Stored analyses"):
+        stored = store.list_analyses()
+        if not stored:
+            st.caption("No stored analyses yet. Analyze an upload and save it to reopen it later without re-parsing.")
+            return None
+        options = {
+            f"{entry['name']} ({entry['files']} files, saved "
+            f"{datetime.fromtimestamp(entry['created_at']).strftime('%Y-%m-%d %H:%M')})": entry
+            for entry in stored
+        }
+        label = st.selectbox("Open a stored analysis", ["None"] + list(options),
+                             help="A stored analysis replaces the current upload until you choose None")
+        return options.get(label)
+
+def save_analysis_controls(store, uploaded_files):
+    with st.expander("Save analysis"):
+        name = st.text_input("Name", value=', '.join(uploaded_file.name for uploaded_file in uploaded_files))
+        if st.button("Save", disabled=not name.strip()):
+            with st.spinner('Saving analysis...'):
+                # Stored analyses always carry member-level detail
+                store.save(full_detail_analysis(), name.strip())
+            st.success(f"Saved as '{name.strip()}'")
 
 def main():
     st.set_page_config(page_title="Java Code Analyzer", layout="wide")
@@ -32,48 +206,71 @@ def main():
         help="You can upload multiple Java files or a ZIP archive containing your Java project"
     )
 
-    if uploaded_files:
+    with st.expander("Advanced options"):
+        encoding = st.text_input(
+            "Source encoding",
+            value="",
+            placeholder="Auto-detect",
+            help="Pin the character encoding of all sources (e.g. utf-8, cp1252). Leave empty to detect it."
+        ).strip() or None
+
+    store = get_analysis_store()
+    stored = choose_stored_analysis(store) if store is not None else None
+    if stored is not None or not uploaded_files:
+        # Nothing is waiting for an upload analysis any more
+        release_analysis_job()
+
+    if stored is not None or uploaded_files:
         try:
-            with st.spinner('Processing files...'):
-                # Process uploaded files
-                processed_files = process_uploaded_files(uploaded_files)
+            if stored is not None:
+                analysis = get_stored_analysis(store, stored)
+                st.success(f"Opened stored analysis '{stored['name']}' with {len(analysis['manifest'])} Java files")
+            else:
+                analysis = get_analysis(uploaded_files, encoding)
+                if analysis is None:
+                    return
+                # Out-of-core analyses release source text, so count the manifest
+                file_count = len(analysis['manifest'] if analysis['out_of_core'] else analysis['processed_files'])
 
-                if not processed_files:
+                if not file_count:
                     st.warning("No Java files found in the upload. Please ensure you've uploaded Java source files.")
                     return
 
                 # Show number of files processed
-                st.success(f"Successfully processed {len(processed_files)} Java files")
-
-                # Parse Java files
-                parsed_data = parse_java_files(processed_files)
-
-                # Analyze relationships
-                relationships = analyze_relationships(parsed_data)
-
-                # Create tabs for different views
-                tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                    "Project Structure", 
-                    "Class Relationships", 
-                    "Data Flow",
-                    "UML Diagram",
-                    "Documentation"
-                ])
-
-                with tab1:
-                    show_project_structure(processed_files)
-
-                with tab2:
-                    show_class_relationships(relationships)
+                st.success(f"Successfully processed {file_count} Java files")
+                if analysis['out_of_core']:
+                    st.caption("Large upload: analyzed out of core, with parse results kept on disk.")
+                encoding_stats = analysis['encoding_stats']
+                st.caption(
+                    f"Decoding took {encoding_stats['total_seconds']:.2f}s "
+                    f"({encoding_stats['utf8_fast_path']} UTF-8 fast path, "
+                    f"{encoding_stats['detected']} detected in {encoding_stats['detection_seconds']:.2f}s)"
+                )
+                if encoding_stats.get('replaced'):
+                    st.warning(f"{encoding_stats['replaced']} file(s) matched no detected encoding and were "
+                               f"decoded as cp1252 with undecodable bytes replaced")
+                if store is not None:
+                    save_analysis_controls(store, uploaded_files)
 
-                with tab3:
-                    show_data_flow(relationships)
+            # Only the selected view is computed; its results are memoized per analysis
+            view = st.radio("View", list(VIEWS), horizontal=True, key="active_view",
+                            label_visibility="collapsed")
+            profiler = analysis['performance']
+            with profiler.activate():
+                if view in FULL_DETAIL_VIEWS and analysis['detail'] == 'header':
+                    with st.spinner('Parsing class members...'):
+                        analysis = full_detail_analysis()
+                elif analysis['detail'] == 'header':
+                    st.caption("Showing declarations from a fast scan; member details are parsed when a view needs them.")
 
-                with tab4:
-                    show_uml_diagram(relationships)
+                parse_failures = analysis.get('parse_failures')
+                if parse_failures:
+                    with st.expander(f"{len(parse_failures)} files could not be parsed"):
+                        st.dataframe(pd.DataFrame(parse_failures), hide_index=True, use_container_width=True)
 
-                with tab5:
-                    show_code_documentation(parsed_data)
+                # View renders are recorded next to the pipeline stages
+                with profiler.stage(f"view: {view}"):
+                    VIEWS[view](analysis)
 
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
@@ -0,0 +1,116 @@
+"""
+Headless batch analysis of Java projects.
+
+    python java_analyzer_cli.py path/to/project another.zip --format jsonl -o results.jsonl
+
+Runs the same ingestion, parsing and relationship analysis as the Streamlit
+app without importing streamlit, and writes one result per input.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, Any
+from utils.pipeline import analyze_path
+from utils.compact_model import to_plain
+from utils.dependency_graph import get_package_dependency_graph
+from utils.analysis_store import AnalysisStore
+
+def analysis_to_json(path: str, analysis: Dict[str, Any], summary_only: bool = False) -> Dict[str, Any]:
+    """
+    Convert a pipeline result into JSON-serialisable form
+    """
+    relationships = analysis['relationships']
+    parsed_data = analysis['parsed_data']
+
+    result = {
+        'source': path,
+        'files': len(analysis['manifest']),
+        'parsed_files': len(parsed_data),
+        'classes': sum(len(file_data['classes']) for file_data in parsed_data.values()),
+        'interfaces': sum(len(file_data['interfaces']) for file_data in parsed_data.values()),
+        'detail': analysis['detail'],
+        'timings': analysis['timings'],
+        'encoding_stats': analysis['encoding_stats'],
+        'parse_failures': analysis['parse_failures'],
+        'performance': analysis['performance'].to_dict()
+    }
+
+    manifest = analysis['manifest']
+    result['lines'] = {key: sum(entry[key] for entry in manifest.values())
+                       for key in ('lines', 'code', 'comment', 'blank')}
+
+    if not summary_only:
+        result['manifest'] = list(manifest.values())
+        result['parsed_data'] = to_plain(parsed_data)
+        result['relationships'] = {
+            'inheritance': relationships['inheritance'],
+            'implementation': relationships['implementation'],
+            'associations': relationships['associations'],
+            'dependencies': sorted([list(dep) for dep in relationships['dependencies']]),
+            'package_cycles': get_package_dependency_graph(relationships).cycles()
+        }
+
+    return result
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze Java projects without the Streamlit UI")
+    parser.add_argument('paths', nargs='+', help="Project directories, ZIP archives or Java files")
+    parser.add_argument('-o', '--output', help="Output file (defaults to stdout)")
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help="json writes one document listing all inputs, jsonl writes one line per input")
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Omit parsed data and relationships, keeping counts and timings")
+    parser.add_argument('--workers', type=int, help="Number of parser processes")
+    parser.add_argument('--encoding', help="Pin the source encoding instead of detecting it")
+    parser.add_argument('--detail', choices=['full', 'header'], default='full',
+                        help="header runs only the fast declaration scan instead of the full parse")
+    parser.add_argument('--no-cache', action='store_true', help="Do not use the on-disk parse cache")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Release sources as they are parsed and keep parse results on disk")
+    parser.add_argument('--save', action='store_true',
+                        help="Also save each analysis to the local analysis store, named by its path")
+    parser.add_argument('--store', help="Analysis store database (defaults to JAVA_ANALYZER_STORE)")
+    args = parser.parse_args(argv)
+    if args.save and args.detail == 'header':
+        parser.error("--save requires --detail full")
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+
+    store = AnalysisStore(args.store) if args.save else None
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failed = 0
+    results = []
+    try:
+        for path in args.paths:
+            try:
+                analysis = analyze_path(path, encoding=args.encoding, max_workers=args.workers,
+                                        use_cache=not args.no_cache, detail=args.detail,
+                                        out_of_core=args.out_of_core)
+                result = analysis_to_json(path, analysis, args.summary_only)
+                if store is not None:
+                    result['stored_id'] = store.save(analysis, os.path.abspath(path))
+            except Exception as e:
+                failed += 1
+                result = {'source': path, 'error': str(e)}
+
+            if args.format == 'jsonl':
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+            else:
+                results.append(result)
+
+        if args.format == 'json':
+            json.dump(results, output, indent=2)
+            output.write('\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if store is not None:
+            store.close()
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+from utils import isolated_parser
+from utils.code_parser import parse_java_files
+
+SLOW_SOURCE = 'class Slow {\n' + ''.join(f'    int m{i}(int a) {{ return a + {i}; }}\n' for i in range(5000)) + '}\n'
+
+def test_fallback_keeps_failures_and_skips_failed_files(monkeypatch):
+    # Let the first worker start, then fail to start its replacement
+    started = []
+    wait_ready = isolated_parser._Worker.wait_ready
+
+    def flaky_wait_ready(worker):
+        if started:
+            worker.kill()
+            raise OSError("parser process failed to start")
+        started.append(worker)
+        wait_ready(worker)
+    monkeypatch.setattr(isolated_parser._Worker, 'wait_ready', flaky_wait_ready)
+
+    files = {'Slow.java': SLOW_SOURCE, 'A.java': 'class A {}', 'B.java': 'class B extends A {}'}
+    failures, seen = [], []
+    parsed = parse_java_files(files, max_workers=1, timeout=0.01, failures=failures,
+                              on_file=lambda filename, elapsed: seen.append(filename))
+
+    assert [(failure['file'], failure['reason']) for failure in failures] == [('Slow.java', 'timeout')]
+    assert list(parsed) == ['A.java', 'B.java']
+    assert seen.count('Slow.java') == 1
@@ -0,0 +1,108 @@
+import copy
+import json
+import pytest
+from benchmarks.corpus import generate_corpus
+from utils.code_parser import parse_java_source
+from utils.fast_scanner import scan_java_source
+from utils.compact_model import (CompactParsedData, compact_parsed_data, iter_api_methods, iter_class_links,
+                                 iter_declarations, to_plain)
+
+RICH_SOURCE = """
+package com.example.api;
+
+import java.util.List;
+import javax.ws.rs.GET;
+
+/** Orders endpoint */
+@Path("/orders")
+public final class OrderResource extends BaseResource implements Resource, Auditable {
+    /** Cached orders */
+    private static final List<Order> cache = null;
+    protected int[] counts, totals;
+
+    /** Lists orders */
+    @GET
+    @Path("/{id}")
+    public List<Order> list(@PathParam("id") String id, int limit) throws IOException, TimeoutException {
+        return cache;
+    }
+
+    static <T> void empty() {}
+
+    public OrderResource() {}
+
+    class Inner implements Runnable {
+        public void run() {}
+    }
+}
+
+/** Marks audited types */
+@FunctionalInterface
+interface Auditable extends Serializable, Cloneable {
+    /** Audit trail */
+    String trail(int depth);
+}
+"""
+
+def parsed_corpus():
+    corpus = generate_corpus(40, classes_per_file=2, seed=3)
+    parsed = {filename: parse_java_source(source) for filename, source in corpus.items()}
+    parsed['com/example/api/OrderResource.java'] = parse_java_source(RICH_SOURCE)
+    # Header scans mix with full parses after a scan-first run
+    for filename in list(corpus)[:5]:
+        parsed[f"scanned/{filename}"] = scan_java_source(corpus[filename])
+    return parsed
+
+def test_full_and_header_records_round_trip():
+    parsed = parsed_corpus()
+    model = CompactParsedData.from_parsed(parsed)
+    assert to_plain(model) == parsed
+    assert model.to_dict() == parsed
+    # Keys come back in the order the parser produced them
+    assert json.dumps(to_plain(model)) == json.dumps(parsed)
+    rich = model['com/example/api/OrderResource.java']
+    assert rich['classes'][0]['method_details'][0]['throws'] == ['IOException', 'TimeoutException']
+    assert rich['interfaces'][0]['method_details'][0]['documentation'] == '/** Audit trail */'
+
+def test_keys_outside_the_schema_are_kept():
+    parsed = parsed_corpus()
+    odd = copy.deepcopy(parsed['com/example/api/OrderResource.java'])
+    odd['api_calls'] = [{'target': 'OrderService.find'}]
+    odd['origin'] = 'cache'
+    odd['classes'][0]['score'] = 0.5
+    odd['classes'][0]['method_details'][0]['line'] = 14
+    odd['classes'][0]['field_details'][0]['initializer'] = None
+    odd['classes'][0]['api_methods'][0]['deprecated'] = True
+    odd['interfaces'][0]['sealed'] = False
+    del odd['type_kinds']
+    del odd['classes'][1]['documentation']
+    parsed['Odd.java'] = odd
+    model = CompactParsedData.from_parsed(parsed)
+    assert to_plain(model['Odd.java']) == odd
+    assert to_plain(model) == parsed
+
+def test_table_scans_match_the_dict_paths():
+    parsed = parsed_corpus()
+    model = CompactParsedData.from_parsed(parsed)
+    for scan in (iter_declarations, iter_class_links, iter_api_methods):
+        assert list(scan(model)) == list(scan(parsed))
+
+def test_order_by_changes_iteration_and_scan_order():
+    parsed = parsed_corpus()
+    model = CompactParsedData.from_parsed(parsed)
+    order = sorted(parsed, reverse=True) + ['Missing.java']
+    model.order_by(order)
+    reordered = {filename: parsed[filename] for filename in order if filename in parsed}
+    assert list(model) == list(reordered)
+    assert json.dumps(to_plain(model)) == json.dumps(reordered)
+    for scan in (iter_declarations, iter_class_links, iter_api_methods):
+        assert list(scan(model)) == list(scan(reordered))
+
+def test_compact_parsed_data_threshold_and_duplicates():
+    parsed = parsed_corpus()
+    assert compact_parsed_data(parsed, min_files=len(parsed) + 1) is parsed
+    model = compact_parsed_data(parsed, min_files=1)
+    assert isinstance(model, CompactParsedData)
+    assert compact_parsed_data(model, min_files=1) is model
+    with pytest.raises(ValueError):
+        model.add_file('com/example/api/OrderResource.java', parsed['com/example/api/OrderResource.java'])
@@ -0,0 +1,62 @@
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from utils.dependency_graph import DependencyGraph
+
+def _random_edges(seed: int):
+    rng = random.Random(seed)
+    count = rng.randint(1, 60)
+    edges = [(f"n{rng.randrange(count)}", f"n{rng.randrange(count)}") for _ in range(rng.randint(0, 3 * count))]
+    return [f"n{i}" for i in range(count)], edges
+
+def _expected_depths(nodes, edges):
+    graph = nx.DiGraph(edges)
+    graph.add_nodes_from(nodes)
+    condensed = nx.condensation(graph)
+    depth = {}
+    for component in reversed(list(nx.topological_sort(condensed))):
+        depth[component] = max((depth[c] + 1 for c in condensed.successors(component)), default=0)
+    return {node: depth[condensed.graph['mapping'][node]] for node in nodes}
+
+@pytest.mark.parametrize('seed', range(200))
+def test_components_and_depths_match_networkx(seed):
+    nodes, edges = _random_edges(seed)
+    graph = DependencyGraph.from_edges(edges, nodes)
+    components = graph.components()
+
+    expected = nx.DiGraph(edges)
+    expected.add_nodes_from(nodes)
+    partition = {frozenset(c) for c in nx.strongly_connected_components(expected)}
+    found = {}
+    for name, component in zip(graph.names, components.tolist()):
+        found.setdefault(component, set()).add(name)
+    assert {frozenset(c) for c in found.values()} == partition
+
+    # A component only depends on lower-numbered ones
+    for source, target in edges:
+        assert components[graph.ids[target]] <= components[graph.ids[source]]
+
+    depths = dict(zip(graph.names, graph.depths().tolist()))
+    assert depths == _expected_depths(nodes, edges)
+
+LONG = 100_000
+
+def test_long_chain():
+    names = [f"n{i}" for i in range(LONG)]
+    graph = DependencyGraph.from_edges(zip(names, names[1:]), names)
+    assert graph.depths().tolist() == list(range(LONG - 1, -1, -1))
+    assert graph.cycles() == []
+
+def test_long_ring():
+    names = [f"n{i}" for i in range(LONG)]
+    graph = DependencyGraph.from_edges(zip(names, names[1:] + names[:1]), names)
+    assert len(np.unique(graph.components())) == 1
+    assert not graph.depths().any()
+    assert len(graph.cycles()) == 1 and len(graph.cycles()[0]) == LONG
+
+def test_ring_with_tail_counts_cycle_as_one_step():
+    graph = DependencyGraph.from_edges([('a', 'b'), ('b', 'c'), ('c', 'b'), ('c', 'd'), ('d', 'd')])
+    depths = dict(zip(graph.names, graph.depths().tolist()))
+    assert depths == {'a': 2, 'b': 1, 'c': 1, 'd': 0}
+    assert graph.cycles() == [['b', 'c']]
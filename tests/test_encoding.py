@@ -0,0 +1,44 @@
+import io
+from utils import encoding as encoding_module
+from utils.encoding import EncodingDetector
+from utils.file_handler import iter_java_files
+
+class Upload(io.BytesIO):
+    def __init__(self, name: str, content: bytes):
+        super().__init__(content)
+        self.name = name
+
+def late_non_ascii_source(sample_bytes: int) -> str:
+    padding = '// ' + 'x' * 60 + '\n'
+    body = padding * (sample_bytes // len(padding) + 1)
+    return f"{body}class Late {{ String s = \"café\"; }}\n"
+
+def test_late_non_ascii_byte_is_decoded():
+    detector = EncodingDetector(sample_bytes=4096)
+    source = late_non_ascii_source(4096)
+    content = source.encode('cp1252')
+    assert content.index(b'\xe9') > 4096
+    text, encoding = detector.decode(content, 'src/Late.java')
+    assert text == source
+    assert detector.stats['replaced'] == 0
+
+def test_undetectable_bytes_are_replaced_not_dropped(monkeypatch):
+    monkeypatch.setattr(encoding_module.chardet, 'detect', lambda content: {'encoding': 'ascii'})
+    detector = EncodingDetector(sample_bytes=4096)
+    content = late_non_ascii_source(4096).encode('cp1252') + b'// \x81\n'
+    text, encoding = detector.decode(content, 'src/Late.java')
+    assert encoding == 'cp1252'
+    assert 'café' in text and '\ufffd' in text
+    assert (detector.stats['detected'], detector.stats['replaced']) == (2, 1)
+    assert not detector.remembered
+
+def test_late_non_ascii_file_reaches_the_analysis():
+    source = late_non_ascii_source(64 * 1024)
+    files = dict(iter_java_files([Upload('Late.java', source.encode('cp1252'))]))
+    assert files == {'Late.java': source}
+
+def test_utf8_fast_path_strips_bom():
+    detector = EncodingDetector()
+    text, encoding = detector.decode('\ufeffclass A {}'.encode('utf-8'), 'A.java')
+    assert (text, encoding) == ('class A {}', 'utf-8')
+    assert detector.stats['utf8_fast_path'] == 1
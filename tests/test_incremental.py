@@ -0,0 +1,95 @@
+import random
+from collections import Counter
+import pytest
+from benchmarks.corpus import generate_corpus
+from utils.code_parser import parse_java_source
+from utils.incremental import IncrementalAnalyzer
+from utils.relationship_analyzer import analyze_relationships
+
+@pytest.fixture(autouse=True)
+def no_parse_cache(monkeypatch):
+    monkeypatch.setenv('JAVA_ANALYZER_CACHE', '0')
+
+def snapshot(relationships):
+    """
+    Everything a full analysis produces, with list order ignored since
+    incremental updates do not preserve it
+    """
+    graph = relationships['graph']
+    return {
+        **{key: Counter(tuple(sorted(entry.items())) for entry in relationships[key])
+           for key in ('inheritance', 'implementation', 'associations')},
+        'dependencies': set(relationships['dependencies']),
+        'nodes': set(graph.nodes()),
+        'edges': {(source, target): data['type'] for source, target, data in graph.edges(data=True)},
+        'files': set(relationships['parsed_data'])
+    }
+
+def assert_matches_full_analysis(analyzer):
+    expected = snapshot(analyze_relationships(dict(analyzer.parsed_data)))
+    assert snapshot(analyzer.relationships) == expected
+
+def parse_all(sources):
+    return {filename: parse_java_source(source) for filename, source in sources.items()}
+
+def test_random_change_sets_match_full_analysis():
+    rng = random.Random(7)
+    corpus = parse_all(generate_corpus(80, classes_per_file=2, seed=5))
+    # A second generation of the same files: same names, different members and links
+    variants = parse_all(generate_corpus(80, classes_per_file=2, seed=6))
+    filenames = sorted(corpus)
+    present = set(rng.sample(filenames, 40))
+    analyzer = IncrementalAnalyzer({filename: corpus[filename] for filename in present})
+    assert_matches_full_analysis(analyzer)
+
+    for _ in range(25):
+        added = rng.sample(sorted(set(filenames) - present), rng.randint(0, 5))
+        removed = rng.sample(sorted(present), rng.randint(0, 5))
+        modified = rng.sample(sorted(present - set(removed)), rng.randint(0, 5))
+        changed = {filename: corpus[filename] for filename in added}
+        changed.update({filename: rng.choice((corpus, variants))[filename] for filename in modified})
+        analyzer.update_parsed(changed, removed)
+        present = (present | set(added)) - set(removed)
+        assert set(analyzer.parsed_data) == present
+        assert_matches_full_analysis(analyzer)
+
+    analyzer.update_parsed({}, sorted(present))
+    assert_matches_full_analysis(analyzer)
+    assert analyzer.relationships['graph'].number_of_nodes() == 0
+
+SHADOWED = {
+    'app/Client.java': """
+        package com.app;
+        import com.lib.*;
+        public class Client extends Helper { private Helper helper; }
+    """,
+    'lib/Helper.java': """
+        package com.lib;
+        public class Helper {}
+    """
+}
+LOCAL_HELPER = """
+    package com.app;
+    public class Helper implements Runnable {}
+"""
+
+def test_declaring_a_shadowing_type_updates_referencing_files():
+    analyzer = IncrementalAnalyzer(parse_all(SHADOWED))
+    assert analyzer.relationships['inheritance'] == [{'from': 'com.app.Client', 'to': 'com.lib.Helper'}]
+
+    # A same-package Helper takes precedence over the wildcard import
+    analyzer.update_parsed(parse_all({'app/Helper.java': LOCAL_HELPER}))
+    assert_matches_full_analysis(analyzer)
+    assert analyzer.relationships['inheritance'] == [{'from': 'com.app.Client', 'to': 'com.app.Helper'}]
+
+    analyzer.update_parsed({}, ['app/Helper.java'])
+    assert_matches_full_analysis(analyzer)
+    assert analyzer.relationships['inheritance'] == [{'from': 'com.app.Client', 'to': 'com.lib.Helper'}]
+
+def test_update_parses_sources_and_drops_files_that_no_longer_parse():
+    analyzer = IncrementalAnalyzer()
+    analyzer.update(added=SHADOWED, max_workers=1)
+    assert_matches_full_analysis(analyzer)
+    analyzer.update(modified={'lib/Helper.java': 'package com.lib; class {'}, max_workers=1)
+    assert set(analyzer.parsed_data) == {'app/Client.java'}
+    assert_matches_full_analysis(analyzer)
@@ -0,0 +1,74 @@
+import random
+from typing import Dict
+import pytest
+from utils.manifest import count_lines
+
+def reference_count_lines(text: str) -> Dict[str, int]:
+    """
+    The original per-character scan that count_lines must agree with
+    """
+    counts = {'lines': 0, 'blank': 0, 'comment': 0, 'code': 0}
+    in_block = False
+
+    for line in text.splitlines():
+        counts['lines'] += 1
+        stripped = line.strip()
+        if not stripped:
+            counts[('comment' if in_block else 'blank')] += 1
+            continue
+
+        has_code = False
+        i, length = 0, len(stripped)
+        while i < length:
+            if in_block:
+                end = stripped.find('*/', i)
+                if end < 0:
+                    break
+                in_block = False
+                i = end + 2
+                continue
+            char = stripped[i]
+            if stripped.startswith('//', i):
+                break
+            if stripped.startswith('/*', i):
+                in_block = True
+                i += 2
+                continue
+            if not char.isspace():
+                has_code = True
+            if char in '"\'':
+                i += 1
+                while i < length and stripped[i] != char:
+                    i += 2 if stripped[i] == '\\' else 1
+            i += 1
+
+        counts['code' if has_code else 'comment'] += 1
+
+    return counts
+
+@pytest.mark.parametrize('text', [
+    '*// \n"""\nx/*\n"""',
+    '/*//c\n\n*/',
+    '/*//c\n  \nx */ y\n',
+    'a /* b c */\x85d',
+    'x = "open // not a comment\n// comment',
+    "c = '\\\\'; // comment\n",
+    's = "ends with backslash\\\n/* block */',
+    '/* open at the end\n',
+    '/* open at the end\r\n\r\n',
+    'code\0\n/*\0*/\n',
+    '\x1f/**/\x1f\n',
+    '',
+])
+def test_count_lines_matches_reference_examples(text):
+    assert count_lines(text) == reference_count_lines(text)
+
+_ALPHABET = ['/', '*', '"', "'", '\\', ' ', '\t', 'x', '\n', '\r', '\r\n', '\x0c', '\x1f', '\x85',
+             ' ', '\0', '//', '/*', '*/', '"""']
+
+@pytest.mark.parametrize('seed', range(20))
+def test_count_lines_matches_reference_fuzzed(seed):
+    rng = random.Random(seed)
+    for _ in range(1000):
+        text = ''.join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 40)))
+        assert count_lines(text) == reference_count_lines(text), repr(text)
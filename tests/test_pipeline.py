@@ -0,0 +1,34 @@
+import io
+import pytest
+from benchmarks.corpus import generate_corpus
+from utils import isolated_parser, pipeline
+from utils.pipeline import run_pipeline
+
+class Upload(io.BytesIO):
+    def __init__(self, name: str, content: str):
+        super().__init__(content.encode('utf-8'))
+        self.name = name
+
+@pytest.fixture(autouse=True)
+def no_parse_cache(monkeypatch):
+    monkeypatch.setenv('JAVA_ANALYZER_CACHE', '0')
+
+@pytest.mark.parametrize('out_of_core', [True, False])
+def test_nothing_parses_gives_empty_relationships(out_of_core):
+    analysis = run_pipeline([Upload('Broken.java', 'class { nope')], out_of_core=out_of_core)
+    assert analysis['out_of_core'] is out_of_core
+    assert len(analysis['parse_failures']) == 1
+    assert analysis['relationships']['graph'].number_of_nodes() == 0
+    assert analysis['relationships']['inheritance'] == []
+
+def test_out_of_core_batches_share_parser_processes(monkeypatch):
+    monkeypatch.setattr(pipeline, 'OUT_OF_CORE_BATCH_FILES', 60)
+    started = []
+    init = isolated_parser._Worker.__init__
+    monkeypatch.setattr(isolated_parser._Worker, '__init__',
+                        lambda worker, *args: started.append(worker) or init(worker, *args))
+    files = generate_corpus(300)
+    analysis = run_pipeline([Upload(name, content) for name, content in files.items()], out_of_core=True)
+    assert len(analysis['parsed_data']) == len(files)
+    # Five batches of 60 files, all parsed by the one process of a single pool
+    assert len(started) == 1
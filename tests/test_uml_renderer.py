@@ -0,0 +1,41 @@
+import pytest
+from utils import uml_renderer
+from utils.uml_renderer import DEFAULT_SERVER_URL, UmlRenderer
+
+SOURCE = "@startuml\nclass A\n@enduml"
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("diagram sent to a PlantUML server")
+    monkeypatch.setattr(uml_renderer.plantuml, 'PlantUML', fail)
+
+def renderer(monkeypatch, server=None):
+    if server is None:
+        monkeypatch.delenv('JAVA_ANALYZER_PLANTUML_SERVER', raising=False)
+    else:
+        monkeypatch.setenv('JAVA_ANALYZER_PLANTUML_SERVER', server)
+    return UmlRenderer(pool_size=1, command=[])
+
+def test_no_server_is_used_by_default(monkeypatch, no_network):
+    default = renderer(monkeypatch)
+    assert default.server_url is None and not default.available
+    with pytest.raises(RuntimeError):
+        default.render(SOURCE)
+    [(index, svg, error)] = list(default.render_many([SOURCE]))
+    assert svg is None and 'no PlantUML server' in error
+    default.close()
+
+@pytest.mark.parametrize('server, url', [
+    ('0', None),
+    ('1', DEFAULT_SERVER_URL),
+    ('https://plantuml.internal/svg/', 'https://plantuml.internal/svg/'),
+])
+def test_server_is_opt_in(monkeypatch, server, url):
+    configured = renderer(monkeypatch, server)
+    assert configured.server_url == url
+    assert configured.available is (url is not None)
+    configured.close()
+
+def test_public_server_uses_https():
+    assert DEFAULT_SERVER_URL.startswith('https://')
@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+import networkx as nx
+from utils import visualizer
+from utils.visualizer import compute_layout
+
+def test_layout_cache_is_shared_safely_between_threads(monkeypatch):
+    monkeypatch.setattr(visualizer, '_LAYOUT_CACHE_SIZE', 4)
+    monkeypatch.setattr(visualizer, '_layout_cache', visualizer.OrderedDict())
+    graphs = [nx.path_graph(3 + i % 8, create_using=nx.DiGraph) for i in range(400)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        layouts = list(executor.map(compute_layout, graphs))
+    assert all(set(pos) == set(graph) for graph, pos in zip(graphs, layouts))
+    assert len(visualizer._layout_cache) == 4
+
+def test_layout_is_reused_for_an_equal_graph(monkeypatch):
+    monkeypatch.setattr(visualizer, '_layout_cache', visualizer.OrderedDict())
+    first = compute_layout(nx.DiGraph([('A', 'B'), ('B', 'C')]))
+    assert compute_layout(nx.DiGraph([('A', 'B'), ('B', 'C')])) is first
@@ -0,0 +1,351 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional
+import networkx as nx
+from utils.compact_model import compact_parsed_data, to_plain
+from utils.instrumentation import Profiler
+from utils.symbol_table import SymbolTable, FileScope, qualified_name
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    files INTEGER NOT NULL,
+    meta TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    package TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (analysis_id, path)
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, path)
+);
+CREATE TABLE IF NOT EXISTS types (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    fqn TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS types_fqn ON types(analysis_id, fqn);
+CREATE INDEX IF NOT EXISTS types_name ON types(analysis_id, name);
+CREATE TABLE IF NOT EXISTS relations (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    target_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS relations_target ON relations(analysis_id, kind, target, source);
+CREATE INDEX IF NOT EXISTS relations_target_name ON relations(analysis_id, kind, target_name, source);
+CREATE TABLE IF NOT EXISTS associations (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    field TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dependencies_target ON dependencies(analysis_id, target, source);
+CREATE TABLE IF NOT EXISTS endpoints (
+    id INTEGER PRIMARY KEY,
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    class TEXT NOT NULL,
+    method TEXT NOT NULL,
+    api_type TEXT NOT NULL,
+    annotations TEXT NOT NULL,
+    parameters TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS endpoints_analysis ON endpoints(analysis_id);
+CREATE TABLE IF NOT EXISTS endpoint_types (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    endpoint_id INTEGER NOT NULL REFERENCES endpoints(id) ON DELETE CASCADE,
+    type_name TEXT NOT NULL,
+    type_fqn TEXT
+);
+CREATE INDEX IF NOT EXISTS endpoint_types_name ON endpoint_types(analysis_id, type_name);
+CREATE INDEX IF NOT EXISTS endpoint_types_endpoint ON endpoint_types(endpoint_id);
+'''
+
+# Identifiers in a type such as Map<String, List<Order>>
+_TYPE_NAMES = re.compile(r'[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*')
+
+def default_store_path() -> str:
+    """
+    Location of the analysis store, overridable with JAVA_ANALYZER_STORE
+    """
+    return os.environ.get('JAVA_ANALYZER_STORE') or os.path.join(
+        os.path.expanduser('~'), '.local', 'share', 'java_analyzer', 'analyses.sqlite')
+
+def _simple_name(name: str) -> str:
+    return name.rsplit('.', 1)[-1]
+
+def _type_names(type_name: str) -> List[str]:
+    """
+    Names of a type and its type arguments as written, e.g. List<Order> -> List, Order
+    """
+    return list(dict.fromkeys(_TYPE_NAMES.findall(type_name)))
+
+class AnalysisStore:
+    """
+    Local SQLite database of saved analyses.
+
+    Each analysis keeps its parsed files as compressed JSON, the manifest,
+    and the relationship lists, dependency set, declared types and API
+    endpoints as indexed rows, so stored analyses can be reopened without
+    re-parsing and queried without loading them.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_store_path()
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(endpoint_types)')}
+        if 'type_fqn' not in columns:
+            # Stores written before parameter types were resolved keep NULL here
+            self._conn.execute('ALTER TABLE endpoint_types ADD COLUMN type_fqn TEXT')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS endpoint_types_fqn ON endpoint_types(analysis_id, type_fqn)')
+
+    def save(self, analysis: Dict[str, Any], name: str) -> int:
+        """
+        Store an analysis under a name, replacing any analysis of that name.
+        Returns the id of the stored analysis.
+        """
+        parsed_data = analysis['parsed_data']
+        relationships = analysis['relationships']
+        symbols = relationships.get('symbol_table') if relationships is not None else None
+        if symbols is None:
+            symbols = SymbolTable.build(parsed_data)
+        meta = {
+            'detail': analysis.get('detail', 'full'),
+            'encoding_stats': analysis.get('encoding_stats', {}),
+            'parse_failures': analysis.get('parse_failures', [])
+        }
+
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM analyses WHERE name = ?', (name,))
+            analysis_id = self._conn.execute(
+                'INSERT INTO analyses (name, created_at, files, meta) VALUES (?, ?, ?, ?)',
+                (name, time.time(), len(analysis['manifest']), json.dumps(meta))
+            ).lastrowid
+
+            files, types = [], []
+            for path, file_data in parsed_data.items():
+                plain = to_plain(file_data)
+                package = plain.get('package')
+                files.append((analysis_id, path, package, zlib.compress(
+                    json.dumps(plain, separators=(',', ':')).encode('utf-8'))))
+                for kind, declarations in (('class', plain['classes']), ('interface', plain['interfaces'])):
+                    for declaration in declarations:
+                        types.append((analysis_id, qualified_name(package, declaration['name']),
+                                      declaration['name'], kind, path))
+                self._insert_endpoints(analysis_id, package, plain, symbols)
+            self._conn.executemany('INSERT INTO files VALUES (?, ?, ?, ?)', files)
+            self._conn.executemany('INSERT INTO types VALUES (?, ?, ?, ?, ?)', types)
+
+            self._conn.executemany('INSERT INTO manifest VALUES (?, ?, ?)', [
+                (analysis_id, path, json.dumps(entry)) for path, entry in analysis['manifest'].items()])
+
+            if relationships is not None:
+                self._conn.executemany('INSERT INTO relations VALUES (?, ?, ?, ?, ?)', [
+                    (analysis_id, kind, relation['from'], relation['to'], _simple_name(relation['to']))
+                    for kind in ('inheritance', 'implementation') for relation in relationships[kind]])
+                self._conn.executemany('INSERT INTO associations VALUES (?, ?, ?)', [
+                    (analysis_id, association['from'], association['field'])
+                    for association in relationships['associations']])
+                self._conn.executemany('INSERT INTO dependencies VALUES (?, ?, ?)', [
+                    (analysis_id, source, target) for source, target in relationships['dependencies']])
+        return analysis_id
+
+    def _insert_endpoints(self, analysis_id: int, package: Optional[str], file_data: Dict[str, Any],
+                          symbols: SymbolTable):
+        # Parameter types are stored by simple name and, resolved through the
+        # symbol table, by fully-qualified name
+        scope = FileScope(package, file_data['imports'])
+        for class_info in file_data['classes']:
+            class_name = qualified_name(package, class_info['name'])
+            for api_method in class_info.get('api_methods', []):
+                endpoint_id = self._conn.execute(
+                    'INSERT INTO endpoints (analysis_id, class, method, api_type, annotations, parameters) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (analysis_id, class_name, api_method['method'], api_method['type'],
+                     json.dumps(api_method['annotations']), json.dumps(api_method['parameters']))
+                ).lastrowid
+                type_names = dict.fromkeys(name for parameter in api_method['parameters']
+                                           for name in _type_names(parameter['type']))
+                self._conn.executemany('INSERT INTO endpoint_types VALUES (?, ?, ?, ?)', [
+                    (analysis_id, endpoint_id, _simple_name(name), symbols.resolve(name, scope))
+                    for name in type_names])
+
+    def list_analyses(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, name, created_at, files FROM analyses ORDER BY created_at DESC').fetchall()
+        return [{'id': row[0], 'name': row[1], 'created_at': row[2], 'files': row[3]} for row in rows]
+
+    def find(self, name: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute('SELECT id FROM analyses WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, analysis_id: int):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
+
+    def load(self, analysis_id: int) -> Dict[str, Any]:
+        """
+        Rebuild an analysis in the shape run_pipeline returns. Source text is
+        not stored, so 'processed_files' is empty and 'stored' is set.
+        """
+        profiler = Profiler()
+        with profiler.stage('load stored analysis') as record, self._lock:
+            row = self._conn.execute('SELECT name, meta FROM analyses WHERE id = ?', (analysis_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"No stored analysis with id {analysis_id}")
+            name, meta = row[0], json.loads(row[1])
+
+            parsed_data = {path: json.loads(zlib.decompress(data)) for path, data in self._conn.execute(
+                'SELECT path, data FROM files WHERE analysis_id = ? ORDER BY rowid', (analysis_id,))}
+            manifest = {path: json.loads(entry) for path, entry in self._conn.execute(
+                'SELECT path, entry FROM manifest WHERE analysis_id = ? ORDER BY rowid', (analysis_id,))}
+
+            relationships = {'inheritance': [], 'implementation': [], 'associations': [], 'dependencies': set()}
+            graph = nx.DiGraph()
+            for kind, source, target in self._conn.execute(
+                    'SELECT kind, source, target FROM relations WHERE analysis_id = ? ORDER BY rowid', (analysis_id,)):
+                relationships[kind].append({'from': source, 'to': target})
+                graph.add_edge(source, target, type=kind)
+            relationships['associations'] = [{'from': source, 'field': field} for source, field in self._conn.execute(
+                'SELECT source, field FROM associations WHERE analysis_id = ? ORDER BY rowid', (analysis_id,))]
+            relationships['dependencies'] = set(self._conn.execute(
+                'SELECT source, target FROM dependencies WHERE analysis_id = ?', (analysis_id,)))
+            record['items'] = len(parsed_data)
+
+        parsed_data = compact_parsed_data(parsed_data)
+        relationships['parsed_data'] = parsed_data
+        relationships['symbol_table'] = SymbolTable.build(parsed_data)
+        relationships['graph'] = graph
+
+        return {
+            'processed_files': {},
+            'manifest': manifest,
+            'parsed_data': parsed_data,
+            'relationships': relationships,
+            'encoding_stats': meta['encoding_stats'],
+            'parse_failures': meta['parse_failures'],
+            'performance': profiler,
+            'out_of_core': False,
+            'detail': meta['detail'],
+            'stored': name
+        }
+
+    def implementors(self, analysis_id: int, interface: str) -> List[str]:
+        """
+        Classes implementing an interface, given by simple or fully-qualified name
+        """
+        return self._related(analysis_id, 'implementation', interface)
+
+    def subclasses(self, analysis_id: int, parent: str) -> List[str]:
+        """
+        Classes directly extending a class, given by simple or fully-qualified name
+        """
+        return self._related(analysis_id, 'inheritance', parent)
+
+    def _related(self, analysis_id: int, kind: str, target: str) -> List[str]:
+        column = 'target' if '.' in target else 'target_name'
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT DISTINCT source FROM relations WHERE analysis_id = ? AND kind = ? AND {column} = ? '
+                'ORDER BY source', (analysis_id, kind, target)).fetchall()
+        return [row[0] for row in rows]
+
+    def dependents(self, analysis_id: int, target: str) -> List[str]:
+        """
+        Classes that import or take a type as an endpoint parameter
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT source FROM dependencies WHERE analysis_id = ? AND target = ? ORDER BY source',
+                (analysis_id, target)).fetchall()
+        return [row[0] for row in rows]
+
+    def find_types(self, analysis_id: int, name: str) -> List[Dict[str, str]]:
+        """
+        Declared classes and interfaces by simple or fully-qualified name
+        """
+        column = 'fqn' if '.' in name else 'name'
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT fqn, kind, path FROM types WHERE analysis_id = ? AND {column} = ? ORDER BY fqn',
+                (analysis_id, name)).fetchall()
+        return [{'fqn': fqn, 'kind': kind, 'path': path} for fqn, kind, path in rows]
+
+    def endpoints_taking(self, analysis_id: int, type_name: str) -> List[Dict[str, Any]]:
+        """
+        REST and SOAP endpoints with a parameter of the given type, including
+        as a type argument (List<Order> matches Order). The type is given by
+        simple or fully-qualified name.
+        """
+        if '.' in type_name:
+            # Older stores have no resolved names; fall back to the simple name there
+            condition = 't.type_fqn = ? OR (t.type_fqn IS NULL AND t.type_name = ?)'
+            parameters = (analysis_id, type_name, _simple_name(type_name))
+        else:
+            condition = 't.type_name = ?'
+            parameters = (analysis_id, type_name)
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT e.class, e.method, e.api_type, e.annotations, e.parameters '
+                'FROM endpoint_types t JOIN endpoints e ON e.id = t.endpoint_id '
+                f'WHERE t.analysis_id = ? AND ({condition}) ORDER BY e.class, e.method',
+                parameters).fetchall()
+        return [{
+            'class': class_name,
+            'method': method,
+            'type': api_type,
+            'annotations': json.loads(annotations),
+            'parameters': json.loads(parameters)
+        } for class_name, method, api_type, annotations, parameters in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """
+    Return the process-wide analysis store, or None if it cannot be opened
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = AnalysisStore()
+            except (OSError, sqlite3.Error):
+                return None
+    return _default_store
@@ -1,89 +1,310 @@
 import javalang
-from typing import Dict, List, Any
-import streamlit as st
+import os
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from utils.reporting import warn
+from utils.parse_cache import ParseCache, content_key
+from utils.isolated_parser import ParserPool, get_parse_limits, parse_isolated
+from utils.compact_model import CompactParsedData
 
-def parse_java_files(files: Dict[str, str]) -> Dict[str, Any]:
+# Bump whenever the shape of class_info changes so cached results are not reused
+PARSER_VERSION = '5'
+
+# Uploads smaller than this are parsed by a single worker process
+PARALLEL_MIN_FILES = 200
+# Number of files handed to a worker process at a time
+PARSE_CHUNK_SIZE = 64
+# Number of files looked up in or written to the parse cache at a time
+CACHE_BATCH_FILES = 256
+
+REST_ANNOTATIONS = ['GET', 'POST', 'PUT', 'DELETE', 'RequestMapping']
+SOAP_ANNOTATIONS = ['WebService', 'WebMethod']
+
+def get_worker_count(max_workers: Optional[int] = None) -> int:
     """
-    Parse Java files and extract class information including API calls
+    Resolve the number of parser processes, honouring JAVA_ANALYZER_WORKERS
     """
-    parsed_data = {}
+    if max_workers is None:
+        max_workers = int(os.environ.get('JAVA_ANALYZER_WORKERS', 0)) or os.cpu_count() or 1
+    return max(1, max_workers)
 
-    for filename, content in files.items():
-        try:
-            tree = javalang.parse.parse(content)
-
-            class_info = {
-                'classes': [],
-                'interfaces': [],
-                'imports': [],
-                'package': None,
-                'api_calls': []  # New field for API calls
-            }
-
-            # Extract package
-            if tree.package:
-                class_info['package'] = tree.package.name
-
-            # Extract imports
-            class_info['imports'] = [imp.path for imp in tree.imports]
-
-            # Extract classes and interfaces
-            for path, node in tree.filter(javalang.tree.TypeDeclaration):
-                if isinstance(node, javalang.tree.ClassDeclaration):
-                    # Extract REST/SOAP annotations and methods
-                    api_methods = []
-                    for method in node.methods:
-                        annotations = [a.name for a in method.annotations] if method.annotations else []
-
-                        # Check for REST annotations
-                        rest_annotations = ['GET', 'POST', 'PUT', 'DELETE', 'RequestMapping']
-                        if any(annot in rest_annotations for annot in annotations):
-                            api_methods.append({
-                                'type': 'REST',
-                                'method': method.name,
-                                'annotations': annotations,
-                                'parameters': [
-                                    {
-                                        'name': param.name,
-                                        'type': param.type.name if hasattr(param.type, 'name') else str(param.type)
-                                    } for param in method.parameters
-                                ]
-                            })
-
-                        # Check for SOAP annotations
-                        soap_annotations = ['WebService', 'WebMethod']
-                        if any(annot in soap_annotations for annot in annotations):
-                            api_methods.append({
-                                'type': 'SOAP',
-                                'method': method.name,
-                                'annotations': annotations,
-                                'parameters': [
-                                    {
-                                        'name': param.name,
-                                        'type': param.type.name if hasattr(param.type, 'name') else str(param.type)
-                                    } for param in method.parameters
-                                ]
-                            })
-
-                    class_info['classes'].append({
-                        'name': node.name,
-                        'extends': node.extends.name if node.extends else None,
-                        'implements': [impl.name for impl in node.implements] if node.implements else [],
-                        'methods': [method.name for method in node.methods],
-                        'fields': [field.declarators[0].name for field in node.fields],
-                        'api_methods': api_methods  # Add API methods to class info
+# Canonical Java modifier order, used to render the unordered sets javalang returns
+MODIFIER_ORDER = ['public', 'protected', 'private', 'abstract', 'static', 'final', 'transient',
+                  'volatile', 'synchronized', 'native', 'strictfp', 'default']
+
+def _type_name(type_node, with_dimensions: bool = False) -> str:
+    """
+    Name of a type reference, keeping qualifiers such as java.io.Serializable
+    """
+    if not hasattr(type_node, 'name'):
+        return str(type_node)
+    parts = []
+    current = type_node
+    while current is not None:
+        parts.append(current.name)
+        current = getattr(current, 'sub_type', None)
+    name = '.'.join(parts)
+    if with_dimensions and type_node.dimensions:
+        name += '[]' * len(type_node.dimensions)
+    return name
+
+def _sorted_modifiers(modifiers) -> List[str]:
+    return sorted(modifiers or [], key=lambda m: MODIFIER_ORDER.index(m) if m in MODIFIER_ORDER else len(MODIFIER_ORDER))
+
+def _extract_parameters(method) -> List[Dict[str, str]]:
+    return [
+        {
+            'name': param.name,
+            'type': _type_name(param.type)
+        } for param in method.parameters
+    ]
+
+def _method_details(method) -> Dict[str, Any]:
+    """
+    Signature and Javadoc of a method, captured in the same AST walk
+    """
+    return {
+        'name': method.name,
+        'documentation': method.documentation or '',
+        'parameters': [
+            {
+                'name': param.name,
+                'type': _type_name(param.type, with_dimensions=True) + ('...' if param.varargs else '')
+            } for param in method.parameters
+        ],
+        'return_type': _type_name(method.return_type, with_dimensions=True) if method.return_type else 'void',
+        'modifiers': _sorted_modifiers(method.modifiers),
+        'annotations': [a.name for a in method.annotations] if method.annotations else [],
+        'throws': list(method.throws or [])
+    }
+
+def _field_details(field) -> List[Dict[str, Any]]:
+    return [
+        {
+            'name': declarator.name,
+            'type': _type_name(field.type, with_dimensions=True),
+            'documentation': field.documentation or '',
+            'modifiers': _sorted_modifiers(field.modifiers)
+        } for declarator in field.declarators
+    ]
+
+def parse_java_source(content: str) -> Dict[str, Any]:
+    """
+    Parse a single Java source file and extract its class information
+    """
+    tree = javalang.parse.parse(content)
+
+    class_info = {
+        'classes': [],
+        'interfaces': [],
+        'imports': [],
+        'package': None,
+        'api_calls': [],  # New field for API calls
+        'type_kinds': []
+    }
+
+    # Extract package
+    if tree.package:
+        class_info['package'] = tree.package.name
+
+    # Extract imports, keeping the '.*' of wildcard imports for name resolution
+    # and the 'static ' of static imports, as written in the source
+    class_info['imports'] = [('static ' if imp.static else '') + (f"{imp.path}.*" if imp.wildcard else imp.path)
+                             for imp in tree.imports]
+
+    # Record the kinds of the top-level declarations
+    for node in tree.types:
+        if isinstance(node, javalang.tree.InterfaceDeclaration):
+            class_info['type_kinds'].append('interface')
+        elif isinstance(node, javalang.tree.EnumDeclaration):
+            class_info['type_kinds'].append('enum')
+        elif isinstance(node, javalang.tree.AnnotationDeclaration):
+            class_info['type_kinds'].append('annotation')
+        else:
+            class_info['type_kinds'].append('class')
+
+    # Extract classes and interfaces
+    for path, node in tree.filter(javalang.tree.TypeDeclaration):
+        if isinstance(node, javalang.tree.ClassDeclaration):
+            # Extract REST/SOAP annotations and methods
+            api_methods = []
+            for method in node.methods:
+                annotations = [a.name for a in method.annotations] if method.annotations else []
+
+                # Check for REST annotations
+                if any(annot in REST_ANNOTATIONS for annot in annotations):
+                    api_methods.append({
+                        'type': 'REST',
+                        'method': method.name,
+                        'annotations': annotations,
+                        'parameters': _extract_parameters(method)
                     })
-                elif isinstance(node, javalang.tree.InterfaceDeclaration):
-                    class_info['interfaces'].append({
-                        'name': node.name,
-                        'extends': [ext.name for ext in node.extends] if node.extends else [],
-                        'methods': [method.name for method in node.methods]
+
+                # Check for SOAP annotations
+                if any(annot in SOAP_ANNOTATIONS for annot in annotations):
+                    api_methods.append({
+                        'type': 'SOAP',
+                        'method': method.name,
+                        'annotations': annotations,
+                        'parameters': _extract_parameters(method)
                     })
 
-            parsed_data[filename] = class_info
+            class_info['classes'].append({
+                'name': node.name,
+                'extends': _type_name(node.extends) if node.extends else None,
+                'implements': [_type_name(impl) for impl in node.implements] if node.implements else [],
+                'methods': [method.name for method in node.methods],
+                'fields': [field.declarators[0].name for field in node.fields],
+                'api_methods': api_methods,  # Add API methods to class info
+                'documentation': node.documentation or '',
+                'modifiers': _sorted_modifiers(node.modifiers),
+                'annotations': [a.name for a in node.annotations] if node.annotations else [],
+                'method_details': [_method_details(method) for method in node.methods],
+                'field_details': [d for field in node.fields for d in _field_details(field)]
+            })
+        elif isinstance(node, javalang.tree.InterfaceDeclaration):
+            class_info['interfaces'].append({
+                'name': node.name,
+                'extends': [_type_name(ext) for ext in node.extends] if node.extends else [],
+                'methods': [method.name for method in node.methods],
+                'documentation': node.documentation or '',
+                'modifiers': _sorted_modifiers(node.modifiers),
+                'annotations': [a.name for a in node.annotations] if node.annotations else [],
+                'method_details': [_method_details(method) for method in node.methods]
+            })
+
+    return class_info
 
+def _parse_chunk(chunk: List[Tuple[str, str]]) -> List[Tuple[str, Optional[Dict], Optional[str], float]]:
+    """
+    Parse a batch of (filename, content) pairs in the current process.
+    Errors are returned as strings so one bad file does not fail the batch.
+    """
+    results = []
+    for filename, content in chunk:
+        start = time.perf_counter()
+        try:
+            results.append((filename, parse_java_source(content), None, time.perf_counter() - start))
         except Exception as e:
-            st.warning(f"Error parsing {filename}: {str(e)}")
-            continue
+            results.append((filename, None, str(e), time.perf_counter() - start))
+    return results
+
+def _chunked(items: List[Tuple[str, str]], size: int) -> List[List[Tuple[str, str]]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+class _ParseResults:
+    """
+    Parse results gathered as they arrive, into a plain dict or straight into
+    a CompactParsedData so the whole upload is never held as dicts at once.
+    Fresh results are written to the cache in batches.
+    """
+
+    def __init__(self, compact: bool, cache: Optional[ParseCache], keys: Dict[str, str]):
+        self.data = CompactParsedData() if compact else {}
+        self.cache = cache
+        self.keys = keys
+        self.unsaved = {}
+        self.errors = []
+
+    def add(self, filename: str, class_info: Dict[str, Any], fresh: bool = True):
+        if isinstance(self.data, CompactParsedData):
+            self.data.add_file(filename, class_info)
+        else:
+            self.data[filename] = class_info
+        if fresh and self.cache is not None:
+            self.unsaved[self.keys[filename]] = class_info
+            if len(self.unsaved) >= CACHE_BATCH_FILES:
+                self.save()
+
+    def save(self):
+        if self.unsaved:
+            self.cache.put_many(self.unsaved)
+            self.unsaved = {}
+
+    def finish(self, filenames: List[str]):
+        """
+        Flush the cache and return the results in upload order
+        """
+        self.save()
+        if isinstance(self.data, CompactParsedData):
+            self.data.order_by(filenames)
+            return self.data
+        return {filename: self.data[filename] for filename in filenames if filename in self.data}
+
+def parse_java_files(files: Dict[str, str], max_workers: Optional[int] = None,
+                     chunk_size: int = PARSE_CHUNK_SIZE,
+                     cache: Optional[ParseCache] = None,
+                     failures: Optional[List[Dict[str, Any]]] = None,
+                     timeout: Optional[float] = None,
+                     memory_limit_mb: Optional[int] = None,
+                     isolate: bool = True,
+                     on_file: Optional[Callable[[str, float], None]] = None,
+                     compact_min_files: Optional[int] = None,
+                     pool: Optional[ParserPool] = None) -> Dict[str, Any]:
+    """
+    Parse Java files and extract class information including API calls.
+
+    Files are parsed in worker processes with per-file time and memory
+    limits, spread over several processes in chunks for large uploads, so a
+    pathological file cannot stall or crash the caller. Results are merged
+    back in upload order. Files that fail are appended to failures (when
+    given) as {'file', 'reason', 'message', 'elapsed'} and skipped.
+    When a cache is given, only files whose content is not cached are parsed.
+    on_file is called with the name and parse time of each freshly parsed
+    file, e.g. to trace slow files, and with a time of 0 for each cache hit.
+    With compact_min_files, uploads of at least that many files are returned
+    as a CompactParsedData that each result is added to as it arrives.
+    A ParserPool shared across calls replaces the processes each call would
+    otherwise start, and its memory limit replaces memory_limit_mb.
+    """
+    filenames = list(files)
+    keys = {}
+    if cache is not None:
+        keys = {filename: content_key(content, PARSER_VERSION) for filename, content in files.items()}
+    results = _ParseResults(compact_min_files is not None and len(files) >= compact_min_files, cache, keys)
+
+    items = []
+    for start in range(0, len(filenames), CACHE_BATCH_FILES):
+        batch = filenames[start:start + CACHE_BATCH_FILES]
+        cached = cache.get_many(keys[filename] for filename in batch) if cache is not None else {}
+        for filename in batch:
+            class_info = cached.get(keys.get(filename))
+            if class_info is None:
+                items.append((filename, files[filename]))
+                continue
+            results.add(filename, class_info, fresh=False)
+            if on_file is not None:
+                on_file(filename, 0.0)
+    workers = get_worker_count(max_workers) if len(items) >= PARALLEL_MIN_FILES else 1
+
+    parsed = False
+    errors = results.errors
+    if isolate and items:
+        timeout, memory_limit_mb = get_parse_limits(timeout, memory_limit_mb)
+        try:
+            parse_isolated(_chunked(items, max(1, chunk_size)), workers, timeout, memory_limit_mb,
+                           on_file, on_parsed=results.add, failures=errors, pool=pool)
+            parsed = True
+        except OSError:
+            # Fall back to in-process parsing of whatever the worker processes did not finish;
+            # files that already timed out or crashed a worker stay failed
+            failed = {failure['file'] for failure in errors}
+            items = [(filename, content) for filename, content in items
+                     if filename not in results.data and filename not in failed]
+
+    if not parsed:
+        for chunk in _chunked(items, max(1, chunk_size)):
+            for filename, class_info, error, elapsed in _parse_chunk(chunk):
+                if on_file is not None:
+                    on_file(filename, elapsed)
+                if error is not None:
+                    errors.append({'file': filename, 'reason': 'error', 'message': error, 'elapsed': 0.0})
+                else:
+                    results.add(filename, class_info)
+
+    for failure in errors:
+        warn(f"Error parsing {failure['file']}: {failure['message']}")
+    if failures is not None:
+        failures.extend(errors)
 
-    return parsed_data
\ No newline at end of file
+    return results.finish(filenames)
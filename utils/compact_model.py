@@ -0,0 +1,574 @@
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+# Uploads with at least this many parsed files are stored compactly
+COMPACT_MIN_FILES = 2000
+
+# (name, extends, implements, fields, API parameter types) of a class
+ClassLinks = Tuple[str, Optional[str], List[str], List[str], List[str]]
+
+class StringPool:
+    """
+    Interns strings to integer IDs; -1 stands for None
+    """
+
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = string_id
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        return self.strings[string_id] if string_id >= 0 else None
+
+class RaggedIds:
+    """
+    List of integer lists stored as one flat array plus offsets
+    """
+
+    __slots__ = ('offsets', 'values')
+
+    def __init__(self):
+        self.offsets = array('i', [0])
+        self.values = array('i')
+
+    def append(self, ids):
+        self.values.extend(ids)
+        self.offsets.append(len(self.values))
+
+    def __getitem__(self, index: int) -> array:
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+class _Table:
+    # Record index -> extra keys that are not part of the compact schema;
+    # per record, the bits of the optional schema keys it has
+    __slots__ = ('extras', 'present')
+    optional: Dict[str, int] = {}
+
+    def __init__(self):
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self.present = array('B')
+
+    def store_extras(self, index: int, record: Dict[str, Any], known: Tuple[str, ...]):
+        extra = {key: value for key, value in record.items() if key not in known}
+        if extra:
+            self.extras[index] = extra
+        if self.optional:
+            self.present.append(sum(bit for key, bit in self.optional.items() if key in record and key in known))
+
+def _ids(ragged: str):
+    return lambda m, table, i: [m.strings.strings[s] for s in getattr(table, ragged)[i]]
+
+def _string(column: str):
+    return lambda m, table, i: m.strings.get(getattr(table, column)[i])
+
+def _parameters(names: str, types: str):
+    return lambda m, t, i: [
+        {'name': m.strings.strings[name], 'type': m.strings.strings[type_id]}
+        for name, type_id in zip(getattr(t, names)[i], getattr(t, types)[i])
+    ]
+
+def _rows(view: type, start: str):
+    return lambda m, t, i: [view(m, r) for r in range(getattr(t, start)[i], getattr(t, start)[i + 1])]
+
+def _span(view: type, start: str, end: str):
+    return lambda m, t, i: [view(m, r) for r in range(getattr(t, start)[i], getattr(t, end)[i])]
+
+class _RecordView(Mapping):
+    """
+    Read-only dict-compatible view of one row of a compact table.
+    Subclasses map each schema key to a getter(model, table, index); keys
+    in the table's optional schema are only present where the record had them.
+    """
+
+    __slots__ = ('_model', '_index')
+    _table_name = ''
+    _getters: Dict[str, Any] = {}
+
+    def __init__(self, model: 'CompactParsedData', index: int):
+        self._model = model
+        self._index = index
+
+    def _table(self) -> _Table:
+        return getattr(self._model, self._table_name)
+
+    def _extras(self) -> Dict[str, Any]:
+        return self._table().extras.get(self._index, {})
+
+    def _keys(self) -> List[str]:
+        table = self._table()
+        if not table.optional:
+            return list(self._getters)
+        present, optional = table.present[self._index], table.optional
+        return [key for key in self._getters if key not in optional or present & optional[key]]
+
+    def __getitem__(self, key):
+        getter = self._getters.get(key)
+        if getter is not None:
+            table = self._table()
+            bit = table.optional.get(key)
+            if bit is None or table.present[self._index] & bit:
+                return getter(self._model, table, self._index)
+        return self._extras()[key]
+
+    def __iter__(self):
+        yield from self._keys()
+        yield from self._extras()
+
+    def __len__(self):
+        return len(self._keys()) + len(self._extras())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class ApiMethodView(_RecordView):
+    __slots__ = ()
+    _table_name = 'api_methods'
+    _getters = {
+        'type': lambda m, t, i: m.strings.strings[t.type[i]],
+        'method': lambda m, t, i: m.strings.strings[t.method[i]],
+        'annotations': _ids('annotations'),
+        'parameters': _parameters('param_names', 'param_types')
+    }
+
+class MethodDetailView(_RecordView):
+    __slots__ = ()
+    _table_name = 'method_details'
+    _getters = {
+        'name': lambda m, t, i: m.strings.strings[t.name[i]],
+        'documentation': _string('documentation'),
+        'parameters': _parameters('param_names', 'param_types'),
+        'return_type': _string('return_type'),
+        'modifiers': _ids('modifiers'),
+        'annotations': _ids('annotations'),
+        'throws': _ids('throws')
+    }
+
+class FieldDetailView(_RecordView):
+    __slots__ = ()
+    _table_name = 'field_details'
+    _getters = {
+        'name': lambda m, t, i: m.strings.strings[t.name[i]],
+        'type': _string('type'),
+        'documentation': _string('documentation'),
+        'modifiers': _ids('modifiers')
+    }
+
+class ClassView(_RecordView):
+    __slots__ = ()
+    _table_name = 'classes'
+    _getters = {
+        'name': lambda m, t, i: m.strings.strings[t.name[i]],
+        'extends': _string('extends'),
+        'implements': _ids('implements'),
+        'methods': _ids('methods'),
+        'fields': _ids('fields'),
+        'api_methods': _rows(ApiMethodView, 'api_start'),
+        'documentation': _string('documentation'),
+        'modifiers': _ids('modifiers'),
+        'annotations': _ids('annotations'),
+        'method_details': _span(MethodDetailView, 'method_start', 'method_end'),
+        'field_details': _rows(FieldDetailView, 'field_start')
+    }
+
+class InterfaceView(_RecordView):
+    __slots__ = ()
+    _table_name = 'interfaces'
+    _getters = {
+        'name': lambda m, t, i: m.strings.strings[t.name[i]],
+        'extends': _ids('extends'),
+        'methods': _ids('methods'),
+        'documentation': _string('documentation'),
+        'modifiers': _ids('modifiers'),
+        'annotations': _ids('annotations'),
+        'method_details': _span(MethodDetailView, 'method_start', 'method_end')
+    }
+
+class FileView(_RecordView):
+    __slots__ = ()
+    _table_name = 'files'
+    _getters = {
+        'classes': _rows(ClassView, 'class_start'),
+        'interfaces': _rows(InterfaceView, 'interface_start'),
+        'imports': _ids('imports'),
+        'package': _string('package'),
+        # The parser reserves api_calls but never fills it; non-empty lists are kept as extras
+        'api_calls': lambda m, t, i: [],
+        'type_kinds': _ids('type_kinds'),
+        'detail': _string('detail')
+    }
+
+# Non-empty api_calls are kept per file as extras
+_FILE_KEYS_WITH_CALLS = tuple(key for key in FileView._getters if key != 'api_calls')
+
+def _bits(*keys: str) -> Dict[str, int]:
+    return {key: 1 << bit for bit, key in enumerate(keys)}
+
+class _FileTable(_Table):
+    __slots__ = ('package', 'imports', 'class_start', 'interface_start', 'type_kinds', 'detail')
+    known = tuple(FileView._getters)
+    optional = _bits('api_calls', 'type_kinds', 'detail')
+
+    def __init__(self):
+        super().__init__()
+        self.package = array('i')
+        self.imports = RaggedIds()
+        self.class_start = array('i', [0])
+        self.interface_start = array('i', [0])
+        self.type_kinds = RaggedIds()
+        self.detail = array('i')
+
+# Member-level keys that header-scan records lack
+_DETAIL_KEYS = ('documentation', 'modifiers', 'annotations', 'method_details')
+
+class _ClassTable(_Table):
+    __slots__ = ('name', 'extends', 'implements', 'methods', 'fields', 'api_start',
+                 'documentation', 'modifiers', 'annotations', 'method_start', 'method_end', 'field_start')
+    known = tuple(ClassView._getters)
+    optional = _bits(*_DETAIL_KEYS, 'field_details')
+
+    def __init__(self):
+        super().__init__()
+        self.name = array('i')
+        self.extends = array('i')
+        self.implements = RaggedIds()
+        self.methods = RaggedIds()
+        self.fields = RaggedIds()
+        self.api_start = array('i', [0])
+        self.documentation = array('i')
+        self.modifiers = RaggedIds()
+        self.annotations = RaggedIds()
+        # Classes and interfaces share the method detail table, so each keeps its own span
+        self.method_start = array('i')
+        self.method_end = array('i')
+        self.field_start = array('i', [0])
+
+class _InterfaceTable(_Table):
+    __slots__ = ('name', 'extends', 'methods', 'documentation', 'modifiers', 'annotations', 'method_start', 'method_end')
+    known = tuple(InterfaceView._getters)
+    optional = _bits(*_DETAIL_KEYS)
+
+    def __init__(self):
+        super().__init__()
+        self.name = array('i')
+        self.extends = RaggedIds()
+        self.methods = RaggedIds()
+        self.documentation = array('i')
+        self.modifiers = RaggedIds()
+        self.annotations = RaggedIds()
+        # Classes and interfaces share the method detail table, so each keeps its own span
+        self.method_start = array('i')
+        self.method_end = array('i')
+
+class _MethodDetailTable(_Table):
+    __slots__ = ('name', 'documentation', 'param_names', 'param_types', 'return_type',
+                 'modifiers', 'annotations', 'throws')
+    known = tuple(MethodDetailView._getters)
+
+    def __init__(self):
+        super().__init__()
+        self.name = array('i')
+        self.documentation = array('i')
+        self.param_names = RaggedIds()
+        self.param_types = RaggedIds()
+        self.return_type = array('i')
+        self.modifiers = RaggedIds()
+        self.annotations = RaggedIds()
+        self.throws = RaggedIds()
+
+class _FieldDetailTable(_Table):
+    __slots__ = ('name', 'type', 'documentation', 'modifiers')
+    known = tuple(FieldDetailView._getters)
+
+    def __init__(self):
+        super().__init__()
+        self.name = array('i')
+        self.type = array('i')
+        self.documentation = array('i')
+        self.modifiers = RaggedIds()
+
+class _ApiMethodTable(_Table):
+    __slots__ = ('type', 'method', 'annotations', 'param_names', 'param_types')
+    known = tuple(ApiMethodView._getters)
+
+    def __init__(self):
+        super().__init__()
+        self.type = array('i')
+        self.method = array('i')
+        self.annotations = RaggedIds()
+        self.param_names = RaggedIds()
+        self.param_types = RaggedIds()
+
+class CompactParsedData(Mapping):
+    """
+    Memory-compact, read-only replacement for the parsed_data dict.
+
+    Every name, type and Javadoc comment is interned once in a string pool
+    and records, down to method and field details, are stored in
+    array-backed tables of string IDs. Indexing by filename returns
+    dict-compatible views, so existing components work unchanged; keys
+    outside the compact schema are kept per record as-is.
+    """
+
+    def __init__(self):
+        self.strings = StringPool()
+        self.filenames: List[str] = []
+        self.file_index: Dict[str, int] = {}
+        self.files = _FileTable()
+        self.classes = _ClassTable()
+        self.interfaces = _InterfaceTable()
+        self.api_methods = _ApiMethodTable()
+        self.method_details = _MethodDetailTable()
+        self.field_details = _FieldDetailTable()
+
+    @classmethod
+    def from_parsed(cls, parsed_data: Dict[str, Any]) -> 'CompactParsedData':
+        model = cls()
+        for filename, file_data in parsed_data.items():
+            model.add_file(filename, file_data)
+        return model
+
+    def add_file(self, filename: str, file_data: Dict[str, Any]):
+        intern = self.strings.intern
+        if filename in self.file_index:
+            raise ValueError(f"{filename} is already stored")
+
+        files = self.files
+        index = len(self.filenames)
+        self.file_index[filename] = index
+        self.filenames.append(filename)
+        files.package.append(intern(file_data.get('package')))
+        files.imports.append(intern(imp) for imp in file_data.get('imports', []))
+        files.type_kinds.append(intern(kind) for kind in file_data.get('type_kinds', []))
+        files.detail.append(intern(file_data.get('detail')))
+        files.store_extras(index, file_data, files.known if not file_data.get('api_calls') else _FILE_KEYS_WITH_CALLS)
+
+        classes = self.classes
+        for class_info in file_data.get('classes', []):
+            class_index = len(classes.name)
+            classes.name.append(intern(class_info['name']))
+            classes.extends.append(intern(class_info.get('extends')))
+            classes.implements.append(intern(name) for name in class_info.get('implements', []))
+            classes.methods.append(intern(name) for name in class_info.get('methods', []))
+            classes.fields.append(intern(name) for name in class_info.get('fields', []))
+            self._add_member_details(classes, class_info)
+            field_details = self.field_details
+            for field in class_info.get('field_details', []):
+                field_index = len(field_details.name)
+                field_details.name.append(intern(field['name']))
+                field_details.type.append(intern(field.get('type')))
+                field_details.documentation.append(intern(field.get('documentation')))
+                field_details.modifiers.append(intern(m) for m in field.get('modifiers', []))
+                field_details.store_extras(field_index, field, field_details.known)
+            classes.field_start.append(len(field_details.name))
+            classes.store_extras(class_index, class_info, classes.known)
+
+            api_methods = self.api_methods
+            for api_method in class_info.get('api_methods', []):
+                api_index = len(api_methods.type)
+                api_methods.type.append(intern(api_method['type']))
+                api_methods.method.append(intern(api_method['method']))
+                api_methods.annotations.append(intern(a) for a in api_method.get('annotations', []))
+                api_methods.param_names.append(intern(p['name']) for p in api_method.get('parameters', []))
+                api_methods.param_types.append(intern(p['type']) for p in api_method.get('parameters', []))
+                api_methods.store_extras(api_index, api_method, api_methods.known)
+            classes.api_start.append(len(api_methods.type))
+        files.class_start.append(len(classes.name))
+
+        interfaces = self.interfaces
+        for interface_info in file_data.get('interfaces', []):
+            interface_index = len(interfaces.name)
+            interfaces.name.append(intern(interface_info['name']))
+            interfaces.extends.append(intern(name) for name in interface_info.get('extends', []))
+            interfaces.methods.append(intern(name) for name in interface_info.get('methods', []))
+            self._add_member_details(interfaces, interface_info)
+            interfaces.store_extras(interface_index, interface_info, interfaces.known)
+        files.interface_start.append(len(interfaces.name))
+
+    def _add_member_details(self, table, type_info: Dict[str, Any]):
+        """
+        Javadoc, modifiers, annotations and method signatures of a class or
+        interface, as captured by the full parse
+        """
+        intern = self.strings.intern
+        table.documentation.append(intern(type_info.get('documentation')))
+        table.modifiers.append(intern(m) for m in type_info.get('modifiers', []))
+        table.annotations.append(intern(a) for a in type_info.get('annotations', []))
+        method_details = self.method_details
+        table.method_start.append(len(method_details.name))
+        for method in type_info.get('method_details', []):
+            method_index = len(method_details.name)
+            method_details.name.append(intern(method['name']))
+            method_details.documentation.append(intern(method.get('documentation')))
+            method_details.param_names.append(intern(p['name']) for p in method.get('parameters', []))
+            method_details.param_types.append(intern(p['type']) for p in method.get('parameters', []))
+            method_details.return_type.append(intern(method.get('return_type')))
+            method_details.modifiers.append(intern(m) for m in method.get('modifiers', []))
+            method_details.annotations.append(intern(a) for a in method.get('annotations', []))
+            method_details.throws.append(intern(t) for t in method.get('throws', []))
+            method_details.store_extras(method_index, method, method_details.known)
+        table.method_end.append(len(method_details.name))
+
+    def order_by(self, filenames: Iterable[str]):
+        """
+        Iterate files in the given order, e.g. upload order after they were
+        added as their parse finished
+        """
+        self.filenames = [filename for filename in filenames if filename in self.file_index]
+
+    def __getitem__(self, filename: str) -> FileView:
+        return FileView(self, self.file_index[filename])
+
+    def __contains__(self, filename) -> bool:
+        return filename in self.file_index
+
+    def __iter__(self):
+        return iter(self.filenames)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def _rows(self) -> Iterator[Tuple[str, int]]:
+        # Table rows follow the order files were added, which order_by may have changed
+        file_index = self.file_index
+        for filename in self.filenames:
+            yield filename, file_index[filename]
+
+    def iter_declarations(self) -> Iterator[Tuple[str, Optional[str], str, str]]:
+        """
+        Yield (filename, package, kind, name) for every class and interface
+        straight from the tables
+        """
+        strings = self.strings
+        files = self.files
+        for filename, row in self._rows():
+            package = strings.get(files.package[row])
+            for kind, table, start in (('class', self.classes, files.class_start),
+                                       ('interface', self.interfaces, files.interface_start)):
+                for i in range(start[row], start[row + 1]):
+                    yield filename, package, kind, strings.strings[table.name[i]]
+
+    def iter_class_links(self) -> Iterator[Tuple[Optional[str], List[str], List[ClassLinks]]]:
+        """
+        Yield (package, imports, class links) per file straight from the
+        tables; see class_links
+        """
+        strings = self.strings.strings
+        files, classes, api_methods = self.files, self.classes, self.api_methods
+        for _, row in self._rows():
+            links = []
+            for i in range(files.class_start[row], files.class_start[row + 1]):
+                links.append((
+                    strings[classes.name[i]],
+                    self.strings.get(classes.extends[i]),
+                    [strings[s] for s in classes.implements[i]],
+                    [strings[s] for s in classes.fields[i]],
+                    [strings[s] for a in range(classes.api_start[i], classes.api_start[i + 1])
+                     for s in api_methods.param_types[a]]
+                ))
+            yield self.strings.get(files.package[row]), [strings[s] for s in files.imports[row]], links
+
+    def iter_api_methods(self) -> Iterator[Tuple[str, str, str, List[str], List[Dict[str, str]]]]:
+        """
+        Yield (class name, API type, method, annotations, parameters) for every
+        API method straight from the tables
+        """
+        strings = self.strings.strings
+        files, classes, api_methods = self.files, self.classes, self.api_methods
+        for _, row in self._rows():
+            for class_index in range(files.class_start[row], files.class_start[row + 1]):
+                start, end = classes.api_start[class_index], classes.api_start[class_index + 1]
+                if start == end:
+                    continue
+                class_name = strings[classes.name[class_index]]
+                for i in range(start, end):
+                    yield (
+                        class_name,
+                        strings[api_methods.type[i]],
+                        strings[api_methods.method[i]],
+                        [strings[s] for s in api_methods.annotations[i]],
+                        [{'name': strings[name], 'type': strings[type_id]}
+                         for name, type_id in zip(api_methods.param_names[i], api_methods.param_types[i])]
+                    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Materialize plain nested dicts, e.g. for JSON export
+        """
+        return to_plain(self)
+
+def to_plain(value):
+    """
+    Recursively convert views back into plain dicts and lists
+    """
+    if isinstance(value, Mapping):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+def iter_api_methods(parsed_data) -> Iterator[Tuple[str, str, str, List[str], List[Dict[str, str]]]]:
+    """
+    Yield (class name, API type, method, annotations, parameters) for every
+    API method, using the table scan when parsed_data is compact
+    """
+    if isinstance(parsed_data, CompactParsedData):
+        yield from parsed_data.iter_api_methods()
+        return
+    for file_data in parsed_data.values():
+        for class_info in file_data.get('classes', []):
+            for api_method in class_info.get('api_methods', []):
+                yield (class_info['name'], api_method['type'], api_method['method'],
+                       api_method['annotations'], api_method['parameters'])
+
+def class_links(class_info: Mapping) -> ClassLinks:
+    """
+    (name, extends, implements, fields, API parameter types) of a parsed
+    class: everything relationship analysis reads from it
+    """
+    return (class_info['name'], class_info['extends'], class_info['implements'], class_info['fields'],
+            [param['type'] for api_method in class_info.get('api_methods', []) for param in api_method['parameters']])
+
+def iter_class_links(parsed_data) -> Iterator[Tuple[Optional[str], List[str], List[ClassLinks]]]:
+    """
+    Yield (package, imports, class links) per file, using the table scan
+    when parsed_data is compact
+    """
+    if isinstance(parsed_data, CompactParsedData):
+        yield from parsed_data.iter_class_links()
+        return
+    for file_data in parsed_data.values():
+        yield file_data.get('package'), file_data['imports'], [class_links(c) for c in file_data['classes']]
+
+def iter_declarations(parsed_data) -> Iterator[Tuple[str, Optional[str], str, str]]:
+    """
+    Yield (filename, package, kind, name) for every class and interface,
+    using the table scan when parsed_data is compact
+    """
+    if isinstance(parsed_data, CompactParsedData):
+        yield from parsed_data.iter_declarations()
+        return
+    for filename, file_data in parsed_data.items():
+        package = file_data.get('package')
+        for kind, key in (('class', 'classes'), ('interface', 'interfaces')):
+            for declaration in file_data.get(key, []):
+                yield filename, package, kind, declaration['name']
+
+def compact_parsed_data(parsed_data: Dict[str, Any], min_files: int = COMPACT_MIN_FILES):
+    """
+    Convert parsed_data to the compact form when it is large enough to matter
+    """
+    if isinstance(parsed_data, CompactParsedData) or len(parsed_data) < min_files:
+        return parsed_data
+    return CompactParsedData.from_parsed(parsed_data)
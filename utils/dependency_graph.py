@@ -0,0 +1,293 @@
+from itertools import chain
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Tuple
+from utils.graph_aggregation import package_of
+from utils.instrumentation import stage
+
+class DependencyGraph:
+    """
+    Directed graph over integer node ids in compressed sparse row form.
+    Forward and reverse adjacency are kept as (indptr, indices) arrays, so
+    reachability runs as vectorized frontier expansions and fan-in/fan-out
+    are array differences. Components and depths are computed once, on
+    first use.
+    """
+    def __init__(self, names: List[str], sources: np.ndarray, targets: np.ndarray):
+        self.names = list(names)
+        self.ids = dict(zip(self.names, range(len(self.names))))
+        count = len(self.names)
+
+        # Deduplicate edges; the combined key also sorts them by source
+        keys = _unique(np.asarray(sources, dtype=np.int64) * count + np.asarray(targets, dtype=np.int64))
+        sources, targets = keys // max(count, 1), keys % max(count, 1)
+        self.indptr, self.indices = _csr(sources, targets, count)
+        order = np.argsort(targets, kind='stable')
+        self.reverse_indptr, self.reverse_indices = _csr(targets[order], sources[order], count)
+
+        self._components = None
+        self._component_depths = None
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, str]], nodes: Iterable[str] = ()) -> 'DependencyGraph':
+        nodes = list(nodes)
+        endpoints = list(chain.from_iterable(edges))
+        # factorize interns the names in one vectorized pass, in first-seen order
+        codes, names = pd.factorize(pd.Series(nodes + endpoints, dtype=object))
+        codes = codes[len(nodes):].astype(np.int64)
+        return cls(list(names), codes[0::2], codes[1::2])
+
+    @classmethod
+    def from_relationships(cls, relationships: Dict) -> 'DependencyGraph':
+        """
+        Combine inheritance/implementation edges with the dependency set
+        """
+        graph = relationships['graph']
+        edges = list(graph.edges())
+        edges.extend(relationships['dependencies'])
+        return cls.from_edges(edges, graph.nodes())
+
+    @property
+    def node_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def fan_out(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def fan_in(self) -> np.ndarray:
+        return np.diff(self.reverse_indptr)
+
+    def successors(self, name: str) -> List[str]:
+        node = self.ids[name]
+        return [self.names[target] for target in self.indices[self.indptr[node]:self.indptr[node + 1]]]
+
+    def predecessors(self, name: str) -> List[str]:
+        node = self.ids[name]
+        return [self.names[source] for source in
+                self.reverse_indices[self.reverse_indptr[node]:self.reverse_indptr[node + 1]]]
+
+    def transitive_dependencies(self, names: Iterable[str]) -> List[str]:
+        """
+        Everything the given nodes depend on, directly or indirectly
+        """
+        return self._names(_reach(self._node_ids(names), self.indptr, self.indices))
+
+    def transitive_dependents(self, names: Iterable[str]) -> List[str]:
+        """
+        Everything that depends on the given nodes, directly or indirectly
+        """
+        return self._names(_reach(self._node_ids(names), self.reverse_indptr, self.reverse_indices))
+
+    def components(self) -> np.ndarray:
+        """
+        Strongly connected component of each node. Components are numbered
+        in reverse topological order: a component only depends on lower ones.
+        """
+        if self._components is None:
+            self._components, self._component_depths = _strong_components(self.indptr, self.indices)
+        return self._components
+
+    def cycles(self) -> List[List[str]]:
+        """
+        Strongly connected components with more than one node, largest first
+        """
+        components = self.components()
+        sizes = np.bincount(components) if len(components) else np.array([], dtype=np.int64)
+        cyclic = np.flatnonzero(sizes > 1)
+        members = {component: [] for component in cyclic.tolist()}
+        for node in np.flatnonzero(np.isin(components, cyclic)).tolist():
+            members[int(components[node])].append(self.names[node])
+        return sorted((sorted(nodes) for nodes in members.values()), key=lambda nodes: (-len(nodes), nodes[0]))
+
+    def depths(self) -> np.ndarray:
+        """
+        Length of the longest dependency chain below each node, counting a
+        cycle as a single step
+        """
+        components = self.components()
+        return self._component_depths[components]
+
+    def condense(self, group_of: Callable[[str], str]) -> 'DependencyGraph':
+        """
+        Graph over node groups (e.g. packages), with an edge wherever a member
+        of one group depends on a member of another
+        """
+        group_ids = {}
+        groups = np.array([group_ids.setdefault(group_of(name), len(group_ids)) for name in self.names],
+                          dtype=np.int64)
+        sources = groups[np.repeat(np.arange(self.node_count), self.fan_out())]
+        targets = groups[self.indices]
+        internal = sources != targets
+        return DependencyGraph(list(group_ids), sources[internal], targets[internal])
+
+    def metrics(self) -> Dict[str, np.ndarray]:
+        return {
+            'fan_in': self.fan_in(),
+            'fan_out': self.fan_out(),
+            'depth': self.depths(),
+            'component': self.components()
+        }
+
+    def _node_ids(self, names: Iterable[str]) -> np.ndarray:
+        if isinstance(names, str):
+            names = [names]
+        return np.array([self.ids[name] for name in names if name in self.ids], dtype=np.int64)
+
+    def _names(self, nodes: np.ndarray) -> List[str]:
+        return [self.names[node] for node in nodes.tolist()]
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values. Sorting is much faster than np.unique's hashing
+    for the integer ids used here.
+    """
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    distinct = np.empty(len(values), dtype=bool)
+    distinct[0] = True
+    np.not_equal(values[1:], values[:-1], out=distinct[1:])
+    return values[distinct]
+
+def _csr(sources: np.ndarray, targets: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    CSR arrays from edges already sorted by source
+    """
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=count), out=indptr[1:])
+    return indptr, targets.astype(np.int32)
+
+def _expand(frontier: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    All neighbours of the frontier nodes, gathered without a Python loop
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=indices.dtype)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return indices[offsets]
+
+def _reach(start: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Nodes reachable from start by breadth-first frontier expansion,
+    excluding the start nodes themselves
+    """
+    visited = np.zeros(len(indptr) - 1, dtype=bool)
+    visited[start] = True
+    frontier = _unique(start)
+    while len(frontier):
+        neighbours = _expand(frontier, indptr, indices)
+        frontier = _unique(neighbours[~visited[neighbours]])
+        visited[frontier] = True
+    visited[start] = False
+    return np.flatnonzero(visited)
+
+def _strong_components(indptr: np.ndarray, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Strongly connected components by an iterative Tarjan walk over the CSR
+    arrays, in time linear in nodes plus edges. Tarjan completes a component
+    only after every component it depends on, so components are numbered
+    in that order and each one's depth (the longest chain of components
+    below it) follows from its already numbered dependencies.
+
+    Returns component labels numbered in reverse topological order and the
+    depth of each component.
+    """
+    count = len(indptr) - 1
+    # Plain lists are much faster than numpy scalars for per-node work
+    indptr, indices = indptr.tolist(), indices.tolist()
+    order = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    labels = [-1] * count
+    depths = []
+    stack = []
+    visited = 0
+
+    for root in range(count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = visited
+        visited += 1
+        stack.append(root)
+        on_stack[root] = True
+        # Each frame is a node and the position of its next unvisited edge
+        frames = [[root, indptr[root]]]
+        while frames:
+            frame = frames[-1]
+            node, edge = frame
+            end = indptr[node + 1]
+            descended = False
+            while edge < end:
+                target = indices[edge]
+                edge += 1
+                if order[target] == -1:
+                    frame[1] = edge
+                    order[target] = low[target] = visited
+                    visited += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    frames.append([target, indptr[target]])
+                    descended = True
+                    break
+                if on_stack[target] and order[target] < low[node]:
+                    low[node] = order[target]
+            if descended:
+                continue
+
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] != order[node]:
+                continue
+
+            # node is the root of a component: pop it and compute its depth
+            label = len(depths)
+            members = []
+            while True:
+                member = stack.pop()
+                on_stack[member] = False
+                labels[member] = label
+                members.append(member)
+                if member == node:
+                    break
+            depth = 0
+            for member in members:
+                for target in indices[indptr[member]:indptr[member + 1]]:
+                    below = labels[target]
+                    if below != label and depths[below] >= depth:
+                        depth = depths[below] + 1
+            depths.append(depth)
+
+    return np.array(labels, dtype=np.int64), np.array(depths, dtype=np.int64)
+
+def get_dependency_graph(relationships: Dict) -> DependencyGraph:
+    """
+    Dependency graph of an analysis, built once and kept in relationships
+    """
+    graph = relationships.get('dependency_graph')
+    if graph is None:
+        with stage('dependency graph') as record:
+            graph = DependencyGraph.from_relationships(relationships)
+            record['items'] = graph.edge_count
+        relationships['dependency_graph'] = graph
+    return graph
+
+def get_package_dependency_graph(relationships: Dict) -> DependencyGraph:
+    """
+    Package-level condensation of the dependency graph, used for package cycles
+    """
+    graph = relationships.get('package_dependency_graph')
+    if graph is None:
+        symbols = relationships.get('symbol_table')
+        graph = get_dependency_graph(relationships).condense(lambda name: package_of(name, symbols))
+        relationships['package_dependency_graph'] = graph
+    return graph
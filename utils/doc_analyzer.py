@@ -1,22 +1,27 @@
-import javalang
 from typing import Dict, List, Any
 import re
 
+NO_DOCUMENTATION = 'No documentation available'
+
+# Precompiled once; parse_javadoc runs for every class and method
+_COMMENT_DELIMITERS = re.compile(r'\/\*+|\*+\/')
+_LEADING_STARS = re.compile(r'^\s*\*\s*', re.MULTILINE)
+
 def parse_javadoc(doc_str: str) -> Dict[str, str]:
     """
     Parse Javadoc comment into structured format
     """
     if not doc_str:
         return {
-            'description': 'No documentation available',
+            'description': NO_DOCUMENTATION,
             'params': {},
             'returns': '',
             'throws': []
         }
 
     # Clean up the comment
-    doc_str = re.sub(r'\/\*+|\*+\/', '', doc_str)
-    doc_str = re.sub(r'^\s*\*\s*', '', doc_str, flags=re.MULTILINE)
+    doc_str = _COMMENT_DELIMITERS.sub('', doc_str)
+    doc_str = _LEADING_STARS.sub('', doc_str)
 
     # Initialize parsed data
     parsed = {
@@ -27,11 +32,12 @@ def parse_javadoc(doc_str: str) -> Dict[str, str]:
     }
 
     # Extract different parts
-    lines = doc_str.split('\n')
     current_section = 'description'
     description_lines = []
+    return_lines = []
+    last_param = None
 
-    for line in lines:
+    for line in doc_str.split('\n'):
         line = line.strip()
         if not line:
             continue
@@ -39,81 +45,89 @@ def parse_javadoc(doc_str: str) -> Dict[str, str]:
         if line.startswith('@param'):
             current_section = 'param'
             parts = line[6:].strip().split(maxsplit=1)
-            if len(parts) > 1:
-                parsed['params'][parts[0]] = parts[1]
-            else:
-                parsed['params'][parts[0]] = ''
+            if parts:
+                last_param = parts[0]
+                parsed['params'][last_param] = parts[1] if len(parts) > 1 else ''
         elif line.startswith('@return'):
             current_section = 'return'
-            parsed['returns'] = line[7:].strip()
+            return_lines = [line[7:].strip()]
         elif line.startswith('@throws'):
             current_section = 'throws'
             parsed['throws'].append(line[7:].strip())
-        else:
-            if current_section == 'description':
-                description_lines.append(line)
-            elif current_section == 'param' and parsed['params']:
-                last_param = list(parsed['params'].keys())[-1]
-                parsed['params'][last_param] += ' ' + line
-            elif current_section == 'return':
-                parsed['returns'] += ' ' + line
-            elif current_section == 'throws' and parsed['throws']:
-                parsed['throws'][-1] += ' ' + line
+        elif current_section == 'description':
+            description_lines.append(line)
+        elif current_section == 'param' and last_param is not None:
+            parsed['params'][last_param] += ' ' + line
+        elif current_section == 'return':
+            return_lines.append(line)
+        elif current_section == 'throws' and parsed['throws']:
+            parsed['throws'][-1] += ' ' + line
 
     parsed['description'] = ' '.join(description_lines).strip()
+    parsed['returns'] = ' '.join(return_lines).strip()
     return parsed
 
 def extract_documentation(parsed_data: Dict[str, Any]) -> Dict[str, List[Dict]]:
     """
-    Extract and analyze documentation from Java files
+    Extract and analyze documentation from Java files in a single pass over
+    the Javadoc, signatures and modifiers captured by the parser
     """
     documentation = {
         'classes': [],
         'methods': [],
         'packages': []
     }
+    packages = {}
 
     for filename, file_data in parsed_data.items():
         # Extract package info
-        package_name = file_data.get('package', 'default')
-        package_doc = {
-            'name': package_name,
-            'files': [filename],
-            'description': 'Package containing Java source files'
-        }
-        documentation['packages'].append(package_doc)
-
-        # Process classes
-        for class_info in file_data.get('classes', []):
-            # Extract class documentation
-            class_doc = {
-                'name': class_info['name'],
-                'type': 'Class',
-                'file': filename,
-                'package': package_name,
-                'extends': class_info.get('extends'),
-                'implements': class_info.get('implements', []),
-                'javadoc': parse_javadoc(class_info.get('documentation', '')),
-                'annotations': []
+        package_name = file_data.get('package') or 'default'
+        if package_name not in packages:
+            packages[package_name] = {
+                'name': package_name,
+                'files': [],
+                'description': 'Package containing Java source files'
             }
+            documentation['packages'].append(packages[package_name])
+        packages[package_name]['files'].append(filename)
+
+        # Process classes and interfaces
+        types = [('Class', class_info) for class_info in file_data.get('classes', [])]
+        types += [('Interface', interface_info) for interface_info in file_data.get('interfaces', [])]
+        for type_kind, type_info in types:
+            # Interfaces list the interfaces they extend under 'extends'
+            if type_kind == 'Interface':
+                extends, implements = None, type_info.get('extends', [])
+            else:
+                extends, implements = type_info.get('extends'), type_info.get('implements', [])
 
-            documentation['classes'].append(class_doc)
+            documentation['classes'].append({
+                'name': type_info['name'],
+                'type': type_kind,
+                'file': filename,
+                'package': package_name,
+                'extends': extends,
+                'implements': implements,
+                'javadoc': parse_javadoc(type_info.get('documentation', '')),
+                'modifiers': type_info.get('modifiers', []),
+                'annotations': type_info.get('annotations', []),
+                'fields': type_info.get('field_details', [])
+            })
 
             # Process methods
-            for method in class_info.get('methods', []):
-                method_doc = {
-                    'name': method,
-                    'class': class_info['name'],
+            for method in type_info.get('method_details', []):
+                documentation['methods'].append({
+                    'name': method['name'],
+                    'class': type_info['name'],
                     'file': filename,
                     'package': package_name,
                     'javadoc': parse_javadoc(method.get('documentation', '')),
                     'parameters': method.get('parameters', []),
                     'return_type': method.get('return_type', 'void'),
                     'modifiers': method.get('modifiers', []),
-                    'annotations': method.get('annotations', [])
-                }
-
-                documentation['methods'].append(method_doc)
+                    'annotations': method.get('annotations', []),
+                    'throws': method.get('throws', [])
+                })
 
     return documentation
 
@@ -132,12 +146,12 @@ def analyze_code_quality(documentation: Dict[str, List[Dict]]) -> Dict[str, Any]
 
     # Analyze class documentation
     for class_doc in documentation['classes']:
-        if class_doc['javadoc']['description'] != 'No documentation available':
+        if class_doc['javadoc']['description'] != NO_DOCUMENTATION:
             quality_metrics['documented_classes'] += 1
 
     # Analyze method documentation
     for method_doc in documentation['methods']:
-        if method_doc['javadoc']['description'] != 'No documentation available':
+        if method_doc['javadoc']['description'] != NO_DOCUMENTATION:
             quality_metrics['documented_methods'] += 1
 
     # Calculate coverage percentages
@@ -146,4 +160,4 @@ def analyze_code_quality(documentation: Dict[str, List[Dict]]) -> Dict[str, Any]
         'methods': (quality_metrics['documented_methods'] / quality_metrics['total_methods'] * 100) if quality_metrics['total_methods'] > 0 else 0
     }
 
-    return quality_metrics
\ No newline at end of file
+    return quality_metrics
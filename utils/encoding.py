@@ -0,0 +1,101 @@
+import codecs
+import os
+import time
+from typing import Dict, Optional, Tuple
+import chardet
+
+# Number of leading bytes handed to chardet when UTF-8 decoding fails
+DETECTION_SAMPLE_BYTES = 64 * 1024
+
+# Used, with undecodable bytes replaced, when no detected charset fits a file
+FALLBACK_ENCODING = 'cp1252'
+
+class EncodingDetector:
+    """
+    Decode source files with a UTF-8 fast path.
+
+    chardet only runs on a bounded sample of files that are not valid UTF-8,
+    and the detected charset is remembered per directory so sibling files
+    skip detection. When the charset detected from the sample does not fit
+    the whole file, detection is rerun on all of it; if that fails too the
+    file is decoded as cp1252 with replacement characters rather than
+    dropped. An explicitly pinned encoding bypasses detection entirely.
+    """
+
+    def __init__(self, encoding: Optional[str] = None, sample_bytes: int = DETECTION_SAMPLE_BYTES):
+        if encoding is None:
+            encoding = os.environ.get('JAVA_ANALYZER_ENCODING') or None
+        if encoding:
+            # Fail early on unknown codec names
+            encoding = codecs.lookup(encoding).name
+        self.pinned = encoding
+        self.sample_bytes = sample_bytes
+        self.remembered: Dict[str, str] = {}
+        self.stats = {
+            'files': 0,
+            'utf8_fast_path': 0,
+            'remembered': 0,
+            'detected': 0,
+            'pinned': 0,
+            'replaced': 0,
+            'detection_seconds': 0.0,
+            'total_seconds': 0.0
+        }
+
+    def decode(self, content: bytes, path: str, scope: str = '') -> Tuple[str, str]:
+        """
+        Decode file content and return (text, encoding).
+        scope identifies the archive so remembered charsets do not leak between uploads.
+        Raises UnicodeDecodeError only if a pinned encoding does not fit.
+        """
+        start = time.perf_counter()
+        self.stats['files'] += 1
+        try:
+            if self.pinned:
+                self.stats['pinned'] += 1
+                return content.decode(self.pinned), self.pinned
+
+            try:
+                text = content.decode('utf-8')
+                self.stats['utf8_fast_path'] += 1
+                # Strip a byte order mark the same way utf-8-sig would
+                return text.removeprefix('\ufeff'), 'utf-8'
+            except UnicodeDecodeError:
+                pass
+
+            key = f"{scope}:{os.path.dirname(path)}"
+            encoding = self.remembered.get(key)
+            if encoding:
+                try:
+                    text = content.decode(encoding)
+                    self.stats['remembered'] += 1
+                    return text, encoding
+                except UnicodeDecodeError:
+                    pass
+
+            encoding = self._detect(content[:self.sample_bytes])
+            try:
+                text = content.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                # Non-ASCII bytes past the sample can rule out its charset
+                text = None
+                if len(content) > self.sample_bytes:
+                    encoding = self._detect(content)
+                    try:
+                        text = content.decode(encoding)
+                    except (UnicodeDecodeError, LookupError):
+                        pass
+                if text is None:
+                    self.stats['replaced'] += 1
+                    return content.decode(FALLBACK_ENCODING, errors='replace'), FALLBACK_ENCODING
+            self.remembered[key] = encoding
+            return text, encoding
+        finally:
+            self.stats['total_seconds'] += time.perf_counter() - start
+
+    def _detect(self, content: bytes) -> str:
+        detect_start = time.perf_counter()
+        encoding = chardet.detect(content)['encoding'] or 'utf-8'
+        self.stats['detection_seconds'] += time.perf_counter() - detect_start
+        self.stats['detected'] += 1
+        return encoding
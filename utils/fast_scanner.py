@@ -0,0 +1,126 @@
+import re
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+# Comments and string/char literals, blanked out before scanning
+_NOISE = re.compile(r'//[^\n]*|/\*.*?\*/|"""(?:.|\n)*?"""|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'', re.S)
+_TOKENS = re.compile(r'[{};]|@\s*interface\b|\b(?:package|import|class|interface|enum)\b')
+_PACKAGE = re.compile(r'package\s+([\w.]+)\s*;')
+_IMPORT = re.compile(r'import\s+(static\s+)?([\w.]+)(\s*\.\s*\*)?\s*;')
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_GENERICS = re.compile(r'<[^<>]*>')
+_CLAUSES = re.compile(r'\b(extends|implements|permits)\b')
+
+def _previous_char(text: str, index: int) -> str:
+    index -= 1
+    while index >= 0 and text[index].isspace():
+        index -= 1
+    return text[index] if index >= 0 else ''
+
+def _split_types(clause: str) -> List[str]:
+    return [re.sub(r'\s+', '', name) for name in clause.split(',') if name.strip()]
+
+def _parse_header(header: str) -> Dict[str, Any]:
+    """
+    Name and extends/implements lists of a declaration header, i.e. the
+    text between the class/interface keyword and its opening brace
+    """
+    # Drop type parameters and arguments, innermost first
+    previous = None
+    while previous != header:
+        previous, header = header, _GENERICS.sub('', header)
+
+    name_match = _IDENTIFIER.search(header)
+    clauses = {'extends': [], 'implements': []}
+    parts = _CLAUSES.split(header[name_match.end():] if name_match else '')
+    for keyword, clause in zip(parts[1::2], parts[2::2]):
+        if keyword in clauses:
+            clauses[keyword] = _split_types(clause)
+    return {'name': name_match.group(0) if name_match else '', **clauses}
+
+def scan_java_source(content: str) -> Dict[str, Any]:
+    """
+    Extract package, imports and type declarations with a token-level scan,
+    without building an AST.
+
+    The result has the same shape as parse_java_source, but classes and
+    interfaces carry no members (methods, fields and API methods are empty)
+    and 'detail' is 'header'.
+    """
+    text = _NOISE.sub(' ', content)
+
+    class_info = {
+        'classes': [],
+        'interfaces': [],
+        'imports': [],
+        'package': None,
+        'api_calls': [],
+        'type_kinds': [],
+        'detail': 'header'
+    }
+
+    depth = 0
+    for token in _TOKENS.finditer(text):
+        value = token.group(0)
+        if value == '{':
+            depth += 1
+        elif value == '}':
+            depth = max(0, depth - 1)
+        elif value == ';':
+            continue
+        elif depth == 0 and value == 'package':
+            match = _PACKAGE.match(text, token.start())
+            if match:
+                class_info['package'] = match.group(1)
+        elif depth == 0 and value == 'import':
+            match = _IMPORT.match(text, token.start())
+            if match:
+                class_info['imports'].append(('static ' if match.group(1) else '') + match.group(2)
+                                             + ('.*' if match.group(3) else ''))
+        else:
+            # Skip class literals such as Foo.class
+            if _previous_char(text, token.start()) == '.':
+                continue
+            kind = 'annotation' if value.startswith('@') else value
+            if depth == 0:
+                class_info['type_kinds'].append(kind)
+            if kind not in ('class', 'interface'):
+                continue
+
+            brace = text.find('{', token.end())
+            if brace < 0:
+                continue
+            header = _parse_header(text[token.end():brace])
+            if not header['name']:
+                continue
+            if kind == 'class':
+                class_info['classes'].append({
+                    'name': header['name'],
+                    'extends': header['extends'][0] if header['extends'] else None,
+                    'implements': header['implements'],
+                    'methods': [],
+                    'fields': [],
+                    'api_methods': []
+                })
+            else:
+                class_info['interfaces'].append({
+                    'name': header['name'],
+                    'extends': header['extends'],
+                    'methods': []
+                })
+
+    return class_info
+
+def scan_java_files(files: Dict[str, str],
+                    on_file: Optional[Callable[[str, float], None]] = None) -> Dict[str, Any]:
+    """
+    Header-level scan of every file. on_file is called with the name and
+    scan time of each file, as for parse_java_files.
+    """
+    scanned = {}
+    for filename, content in files.items():
+        start = time.perf_counter()
+        scanned[filename] = scan_java_source(content)
+        if on_file is not None:
+            on_file(filename, time.perf_counter() - start)
+    return scanned
@@ -1,55 +1,198 @@
 import os
+import shutil
 import tempfile
-from typing import List, Dict
-import streamlit as st
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from utils.reporting import warn
 import zipfile
 import io
-import chardet
+from utils.encoding import EncodingDetector
+from utils.manifest import manifest_entry
 
-def process_uploaded_files(uploaded_files) -> Dict[str, str]:
+# Non-seekable uploads larger than this are spooled to a temporary file
+SPOOL_MAX_MEMORY = 64 * 1024 * 1024
+_COPY_CHUNK = 1024 * 1024
+
+class MemoryBudgetExceeded(Exception):
     """
-    Process uploaded files and store their content.
-    Supports both individual Java files and ZIP archives.
+    Raised when ingested sources exceed the configured memory budget
     """
-    processed_files = {}
+
+def get_memory_budget(memory_budget: Optional[int] = None) -> int:
+    """
+    Resolve the ingestion memory budget in bytes, honouring
+    JAVA_ANALYZER_MEMORY_BUDGET. Zero means unlimited.
+    """
+    if memory_budget is None:
+        memory_budget = int(os.environ.get('JAVA_ANALYZER_MEMORY_BUDGET', 0))
+    return max(0, memory_budget)
+
+def _decode(detector: EncodingDetector, content: bytes, filename: str, scope: str,
+            manifest: Optional[Dict] = None) -> Optional[str]:
+    try:
+        text = detector.decode(content, filename, scope)[0]
+    except (UnicodeDecodeError, LookupError) as e:
+        warn(f"Could not decode {filename}: {str(e)}")
+        return None
+    # Record size and line metrics while the raw bytes are at hand
+    if manifest is not None:
+        manifest[filename] = manifest_entry(filename, len(content), text)
+    return text
+
+@contextmanager
+def _open_archive(uploaded_file):
+    """
+    Yield a seekable binary stream for an uploaded archive without copying it.
+    Uploads that cannot seek are spooled to a temporary file first.
+    """
+    if hasattr(uploaded_file, 'seek') and hasattr(uploaded_file, 'read'):
+        uploaded_file.seek(0)
+        yield uploaded_file
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+        source = getattr(uploaded_file, 'stream', None) or io.BytesIO(uploaded_file.getvalue())
+        shutil.copyfileobj(source, spool, _COPY_CHUNK)
+        spool.seek(0)
+        yield spool
+
+def _iter_zip(archive, scope: str, budget: int, detector: EncodingDetector,
+              manifest: Optional[Dict] = None) -> Iterator[Tuple[str, str]]:
+    with zipfile.ZipFile(archive) as z:
+        for file_info in z.infolist():
+            if file_info.is_dir() or not file_info.filename.endswith('.java'):
+                continue
+            if budget and file_info.file_size > budget:
+                warn(f"Skipping {file_info.filename}: {file_info.file_size} bytes exceeds the memory budget")
+                continue
+            with z.open(file_info) as f:
+                content = f.read()
+            decoded_content = _decode(detector, content, file_info.filename, scope, manifest)
+            if decoded_content is not None:
+                yield file_info.filename, decoded_content
+
+def iter_java_files(uploaded_files, memory_budget: Optional[int] = None,
+                    detector: Optional[EncodingDetector] = None,
+                    manifest: Optional[Dict] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily yield (path, source) pairs for every Java file in the upload.
+    ZIP members are read one at a time and non-Java members are never read.
+    Files larger than the memory budget are skipped. When a manifest dict is
+    given, each yielded file's size and line metrics are recorded in it.
+    """
+    budget = get_memory_budget(memory_budget)
+    if detector is None:
+        detector = EncodingDetector()
 
     for uploaded_file in uploaded_files:
         if uploaded_file.name.endswith('.zip'):
             # Process ZIP file
-            with zipfile.ZipFile(io.BytesIO(uploaded_file.getvalue())) as z:
-                for file_info in z.filelist:
-                    if file_info.filename.endswith('.java'):
-                        with z.open(file_info) as f:
-                            content = f.read()
-                            # Detect encoding
-                            encoding = chardet.detect(content)['encoding'] or 'utf-8'
-                            try:
-                                decoded_content = content.decode(encoding)
-                                processed_files[file_info.filename] = decoded_content
-                            except UnicodeDecodeError:
-                                st.warning(f"Could not decode {file_info.filename} with detected encoding {encoding}")
-                                continue
+            with _open_archive(uploaded_file) as archive:
+                yield from _iter_zip(archive, uploaded_file.name, budget, detector, manifest)
         elif uploaded_file.name.endswith('.java'):
             # Process individual Java file
             content = uploaded_file.getvalue()
-            # Detect encoding
-            encoding = chardet.detect(content)['encoding'] or 'utf-8'
-            try:
-                decoded_content = content.decode(encoding)
-                processed_files[uploaded_file.name] = decoded_content
-            except UnicodeDecodeError:
-                st.warning(f"Could not decode {uploaded_file.name} with detected encoding {encoding}")
-                continue
+            decoded_content = _decode(detector, content, uploaded_file.name, '', manifest)
+            if decoded_content is not None:
+                yield uploaded_file.name, decoded_content
+
+def iter_local_java_files(path: str, memory_budget: Optional[int] = None,
+                          detector: Optional[EncodingDetector] = None,
+                          manifest: Optional[Dict] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (path, source) pairs from a directory, ZIP archive or Java file on disk.
+    Paths inside a directory are reported relative to it with '/' separators.
+    """
+    budget = get_memory_budget(memory_budget)
+    if detector is None:
+        detector = EncodingDetector()
+
+    if os.path.isdir(path):
+        for root, dirs, filenames in os.walk(path):
+            dirs.sort()
+            for filename in sorted(filenames):
+                if not filename.endswith('.java'):
+                    continue
+                full_path = os.path.join(root, filename)
+                relative_path = os.path.relpath(full_path, path).replace(os.sep, '/')
+                size = os.path.getsize(full_path)
+                if budget and size > budget:
+                    warn(f"Skipping {relative_path}: {size} bytes exceeds the memory budget")
+                    continue
+                with open(full_path, 'rb') as f:
+                    content = f.read()
+                decoded_content = _decode(detector, content, relative_path, path, manifest)
+                if decoded_content is not None:
+                    yield relative_path, decoded_content
+    elif path.endswith('.zip'):
+        with open(path, 'rb') as archive:
+            yield from _iter_zip(archive, path, budget, detector, manifest)
+    elif path.endswith('.java'):
+        with open(path, 'rb') as f:
+            content = f.read()
+        decoded_content = _decode(detector, content, os.path.basename(path), '', manifest)
+        if decoded_content is not None:
+            yield os.path.basename(path), decoded_content
+    else:
+        raise ValueError(f"Unsupported input {path}: expected a directory, .zip or .java file")
+
+def collect_java_files(java_files: Iterator[Tuple[str, str]], memory_budget: Optional[int] = None) -> Dict[str, str]:
+    """
+    Gather (path, source) pairs into a dict, enforcing the memory budget
+    """
+    budget = get_memory_budget(memory_budget)
+    processed_files = {}
+    total_bytes = 0
+
+    for filename, content in java_files:
+        total_bytes += len(content)
+        if budget and total_bytes > budget:
+            raise MemoryBudgetExceeded(
+                f"Java sources exceed the memory budget of {budget} bytes"
+            )
+        processed_files[filename] = content
 
     return processed_files
 
-def get_file_structure(files: Dict[str, str]) -> Dict:
+def batch_java_files(java_files: Iterator[Tuple[str, str]], max_files: int,
+                     max_bytes: int = 0) -> Iterator[Dict[str, str]]:
+    """
+    Group (path, source) pairs into dicts of at most max_files files and,
+    when max_bytes is set, roughly max_bytes of source, so callers can
+    process and release one batch at a time
+    """
+    batch = {}
+    batch_bytes = 0
+    for filename, content in java_files:
+        batch[filename] = content
+        batch_bytes += len(content)
+        if len(batch) >= max_files or (max_bytes and batch_bytes >= max_bytes):
+            yield batch
+            batch = {}
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+def process_uploaded_files(uploaded_files, memory_budget: Optional[int] = None,
+                           detector: Optional[EncodingDetector] = None,
+                           manifest: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Process uploaded files and store their content.
+    Supports both individual Java files and ZIP archives.
+    Raises MemoryBudgetExceeded if the decoded sources outgrow the budget;
+    use iter_java_files to consume large uploads one file at a time.
+    """
+    budget = get_memory_budget(memory_budget)
+    return collect_java_files(iter_java_files(uploaded_files, budget, detector, manifest), budget)
+
+def get_file_structure(files: Iterable[str]) -> Dict:
     """
-    Create a hierarchical structure of the files
+    Create a hierarchical structure of the files from their paths
+    (a dict keyed by path, such as the processed files or the manifest)
     """
     structure = {}
 
-    for file_path in files.keys():
+    for file_path in files:
         parts = file_path.split('/')
         current = structure
 
@@ -60,4 +203,4 @@ def get_file_structure(files: Dict[str, str]) -> Dict:
 
         current[parts[-1]] = "file"
 
-    return structure
\ No newline at end of file
+    return structure
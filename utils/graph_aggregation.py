@@ -0,0 +1,90 @@
+import networkx as nx
+from typing import Dict, List, Optional
+from utils.symbol_table import SymbolTable
+
+UNRESOLVED_PACKAGE = '(unresolved)'
+
+def package_of(node: str, symbols: Optional[SymbolTable] = None) -> str:
+    """
+    Package of a graph node; names that are not qualified fall into UNRESOLVED_PACKAGE
+    """
+    if symbols is not None:
+        declaration = symbols.lookup(node)
+        if declaration is not None:
+            return declaration['package'] or '(default)'
+    package, _, _ = node.rpartition('.')
+    return package or UNRESOLVED_PACKAGE
+
+def aggregate_by_package(graph: nx.DiGraph, symbols: Optional[SymbolTable] = None) -> Dict:
+    """
+    Collapse a class graph into package super-nodes.
+    Returns the package graph, whose edges carry the number of class edges
+    they stand for as 'weight', and the member classes of each package.
+    """
+    members = {}
+    for node in graph.nodes():
+        members.setdefault(package_of(node, symbols), []).append(node)
+
+    package_graph = nx.DiGraph()
+    for package, nodes in members.items():
+        package_graph.add_node(package, size=len(nodes), label=f"{package} ({len(nodes)})")
+
+    node_package = {node: package for package, nodes in members.items() for node in nodes}
+    for source, target in graph.edges():
+        source_package, target_package = node_package[source], node_package[target]
+        if source_package == target_package:
+            continue
+        if package_graph.has_edge(source_package, target_package):
+            package_graph[source_package][target_package]['weight'] += 1
+        else:
+            package_graph.add_edge(source_package, target_package, weight=1)
+
+    return {'graph': package_graph, 'members': members, 'node_package': node_package}
+
+def get_package_aggregate(relationships: Dict) -> Dict:
+    """
+    Package aggregate of relationships['graph'], computed once per analysis
+    """
+    aggregate = relationships.get('package_aggregate')
+    if aggregate is None:
+        aggregate = aggregate_by_package(relationships['graph'], relationships.get('symbol_table'))
+        relationships['package_aggregate'] = aggregate
+    return aggregate
+
+def expand_package(graph: nx.DiGraph, aggregate: Dict, package: str) -> nx.DiGraph:
+    """
+    Drill-down view of one package: its classes as individual nodes, and
+    every other package they are connected to as a weighted super-node
+    """
+    node_package = aggregate['node_package']
+    expanded = nx.DiGraph()
+    for node in aggregate['members'].get(package, []):
+        expanded.add_node(node)
+
+    def collapse(node):
+        other = node_package[node]
+        if other == package:
+            return node
+        if other not in expanded:
+            size = len(aggregate['members'][other])
+            expanded.add_node(other, size=size, label=f"{other} ({size})")
+        return other
+
+    for node in aggregate['members'].get(package, []):
+        for _, target in graph.out_edges(node):
+            _add_weighted_edge(expanded, node, collapse(target))
+        for source, _ in graph.in_edges(node):
+            # Edges inside the package were already added from their source
+            if node_package[source] != package:
+                _add_weighted_edge(expanded, collapse(source), node)
+
+    return expanded
+
+def _add_weighted_edge(graph: nx.DiGraph, source: str, target: str):
+    if graph.has_edge(source, target):
+        graph[source][target]['weight'] += 1
+    else:
+        graph.add_edge(source, target, weight=1)
+
+def packages_by_size(aggregate: Dict) -> List[str]:
+    return sorted(aggregate['members'], key=lambda package: (-len(aggregate['members'][package]), package))
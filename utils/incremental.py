@@ -0,0 +1,168 @@
+import networkx as nx
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+from utils.code_parser import parse_java_files
+from utils.parse_cache import ParseCache
+from utils.relationship_analyzer import analyze_file_relationships
+from utils.symbol_table import SymbolTable
+
+_LIST_KEYS = ['inheritance', 'implementation', 'associations']
+
+class IncrementalAnalyzer:
+    """
+    Keep a relationships dict up to date as files change.
+
+    Each file's contribution is remembered so that a change only touches the
+    entries of the changed files, plus the files that referenced a type name
+    declared or removed by the change (their names may now resolve to a
+    different fully-qualified name). Relationship lists are updated in place
+    (removed entries are swapped with the last entry, so list order is not
+    preserved across updates), while dependencies and graph edges are
+    reference counted because several classes can contribute the same one.
+    """
+
+    def __init__(self, parsed_data: Optional[Dict[str, Any]] = None):
+        self.parsed_data = {}
+        self.symbols = SymbolTable()
+        self.relationships = {
+            'inheritance': [],
+            'implementation': [],
+            'associations': [],
+            'dependencies': set(),
+            'parsed_data': self.parsed_data,
+            'symbol_table': self.symbols,
+            'graph': nx.DiGraph()
+        }
+        self._contributions = {}
+        self._positions = {key: {} for key in _LIST_KEYS}
+        self._dependency_counts = Counter()
+        self._edge_types = {}
+        self._referencing = {}
+
+        self.update_parsed(parsed_data or {})
+
+    def update(self, added: Optional[Dict[str, str]] = None, modified: Optional[Dict[str, str]] = None,
+               removed: Iterable[str] = (), max_workers: Optional[int] = None,
+               cache: Optional[ParseCache] = None) -> Dict:
+        """
+        Apply a change set and return the updated relationships.
+        added and modified map file paths to their new source; removed lists paths.
+        """
+        changed = dict(added or {})
+        changed.update(modified or {})
+
+        parsed = parse_java_files(changed, max_workers=max_workers, cache=cache)
+        # Files that no longer parse are dropped like removed files
+        removed = set(removed) | (set(changed) - set(parsed))
+        return self.update_parsed(parsed, removed)
+
+    def update_parsed(self, changed: Dict[str, Any], removed: Iterable[str] = ()) -> Dict:
+        """
+        Apply a change set of already parsed files
+        """
+        removed = set(removed) - set(changed)
+        touched = removed | set(changed)
+
+        # Type declarations that appear or disappear with this change; files
+        # referencing those simple names may now resolve them differently
+        old_declarations = set()
+        for filename in touched:
+            old = self.parsed_data.get(filename)
+            if old is not None:
+                old_declarations |= self.symbols.declared_fqns(old)
+                self.symbols.remove_file(filename, old)
+                self._retract(filename)
+                del self.parsed_data[filename]
+        new_declarations = set()
+        for filename, file_data in changed.items():
+            new_declarations |= self.symbols.declared_fqns(file_data)
+            self.symbols.add_file(filename, file_data)
+            self.parsed_data[filename] = file_data
+        names = {fqn.rsplit('.', 1)[-1] for fqn in old_declarations ^ new_declarations}
+
+        affected = set()
+        for name in names:
+            affected |= self._referencing.get(name, set())
+        affected -= touched
+        for filename in affected:
+            self._retract(filename)
+
+        for filename in list(changed) + sorted(affected):
+            self._contribute(filename)
+
+        # Derived views are recomputed on next use
+        for derived in ('package_aggregate', 'dependency_graph', 'package_dependency_graph'):
+            self.relationships.pop(derived, None)
+        return self.relationships
+
+    def _contribute(self, filename: str):
+        contribution = analyze_file_relationships(self.parsed_data[filename], self.symbols)
+        self._contributions[filename] = contribution
+
+        for key in _LIST_KEYS:
+            entries = self.relationships[key]
+            positions = self._positions[key]
+            for entry in contribution[key]:
+                positions[id(entry)] = len(entries)
+                entries.append(entry)
+
+        for dependency in contribution['dependencies']:
+            self._dependency_counts[dependency] += 1
+            self.relationships['dependencies'].add(dependency)
+
+        graph = self.relationships['graph']
+        for source, target, edge_type in contribution['edges']:
+            types = self._edge_types.setdefault((source, target), Counter())
+            types[edge_type] += 1
+            graph.add_edge(source, target, type=edge_type)
+
+        for name in contribution['references']:
+            self._referencing.setdefault(name, set()).add(filename)
+
+    def _retract(self, filename: str):
+        contribution = self._contributions.pop(filename, None)
+        if contribution is None:
+            return
+
+        for key in _LIST_KEYS:
+            self._remove_entries(key, contribution[key])
+
+        for dependency in contribution['dependencies']:
+            self._dependency_counts[dependency] -= 1
+            if self._dependency_counts[dependency] <= 0:
+                del self._dependency_counts[dependency]
+                self.relationships['dependencies'].discard(dependency)
+
+        graph = self.relationships['graph']
+        for source, target, edge_type in contribution['edges']:
+            types = self._edge_types[(source, target)]
+            types[edge_type] -= 1
+            if types[edge_type] <= 0:
+                del types[edge_type]
+            if types:
+                graph.edges[source, target]['type'] = next(iter(types))
+                continue
+
+            del self._edge_types[(source, target)]
+            graph.remove_edge(source, target)
+            # Nodes only exist through edges, so drop any left unconnected
+            for node in (source, target):
+                if node in graph and graph.degree(node) == 0:
+                    graph.remove_node(node)
+
+        for name in contribution['references']:
+            referencing = self._referencing.get(name)
+            if referencing is not None:
+                referencing.discard(filename)
+                if not referencing:
+                    del self._referencing[name]
+
+    def _remove_entries(self, key: str, removed: List[Dict]):
+        entries = self.relationships[key]
+        positions = self._positions[key]
+        for entry in removed:
+            index = positions.pop(id(entry))
+            last = entries.pop()
+            if last is not entry:
+                entries[index] = last
+                positions[id(last)] = index
@@ -0,0 +1,157 @@
+import heapq
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory is not reported there
+    resource = None
+
+# Stage records kept per profiler; older records are dropped first
+MAX_RECORDS = 500
+# Files slower than this many seconds to parse are traced
+SLOW_FILE_SECONDS = 0.5
+SLOW_FILE_LIMIT = 50
+
+_active_profiler: ContextVar[Optional['Profiler']] = ContextVar('active_profiler', default=None)
+# (profiler, stage) pairs of the stages open in the current thread or task
+_open_stages: ContextVar[tuple] = ContextVar('open_stages', default=())
+
+def _max_rss() -> Optional[int]:
+    """
+    High-water mark of this process's resident memory, in bytes
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+def _cpu_seconds() -> float:
+    """
+    CPU time of this process and of its reaped children, e.g. parser processes
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class Profiler:
+    """
+    Records wall time, CPU time, peak memory and item counts of pipeline
+    stages and view renders, plus the slowest files seen by the parser.
+    An optional listener (e.g. a background job's progress) is told when a
+    stage starts and when each file is parsed.
+    """
+    def __init__(self, slow_file_seconds: float = SLOW_FILE_SECONDS, listener=None):
+        self.listener = listener
+        self.records = deque(maxlen=MAX_RECORDS)
+        self.slow_file_seconds = slow_file_seconds
+        self._slow_files = []
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Measure the enclosed block. The yielded record can be updated inside
+        the block, e.g. to set 'items' once the count is known.
+        """
+        if self.listener is not None:
+            self.listener.stage_started(name, items)
+        # Nesting is tracked per context, as sessions sharing an analysis
+        # may record into the same profiler from different threads
+        open_stages = _open_stages.get()
+        parents = [parent for profiler, parent in open_stages if profiler is self]
+        record = {
+            'stage': name,
+            'parent': parents[-1] if parents else None,
+            'items': items
+        }
+        rss_before = _max_rss()
+        cpu_start = _cpu_seconds()
+        start = time.perf_counter()
+        token = _open_stages.set(open_stages + ((self, name),))
+        try:
+            yield record
+        finally:
+            _open_stages.reset(token)
+            record['wall_seconds'] = round(time.perf_counter() - start, 4)
+            record['cpu_seconds'] = round(_cpu_seconds() - cpu_start, 4)
+            rss_after = _max_rss()
+            record['peak_rss_mb'] = round(rss_after / 2**20, 1) if rss_after is not None else None
+            record['peak_rss_growth_mb'] = (round((rss_after - rss_before) / 2**20, 1)
+                                            if rss_after is not None else None)
+            record['finished_at'] = time.time()
+            self.records.append(record)
+
+    def add(self, name: str, wall_seconds: float, items: Optional[int] = None, parent: Optional[str] = None):
+        """
+        Record work that was timed elsewhere, e.g. encoding detection inside ingestion
+        """
+        self.records.append({
+            'stage': name,
+            'parent': parent,
+            'items': items,
+            'wall_seconds': round(wall_seconds, 4),
+            'cpu_seconds': None,
+            'peak_rss_mb': None,
+            'peak_rss_growth_mb': None,
+            'finished_at': time.time()
+        })
+
+    def total(self, name: str) -> float:
+        """
+        Summed wall time of all records of a stage
+        """
+        return sum(record['wall_seconds'] for record in self.records if record['stage'] == name)
+
+    @contextmanager
+    def activate(self) -> Iterator['Profiler']:
+        """
+        Make this profiler the target of module-level stage() calls
+        """
+        token = _active_profiler.set(self)
+        try:
+            yield self
+        finally:
+            _active_profiler.reset(token)
+
+    def record_file(self, filename: str, seconds: float):
+        """
+        Parser hook: keep the slowest files above the threshold
+        """
+        if self.listener is not None:
+            self.listener.file_done(filename)
+        if seconds < self.slow_file_seconds:
+            return
+        entry = (seconds, filename)
+        if len(self._slow_files) < SLOW_FILE_LIMIT:
+            heapq.heappush(self._slow_files, entry)
+        else:
+            heapq.heappushpop(self._slow_files, entry)
+
+    @property
+    def slow_files(self) -> List[Dict[str, Any]]:
+        return [{'file': filename, 'seconds': round(seconds, 4)}
+                for seconds, filename in sorted(self._slow_files, reverse=True)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stages': list(self.records),
+            'slow_files': self.slow_files,
+            'slow_file_seconds': self.slow_file_seconds
+        }
+
+def current_profiler() -> Optional[Profiler]:
+    return _active_profiler.get()
+
+def stage(name: str, items: Optional[int] = None):
+    """
+    Measure a block with the active profiler, or do nothing if there is none
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return nullcontext({})
+    return profiler.stage(name, items)
@@ -0,0 +1,303 @@
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are skipped there
+    resource = None
+
+# Per-file wall-clock limit in seconds
+PARSE_TIMEOUT = 30.0
+# Memory a parser process may allocate on top of what it starts with, in MB
+PARSE_MEMORY_LIMIT_MB = 2048
+# Seconds a new parser process may take to start up
+WORKER_START_TIMEOUT = 60.0
+
+def get_parse_limits(timeout: Optional[float] = None,
+                     memory_limit_mb: Optional[int] = None) -> Tuple[float, int]:
+    """
+    Resolve per-file limits, honouring JAVA_ANALYZER_PARSE_TIMEOUT and
+    JAVA_ANALYZER_PARSE_MEMORY_MB. Zero disables a limit.
+    """
+    if timeout is None:
+        timeout = float(os.environ.get('JAVA_ANALYZER_PARSE_TIMEOUT', PARSE_TIMEOUT))
+    if memory_limit_mb is None:
+        memory_limit_mb = int(os.environ.get('JAVA_ANALYZER_PARSE_MEMORY_MB', PARSE_MEMORY_LIMIT_MB))
+    return max(0.0, timeout), max(0, memory_limit_mb)
+
+def _current_address_space() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+def _limit_memory(memory_limit_mb: int):
+    if not memory_limit_mb or resource is None:
+        return
+    current = _current_address_space()
+    if current is None:
+        return
+    limit = current + memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _get_context():
+    """
+    Start workers from a fresh, single-threaded process: forking the app or a
+    background job thread could copy locks held by other threads (logging,
+    sqlite) into the child and deadlock it
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # The caller's main module is left out so it is never run in the
+        # long-lived server; as with any spawned process, workers still import
+        # it, and a script without a __main__ guard makes them fail to start,
+        # which callers treat as OSError. The project modules the caller has
+        # loaded are preloaded instead, so that import only runs the script's
+        # own code rather than loading the analysis stack in every worker
+        context.set_forkserver_preload(
+            ['utils.code_parser'] + sorted(name for name in sys.modules if name.startswith('utils.')))
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _worker_main(conn, memory_limit_mb: int):
+    """
+    Parser process: receives chunks of (filename, content) and sends back one
+    (filename, status, payload, elapsed) message per file
+    """
+    from utils.code_parser import parse_java_source
+
+    _limit_memory(memory_limit_mb)
+    conn.send('ready')
+    while True:
+        try:
+            chunk = conn.recv()
+        except EOFError:
+            return
+        if chunk is None:
+            return
+        for filename, content in chunk:
+            start = time.perf_counter()
+            try:
+                status, payload = 'ok', parse_java_source(content)
+            except MemoryError:
+                status, payload = 'memory', f"exceeded the {memory_limit_mb} MB memory limit"
+            except RecursionError:
+                status, payload = 'error', "nesting too deep to parse"
+            except Exception as e:
+                status, payload = 'error', str(e) or type(e).__name__
+            conn.send((filename, status, payload, time.perf_counter() - start))
+
+class _Worker:
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.pending = deque()
+        self.started = 0.0
+
+    def wait_ready(self):
+        """
+        Wait until the process has started up; raise OSError if it exits
+        first, e.g. because the main module cannot be imported in it
+        """
+        try:
+            if self.conn.poll(WORKER_START_TIMEOUT) and self.conn.recv() == 'ready':
+                return
+        except (EOFError, OSError):
+            pass
+        self.kill()
+        raise OSError(f"parser process failed to start (exit code {self.process.exitcode})")
+
+    def assign(self, chunk: List[Tuple[str, str]]):
+        self.pending = deque(chunk)
+        self.started = time.perf_counter()
+        self.conn.send(chunk)
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+class ParserPool:
+    """
+    Parser processes shared by several parse_isolated calls, e.g. one per
+    out-of-core batch, so each call does not start processes of its own.
+    Processes are started on first use and stopped by close().
+    """
+
+    def __init__(self, workers: int, memory_limit_mb: Optional[int] = None):
+        self.size = max(1, workers)
+        self.memory_limit_mb = get_parse_limits(None, memory_limit_mb)[1]
+        self.workers: List[_Worker] = []
+        self.failed = False
+        self._context = None
+
+    def start(self, count: int) -> List[_Worker]:
+        """
+        Make sure up to count processes are running and return them. Raises
+        OSError if they cannot be started, then and on every later call.
+        """
+        if self.failed:
+            raise OSError("parser processes could not be started")
+        if self._context is None:
+            self._context = _get_context()
+        try:
+            started = [_Worker(self._context, self.memory_limit_mb)
+                       for _ in range(min(count, self.size) - len(self.workers))]
+            self.workers.extend(started)
+            for worker in started:
+                worker.wait_ready()
+        except OSError:
+            self.close()
+            self.failed = True
+            raise
+        return self.workers
+
+    def new_worker(self) -> _Worker:
+        worker = _Worker(self._context, self.memory_limit_mb)
+        worker.wait_ready()
+        return worker
+
+    def replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        index = self.workers.index(worker)
+        try:
+            self.workers[index] = self.new_worker()
+        except OSError:
+            del self.workers[index]
+            self.failed = True
+            raise
+        return self.workers[index]
+
+    def discard_busy(self):
+        """
+        Stop processes still working on a call that ended early, so their
+        late results never reach the next call
+        """
+        for worker in [worker for worker in self.workers if worker.pending]:
+            worker.kill()
+            self.workers.remove(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def __enter__(self) -> 'ParserPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def parse_isolated(chunks: List[List[Tuple[str, str]]], workers: int, timeout: float, memory_limit_mb: int,
+                   on_file: Optional[Callable[[str, float], None]] = None,
+                   on_parsed: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                   failures: Optional[List[Dict[str, Any]]] = None,
+                   pool: Optional[ParserPool] = None
+                   ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Parse chunks of files in separate processes with per-file time and memory
+    limits. A file that times out or crashes its process is recorded as a
+    failure, its process is replaced and the rest of its chunk is requeued.
+
+    Returns the parsed files and a failure report with one entry per file:
+    {'file', 'reason' ('timeout', 'memory', 'crash' or 'error'), 'message', 'elapsed'}.
+    on_file is called with the name and parse time of every file that
+    finishes. When on_parsed is given, each parsed file is passed to it as
+    it arrives instead of being collected into the returned dict. Failures
+    are appended to failures when given, so they survive an OSError raised
+    when worker processes cannot be started. With a pool, its processes
+    (and its memory limit) are used and left running for the next call.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = ParserPool(workers, memory_limit_mb)
+    queue = deque(chunk for chunk in chunks if chunk)
+    parsed = {}
+    failures = [] if failures is None else failures
+
+    def fail(filename, reason, message, elapsed):
+        failures.append({'file': filename, 'reason': reason, 'message': message, 'elapsed': round(elapsed, 3)})
+
+    try:
+        count = max(1, min(workers, len(queue)))
+        active = pool.start(count)[:count]
+        for worker in active:
+            if queue:
+                worker.assign(queue.popleft())
+
+        while any(worker.pending for worker in active):
+            busy = [worker for worker in active if worker.pending]
+            wait_for = None
+            if timeout:
+                now = time.perf_counter()
+                wait_for = max(0.0, min(worker.started + timeout for worker in busy) - now)
+            ready = wait([worker.conn for worker in busy], timeout=wait_for)
+
+            for index, worker in enumerate(active):
+                if not worker.pending:
+                    continue
+                now = time.perf_counter()
+                replace = False
+                if worker.conn in ready:
+                    try:
+                        filename, status, payload, elapsed = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # The process died mid-file, e.g. killed by the OOM killer
+                        filename, _ = worker.pending.popleft()
+                        worker.process.join()
+                        fail(filename, 'crash', f"parser process exited with code {worker.process.exitcode}",
+                             now - worker.started)
+                        replace = True
+                    else:
+                        worker.pending.popleft()
+                        worker.started = now
+                        if on_file is not None:
+                            on_file(filename, elapsed)
+                        if status == 'ok' and on_parsed is not None:
+                            on_parsed(filename, payload)
+                        elif status == 'ok':
+                            parsed[filename] = payload
+                        else:
+                            fail(filename, status, payload, elapsed)
+                            # Memory errors can leave the process unusable
+                            replace = status == 'memory'
+                elif timeout and now - worker.started > timeout:
+                    filename, _ = worker.pending.popleft()
+                    if on_file is not None:
+                        on_file(filename, now - worker.started)
+                    fail(filename, 'timeout', f"exceeded the {timeout:g}s parse time limit", now - worker.started)
+                    replace = True
+
+                if replace:
+                    remaining = list(worker.pending)
+                    worker.pending.clear()
+                    if remaining:
+                        queue.appendleft(remaining)
+                    worker = active[index] = pool.replace(worker)
+
+                if not worker.pending and queue:
+                    worker.assign(queue.popleft())
+    finally:
+        if own_pool:
+            pool.close()
+        else:
+            pool.discard_busy()
+
+    return parsed, failures
@@ -0,0 +1,204 @@
+import sys
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+# A job is cancelled once none of its viewers has polled it for this many
+# seconds and none is still connected, e.g. after its pages were closed
+HEARTBEAT_TIMEOUT = 15.0
+
+def session_connected(viewer: str) -> bool:
+    """
+    Whether viewer is the id of a Streamlit session that is still connected.
+    Browsers throttle the polling of background tabs, so polling alone would
+    cancel the jobs of pages that are merely hidden. Never imports streamlit
+    itself so headless callers stay free of it.
+    """
+    st = sys.modules.get('streamlit')
+    if st is None or not st.runtime.exists():
+        return False
+    return st.runtime.get_instance().is_active_session(viewer)
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job's thread at its next progress report after cancellation
+    """
+
+class JobProgress:
+    """
+    Progress of a running job: the current stage, files done out of the
+    stage total, and partial results published so far. Every report checks
+    for cancellation, so the job stops at the next file or stage.
+    """
+    def __init__(self, should_stop: Callable[[], bool]):
+        self._should_stop = should_stop
+        self._lock = threading.Lock()
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self.stages = []
+        self.partial = {}
+
+    def check(self):
+        if self._should_stop():
+            raise JobCancelled()
+
+    def stage_started(self, name: str, total: Optional[int] = None):
+        self.check()
+        with self._lock:
+            self.stage = name
+            self.done = 0
+            self.total = total
+            self.stages.append(name)
+
+    def file_done(self, filename: str):
+        self.check()
+        with self._lock:
+            self.done += 1
+
+    def publish(self, key: str, value: Any):
+        """
+        Make a partial result available to viewers before the job finishes
+        """
+        with self._lock:
+            self.partial[key] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'stage': self.stage,
+                'done': self.done,
+                'total': self.total,
+                'stages': list(self.stages)
+            }
+
+class AnalysisJob:
+    """
+    One pipeline run on a background thread, shared by every viewer that
+    submitted the same key. Viewers keep the job alive by polling it or by
+    staying connected; it is cancelled when the last viewer releases it or
+    goes away.
+    """
+    def __init__(self, key: str, target: Callable[[JobProgress], Any],
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.key = key
+        self.status = 'running'
+        self.result = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.heartbeat_timeout = heartbeat_timeout
+        self._cancelled = threading.Event()
+        self._viewers = {}
+        self._lock = threading.Lock()
+        self.progress = JobProgress(self._should_stop)
+        self._thread = threading.Thread(target=self._run, args=(target,), name=f"analysis-{key[:12]}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self, target: Callable[[JobProgress], Any]):
+        try:
+            result = target(self.progress)
+            self.progress.check()
+        except JobCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            self.status = 'failed'
+        else:
+            self.result = result
+            self.status = 'done'
+        self.finished_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return self.status != 'running'
+
+    def touch(self, viewer: str):
+        with self._lock:
+            self._viewers[viewer] = time.time()
+
+    def detach(self, viewer: str) -> bool:
+        """
+        Remove a viewer; returns True if none remain
+        """
+        with self._lock:
+            self._viewers.pop(viewer, None)
+            return not self._viewers
+
+    def abandoned(self) -> bool:
+        cutoff = time.time() - self.heartbeat_timeout
+        with self._lock:
+            viewers = dict(self._viewers)
+        return not any(last_seen >= cutoff or session_connected(viewer) for viewer, last_seen in viewers.items())
+
+    def _should_stop(self) -> bool:
+        return self._cancelled.is_set() or self.abandoned()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return self.finished
+
+class JobManager:
+    """
+    Process-wide registry of analysis jobs keyed by upload digest, so a
+    duplicate submission attaches to the job already running for that key
+    """
+    def __init__(self, heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.heartbeat_timeout = heartbeat_timeout
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, target: Callable[[JobProgress], Any], viewer: str) -> AnalysisJob:
+        """
+        Return the job for key, starting target on a new thread only if no
+        job for the key is running or waiting to be collected
+        """
+        with self._lock:
+            self._reap()
+            job = self._jobs.get(key)
+            if job is None or job.status in ('cancelled', 'failed'):
+                job = AnalysisJob(key, target, self.heartbeat_timeout)
+                job.touch(viewer)
+                self._jobs[key] = job
+                job.start()
+            else:
+                job.touch(viewer)
+            return job
+
+    def get(self, key: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def release(self, key: str, viewer: str):
+        """
+        Detach a viewer. A running job with no viewers left is cancelled, and
+        a job nobody is waiting for is forgotten.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or not job.detach(viewer):
+                return
+            job.cancel()
+            del self._jobs[key]
+
+    def _reap(self):
+        # Drop jobs whose viewers all went away without releasing them
+        for key, job in list(self._jobs.items()):
+            if job.abandoned():
+                job.cancel()
+                del self._jobs[key]
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+    return _default_manager
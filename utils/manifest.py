@@ -0,0 +1,96 @@
+import os
+import re
+from typing import Dict, Any
+
+TYPE_LABELS = {
+    'class': 'Java Class',
+    'interface': 'Java Interface',
+    'enum': 'Java Enum',
+    'annotation': 'Java Annotation'
+}
+
+# Line boundaries as recognised by str.splitlines
+_LINE_BREAK_CHARS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+_LINE_BREAK = re.compile(f'\r\n|[{_LINE_BREAK_CHARS}]')
+# Comments and string/char literals, tried in the order a left-to-right
+# scan meets them: a line comment, a block comment (running to the end of
+# the file when left open), or a literal. Literals never span lines, and
+# one left open ends with its line, as does a trailing backslash.
+_COMMENTS_AND_LITERALS = re.compile(
+    rf'//[^{_LINE_BREAK_CHARS}]*|/\*.*?(?:\*/|\Z)'
+    rf'|"(?:\\[^{_LINE_BREAK_CHARS}]|[^"\\{_LINE_BREAK_CHARS}])*"?'
+    rf"|'(?:\\[^{_LINE_BREAK_CHARS}]|[^'\\{_LINE_BREAK_CHARS}])*'?", re.S)
+# Replaces comment text on every line a comment touches; the character
+# itself counts as code, so occurrences in the text are swapped for another
+_COMMENT_MARK = '\0'
+_MARK_STANDIN = '\1'
+
+def _mark_comment(match: re.Match) -> str:
+    token = match.group(0)
+    if token[0] != '/':
+        # String and char literals are code
+        return token
+    marked = _COMMENT_MARK + ''.join(line_break + _COMMENT_MARK for line_break in _LINE_BREAK.findall(token))
+    # A comment left open at the end of the file may end with a line break
+    return marked[:-1] if token[-1] in _LINE_BREAK_CHARS else marked
+
+def count_lines(text: str) -> Dict[str, int]:
+    """
+    Count physical, blank, comment and code lines.
+    A line with any code outside comments counts as code; string and char
+    literals are skipped so '//' or '/*' inside them is not a comment.
+    Lines are split as str.splitlines splits them; a blank line inside a
+    block comment counts as comment. String and char literals end at their
+    closing quote or at the end of the line, and text blocks are read as
+    ordinary literals. Comments are replaced by a marker on each line they
+    touch, so lines are classified with string operations rather than a
+    per-character scan.
+    """
+    counts = {'lines': 0, 'blank': 0, 'comment': 0, 'code': 0}
+    if _COMMENT_MARK in text:
+        text = text.replace(_COMMENT_MARK, _MARK_STANDIN)
+    marked = _COMMENTS_AND_LITERALS.sub(_mark_comment, text) if '/' in text else text
+
+    for line in marked.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            counts['blank'] += 1
+        elif _COMMENT_MARK not in stripped or stripped.replace(_COMMENT_MARK, '').strip():
+            counts['code'] += 1
+        else:
+            counts['comment'] += 1
+    counts['lines'] = counts['blank'] + counts['comment'] + counts['code']
+
+    return counts
+
+def manifest_entry(path: str, raw_size: int, text: str) -> Dict[str, Any]:
+    """
+    Metrics for one ingested file, computed while its bytes are at hand
+    """
+    entry = {
+        'path': path,
+        'name': os.path.basename(path),
+        'directory': os.path.dirname(path),
+        'size_bytes': raw_size,
+        'type_kinds': []
+    }
+    entry.update(count_lines(text))
+    return entry
+
+def apply_parse_results(manifest: Dict[str, Dict[str, Any]], parsed_data) -> Dict[str, Dict[str, Any]]:
+    """
+    Record the declared type kinds from the parse on each manifest entry
+    """
+    for path, entry in manifest.items():
+        file_data = parsed_data.get(path)
+        entry['type_kinds'] = list(file_data.get('type_kinds', [])) if file_data is not None else []
+        entry['parsed'] = file_data is not None
+    return manifest
+
+def type_label(entry: Dict[str, Any]) -> str:
+    if not entry.get('parsed', True):
+        return 'Unparsed'
+    kinds = list(dict.fromkeys(entry['type_kinds']))
+    if not kinds:
+        return 'Java Source'
+    return ', '.join(TYPE_LABELS.get(kind, kind) for kind in kinds)
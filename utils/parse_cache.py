@@ -0,0 +1,217 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Iterable, Optional
+from utils.reporting import logger
+
+# Default cache size limit (bytes of compressed entries)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+# Access times of hits are written back in batches of this many keys
+_TOUCH_BATCH = 5000
+# Seconds to wait for another process holding the cache locked
+_BUSY_TIMEOUT = 5.0
+
+def default_cache_path() -> str:
+    """
+    Location of the shared parse cache, overridable with JAVA_ANALYZER_CACHE_DIR
+    """
+    cache_dir = os.environ.get('JAVA_ANALYZER_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'java_analyzer')
+    return os.path.join(cache_dir, 'parse_cache.sqlite')
+
+def content_key(content: str, parser_version: str) -> str:
+    """
+    Content-addressed cache key for a source file
+    """
+    digest = hashlib.sha256()
+    digest.update(parser_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content.encode('utf-8', errors='surrogatepass'))
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Persistent cache of per-file parse results.
+
+    Entries are zlib-compressed JSON rows in a single SQLite file, keyed by
+    content hash. When the stored size exceeds max_bytes the least recently
+    used entries are evicted.
+
+    The cache is shared by every CLI run and app session, so SQLite errors
+    (a locked or corrupt file) never fail an analysis: lookups count as
+    misses and writes are skipped.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Hits whose last_access has not been written yet
+        self._touched = {}
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)')
+        self._conn.commit()
+        # Running estimate of the stored size; other processes sharing the
+        # file are accounted for when it is recounted before evicting
+        self._size = self._stored_size()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys at once and return the entries that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            try:
+                for i in range(0, len(keys), _LOOKUP_BATCH):
+                    batch = keys[i:i + _LOOKUP_BATCH]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = self._conn.execute(
+                        f'SELECT key, data FROM entries WHERE key IN ({placeholders})', batch
+                    ).fetchall()
+                    for key, data in rows:
+                        found[key] = json.loads(zlib.decompress(data))
+                        self._touched[key] = now
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched()
+                    self._conn.commit()
+            except (sqlite3.Error, zlib.error, ValueError) as e:
+                logger.warning(f"Parse cache lookup failed, parsing without it: {e}")
+                self._rollback()
+                found = {}
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, Any]):
+        """
+        Store several parse results and evict old entries if over budget
+        """
+        if not entries:
+            return
+        now = time.time()
+        rows = []
+        for key, value in entries.items():
+            data = zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+            rows.append((key, data, len(data), now))
+        with self._lock:
+            try:
+                self._flush_touched()
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO entries (key, data, size, last_access) VALUES (?, ?, ?, ?)', rows
+                )
+                self._size += sum(row[2] for row in rows)
+                if self._size > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Parse cache write skipped: {e}")
+                self._rollback()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                'UPDATE entries SET last_access = ? WHERE key = ?',
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched = {}
+
+    def _rollback(self):
+        self._touched = {}
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _stored_size(self) -> int:
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _evict(self):
+        total = self._size = self._stored_size()
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the budget so eviction does not run on every insert
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute('SELECT key, size FROM entries ORDER BY last_access')
+        doomed = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', doomed)
+        self._size = total
+        self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters and current on-disk usage
+        """
+        with self._lock:
+            count, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': count,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush_touched()
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """
+    Return the process-wide parse cache, or None if it is disabled
+    (JAVA_ANALYZER_CACHE=0) or cannot be opened
+    """
+    global _default_cache
+    if os.environ.get('JAVA_ANALYZER_CACHE', '1') == '0':
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                max_bytes = int(os.environ.get('JAVA_ANALYZER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+                _default_cache = ParseCache(max_bytes=max_bytes)
+                # Write back pending access times
+                atexit.register(_default_cache.close)
+            except (OSError, sqlite3.Error):
+                return None
+    return _default_cache
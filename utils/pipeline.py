@@ -0,0 +1,263 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple
+from utils.encoding import EncodingDetector
+from utils.file_handler import (iter_java_files, iter_local_java_files, collect_java_files,
+                                batch_java_files, get_memory_budget)
+from utils.code_parser import parse_java_files, get_worker_count
+from utils.isolated_parser import ParserPool
+from utils.parse_cache import get_parse_cache
+from utils.relationship_analyzer import analyze_relationships
+from utils.graph_aggregation import get_package_aggregate
+from utils.compact_model import compact_parsed_data, COMPACT_MIN_FILES
+from utils.manifest import apply_parse_results
+from utils.fast_scanner import scan_java_files
+from utils.instrumentation import Profiler
+from utils.spill_store import SpilledParsedData
+from utils.jobs import JobProgress
+
+# Uploads with at least this many files get a header scan first and a full parse on demand
+TIERED_MIN_FILES = 500
+# Uploads of at least this many bytes are analyzed out of core unless JAVA_ANALYZER_OUT_OF_CORE says otherwise
+OUT_OF_CORE_MIN_BYTES = 256 * 1024 * 1024
+# Files decoded and parsed together in out-of-core mode before their source is released
+OUT_OF_CORE_BATCH_FILES = 512
+OUT_OF_CORE_BATCH_BYTES = 32 * 1024 * 1024
+
+def upload_digest(uploaded_files) -> str:
+    """
+    Digest of the names and bytes of all uploaded files
+    """
+    digest = hashlib.sha256()
+    for uploaded_file in uploaded_files:
+        digest.update(uploaded_file.name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(uploaded_file.getbuffer())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def use_out_of_core(size_bytes: int, out_of_core: Optional[bool] = None) -> bool:
+    """
+    Whether to analyze out of core: forced on or off by the argument or by
+    JAVA_ANALYZER_OUT_OF_CORE=1/0, otherwise for inputs of OUT_OF_CORE_MIN_BYTES or more
+    """
+    if out_of_core is not None:
+        return out_of_core
+    setting = os.environ.get('JAVA_ANALYZER_OUT_OF_CORE', '')
+    if setting in ('0', '1'):
+        return setting == '1'
+    return size_bytes >= OUT_OF_CORE_MIN_BYTES
+
+def _track(java_files: Iterator[Tuple[str, str]], progress: Optional[JobProgress]) -> Iterator[Tuple[str, str]]:
+    """
+    Report each file read to the job progress, if any
+    """
+    for filename, content in java_files:
+        if progress is not None:
+            progress.file_done(filename)
+        yield filename, content
+
+def run_pipeline(uploaded_files, encoding: Optional[str] = None, tiered: Optional[bool] = None,
+                 out_of_core: Optional[bool] = None, progress: Optional[JobProgress] = None) -> Dict[str, Any]:
+    """
+    Run ingestion, parsing and relationship analysis over an upload.
+    encoding pins the source charset; by default it is detected per file.
+
+    In tiered mode (the default for uploads of TIERED_MIN_FILES or more) only
+    a token-level header scan runs here and 'detail' is 'header'; call
+    ensure_full_detail before using member-level data.
+
+    In out-of-core mode (see use_out_of_core) source text is released batch
+    by batch as it is parsed, 'processed_files' stays empty and 'parsed_data'
+    is a SpilledParsedData read from disk.
+
+    An upload where no file parses still gets empty relationships and graph.
+
+    Each stage is measured by the Profiler stored under 'performance'. When
+    run as a background job, progress receives each stage and file, the
+    manifest is published as soon as ingestion finishes, and JobCancelled
+    propagates out once the job is cancelled.
+    """
+    profiler = Profiler(listener=progress)
+    try:
+        return _run_pipeline(profiler, uploaded_files, encoding, tiered, out_of_core, progress)
+    finally:
+        # Later stages (view renders, full detail) outlive the job
+        profiler.listener = None
+
+def _run_pipeline(profiler: Profiler, uploaded_files, encoding: Optional[str], tiered: Optional[bool],
+                  out_of_core: Optional[bool], progress: Optional[JobProgress]) -> Dict[str, Any]:
+    detector = EncodingDetector(encoding)
+    manifest = {}
+
+    upload_bytes = sum(uploaded_file.getbuffer().nbytes for uploaded_file in uploaded_files)
+    if use_out_of_core(upload_bytes, out_of_core):
+        analysis = _new_analysis({}, manifest, detector, profiler)
+        parsed_data = _streamed_parse(analysis, detector, iter_java_files(
+            uploaded_files, detector=detector, manifest=manifest), progress=progress)
+        _analyze(analysis, parsed_data, 'full')
+        return analysis
+
+    budget = get_memory_budget()
+    java_files = iter_java_files(uploaded_files, budget, detector, manifest)
+    processed_files = _ingest(profiler, detector, lambda: collect_java_files(_track(java_files, progress), budget))
+    if progress is not None:
+        progress.publish('manifest', manifest)
+    analysis = _new_analysis(processed_files, manifest, detector, profiler)
+
+    if tiered is None:
+        tiered = len(processed_files) >= TIERED_MIN_FILES
+
+    if tiered:
+        _analyze(analysis, _header_scan(analysis), 'header')
+    else:
+        _analyze(analysis, _full_parse(analysis), 'full')
+    return analysis
+
+def _new_analysis(processed_files: Dict[str, str], manifest: Dict[str, Any], detector: EncodingDetector,
+                  profiler: Profiler) -> Dict[str, Any]:
+    return {
+        'processed_files': processed_files,
+        'manifest': manifest,
+        'parsed_data': {},
+        'relationships': None,
+        'encoding_stats': detector.stats,
+        'parse_failures': [],
+        'performance': profiler,
+        'out_of_core': False,
+        'detail': 'full'
+    }
+
+def _ingest(profiler: Profiler, detector: EncodingDetector, collect) -> Dict[str, str]:
+    with profiler.stage('ingest') as record:
+        processed_files = collect()
+        record['items'] = len(processed_files)
+    profiler.add('encoding detection', detector.stats['detection_seconds'],
+                 items=detector.stats['detected'], parent='ingest')
+    return processed_files
+
+def _header_scan(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    with analysis['performance'].stage('header scan', items=len(analysis['processed_files'])):
+        return scan_java_files(analysis['processed_files'], on_file=analysis['performance'].record_file)
+
+def _full_parse(analysis: Dict[str, Any], max_workers: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+    profiler = analysis['performance']
+    failures = []
+    with profiler.stage('parse', items=len(analysis['processed_files'])):
+        parsed_data = parse_java_files(analysis['processed_files'], max_workers=max_workers,
+                                       cache=get_parse_cache() if use_cache else None,
+                                       failures=failures, on_file=profiler.record_file,
+                                       compact_min_files=COMPACT_MIN_FILES)
+    analysis['parse_failures'] = failures
+    return parsed_data
+
+def _streamed_parse(analysis: Dict[str, Any], detector: EncodingDetector, java_files,
+                    max_workers: Optional[int] = None, use_cache: bool = True,
+                    progress: Optional[JobProgress] = None) -> SpilledParsedData:
+    """
+    Decode and parse files one batch at a time, spilling each batch's results
+    to disk before the next batch is read. progress receives a snapshot of
+    the manifest after each batch. One set of parser processes serves every
+    batch.
+    """
+    profiler = analysis['performance']
+    budget = get_memory_budget()
+    batch_bytes = min(budget, OUT_OF_CORE_BATCH_BYTES) if budget else OUT_OF_CORE_BATCH_BYTES
+    parsed_data = SpilledParsedData()
+    failures = []
+    with profiler.stage('ingest and parse') as record, ParserPool(get_worker_count(max_workers)) as pool:
+        for batch in batch_java_files(java_files, OUT_OF_CORE_BATCH_FILES, batch_bytes):
+            parsed_data.put_many(parse_java_files(batch, max_workers=max_workers,
+                                                  cache=get_parse_cache() if use_cache else None,
+                                                  failures=failures, on_file=profiler.record_file,
+                                                  pool=pool))
+            if progress is not None:
+                progress.publish('manifest', dict(analysis['manifest']))
+        record['items'] = len(parsed_data)
+    profiler.add('encoding detection', detector.stats['detection_seconds'],
+                 items=detector.stats['detected'], parent='ingest and parse')
+    analysis['parse_failures'] = failures
+    analysis['out_of_core'] = True
+    return parsed_data
+
+def _analyze(analysis: Dict[str, Any], parsed_data: Dict[str, Any], detail: str, aggregate: bool = True):
+    profiler = analysis['performance']
+    with profiler.stage('compact model', items=len(parsed_data)):
+        # Large full parses arrive compact already; spilled results stay on
+        # disk, as compacting them would load them all
+        if not isinstance(parsed_data, SpilledParsedData):
+            parsed_data = compact_parsed_data(parsed_data)
+        apply_parse_results(analysis['manifest'], parsed_data)
+    with profiler.stage('relationships', items=len(parsed_data)) as record:
+        relationships = analyze_relationships(parsed_data)
+        record['items'] = relationships['graph'].number_of_edges()
+    if aggregate:
+        with profiler.stage('package aggregate'):
+            get_package_aggregate(relationships)
+
+    analysis['parsed_data'] = parsed_data
+    analysis['relationships'] = relationships
+    analysis['detail'] = detail
+
+# Guards creating the per-analysis locks of ensure_full_detail
+_upgrade_locks_lock = threading.Lock()
+
+def ensure_full_detail(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace header-level scan results with a full AST parse, in place.
+    Memoized view results are dropped since they were built from headers.
+
+    An analysis shared between sessions is upgraded once: concurrent callers
+    wait for the first one and then find the full results, which are
+    swapped in together.
+    """
+    if analysis.get('detail') != 'header':
+        return analysis
+    with _upgrade_locks_lock:
+        lock = analysis.setdefault('upgrade_lock', threading.Lock())
+    with lock:
+        if analysis['detail'] == 'header':
+            upgraded = dict(analysis)
+            _analyze(upgraded, _full_parse(upgraded), 'full')
+            if 'views' in upgraded:
+                upgraded['views'] = {}
+            analysis.update(upgraded)
+    return analysis
+
+def analyze_path(path: str, encoding: Optional[str] = None, max_workers: Optional[int] = None,
+                 use_cache: bool = True, detail: str = 'full', out_of_core: bool = False) -> Dict[str, Any]:
+    """
+    Run the pipeline over a directory, ZIP archive or Java file on disk and
+    record the wall time of each stage. detail='header' replaces the full
+    parse with the token-level header scan; out_of_core streams sources
+    through the parser in batches and keeps results on disk.
+    """
+    profiler = Profiler()
+    start = time.perf_counter()
+
+    detector = EncodingDetector(encoding)
+    manifest = {}
+    java_files = iter_local_java_files(path, detector=detector, manifest=manifest)
+
+    if out_of_core and detail == 'full':
+        analysis = _new_analysis({}, manifest, detector, profiler)
+        parsed_data = _streamed_parse(analysis, detector, java_files, max_workers, use_cache)
+    else:
+        processed_files = _ingest(profiler, detector, lambda: collect_java_files(java_files))
+        analysis = _new_analysis(processed_files, manifest, detector, profiler)
+        if detail == 'header':
+            parsed_data = _header_scan(analysis)
+        else:
+            parsed_data = _full_parse(analysis, max_workers, use_cache)
+    _analyze(analysis, parsed_data, detail, aggregate=False)
+
+    analysis['timings'] = {
+        'ingest': profiler.total('ingest'),
+        'parse': (profiler.total('header scan' if detail == 'header' else 'parse')
+                  + profiler.total('ingest and parse') + profiler.total('compact model')),
+        'relationships': profiler.total('relationships'),
+        'total': time.perf_counter() - start
+    }
+    return analysis
@@ -1,59 +1,105 @@
 import networkx as nx
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from utils.compact_model import ClassLinks, class_links, iter_class_links
+from utils.symbol_table import SymbolTable, FileScope, qualified_name, imported_type
 
-def analyze_relationships(parsed_data: Dict[str, Any]) -> Dict:
+PRIMITIVE_TYPES = ['String', 'int', 'long', 'boolean', 'double', 'float']
+
+def analyze_file_relationships(file_data: Dict[str, Any], symbols: SymbolTable) -> Dict[str, List]:
+    """
+    Collect the relationships contributed by a single parsed file.
+    Class and type names are resolved to fully-qualified names through the
+    symbol table; 'references' lists the simple names that were looked up.
+    """
+    return _class_relationships(file_data.get('package'), file_data['imports'],
+                                [class_links(class_info) for class_info in file_data['classes']], symbols)
+
+def _class_relationships(package: Optional[str], imports: List[str], classes: List[ClassLinks],
+                         symbols: SymbolTable) -> Dict[str, List]:
+    contribution = {
+        'inheritance': [],
+        'implementation': [],
+        'associations': [],
+        'dependencies': [],
+        'edges': [],
+        'references': set()
+    }
+    scope = FileScope(package, imports)
+    imported_types = [imported for imported in map(imported_type, imports) if imported]
+
+    def resolve(name):
+        contribution['references'].add(name.rsplit('.', 1)[-1])
+        return symbols.resolve(name, scope)
+
+    # Analyze class inheritance and implementation
+    for name, extends, implements, fields, api_param_types in classes:
+        class_name = qualified_name(package, name)
+
+        # Add inheritance relationships
+        if extends:
+            parent = resolve(extends)
+            contribution['inheritance'].append({
+                'from': class_name,
+                'to': parent
+            })
+            contribution['edges'].append((class_name, parent, 'inheritance'))
+
+        # Add implementation relationships
+        for interface in implements:
+            interface = resolve(interface)
+            contribution['implementation'].append({
+                'from': class_name,
+                'to': interface
+            })
+            contribution['edges'].append((class_name, interface, 'implementation'))
+
+        # Analyze field types for associations
+        for field in fields:
+            contribution['associations'].append({
+                'from': class_name,
+                'field': field
+            })
+
+        # Add dependencies based on imports
+        for imported in imported_types:
+            contribution['dependencies'].append((class_name, imported))
+
+        # Add API dependencies
+        for param_type in api_param_types:
+            if param_type not in PRIMITIVE_TYPES:
+                contribution['dependencies'].append((class_name, resolve(param_type)))
+
+    return contribution
+
+def analyze_relationships(parsed_data: Dict[str, Any], symbols: Optional[SymbolTable] = None) -> Dict:
     """
-    Analyze relationships between classes including API dependencies
+    Analyze relationships between classes including API dependencies.
+    Relationships and graph nodes are keyed by fully-qualified name.
     """
+    if symbols is None:
+        symbols = SymbolTable.build(parsed_data)
+
     relationships = {
         'inheritance': [],
         'implementation': [],
         'associations': [],
         'dependencies': set(),
-        'parsed_data': parsed_data  # Include parsed data for API information
+        'parsed_data': parsed_data,  # Include parsed data for API information
+        'symbol_table': symbols
     }
 
     # Create a graph for class relationships
     graph = nx.DiGraph()
 
-    for filename, file_data in parsed_data.items():
-        # Analyze class inheritance and implementation
-        for class_info in file_data['classes']:
-            class_name = class_info['name']
-
-            # Add inheritance relationships
-            if class_info['extends']:
-                relationships['inheritance'].append({
-                    'from': class_name,
-                    'to': class_info['extends']
-                })
-                graph.add_edge(class_name, class_info['extends'], type='inheritance')
-
-            # Add implementation relationships
-            for interface in class_info['implements']:
-                relationships['implementation'].append({
-                    'from': class_name,
-                    'to': interface
-                })
-                graph.add_edge(class_name, interface, type='implementation')
-
-            # Analyze field types for associations
-            for field in class_info['fields']:
-                relationships['associations'].append({
-                    'from': class_name,
-                    'field': field
-                })
-
-            # Add dependencies based on imports
-            for imp in file_data['imports']:
-                relationships['dependencies'].add((class_name, imp.split('.')[-1]))
-
-            # Add API dependencies
-            for api_method in class_info.get('api_methods', []):
-                for param in api_method['parameters']:
-                    param_type = param['type']
-                    if param_type not in ['String', 'int', 'long', 'boolean', 'double', 'float']:
-                        relationships['dependencies'].add((class_name, param_type))
+    # Compact parsed data is scanned table by table rather than through its views
+    for package, imports, classes in iter_class_links(parsed_data):
+        contribution = _class_relationships(package, imports, classes, symbols)
+        relationships['inheritance'].extend(contribution['inheritance'])
+        relationships['implementation'].extend(contribution['implementation'])
+        relationships['associations'].extend(contribution['associations'])
+        relationships['dependencies'].update(contribution['dependencies'])
+        for source, target, edge_type in contribution['edges']:
+            graph.add_edge(source, target, type=edge_type)
 
     relationships['graph'] = graph
-    return relationships
\ No newline at end of file
+    return relationships
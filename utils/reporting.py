@@ -0,0 +1,20 @@
+import logging
+import sys
+
+logger = logging.getLogger('java_analyzer')
+
+def warn(message: str):
+    """
+    Show a warning in the Streamlit page when called from the app's script
+    thread, otherwise log it (including from background analysis jobs).
+    Never imports streamlit itself so headless callers stay free of it.
+    """
+    st = sys.modules.get('streamlit')
+    if st is not None and st.runtime.exists() and _in_script_thread():
+        st.warning(message)
+    else:
+        logger.warning(message)
+
+def _in_script_thread() -> bool:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import weakref
+import zlib
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+# Rows fetched from disk per query when iterating
+SPILL_READ_BATCH = 256
+
+def _remove(conn: sqlite3.Connection, path: str):
+    conn.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class _SpilledItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_rows()
+
+class _SpilledValues(ValuesView):
+    def __iter__(self):
+        return (file_data for _, file_data in self._mapping.iter_rows())
+
+class SpilledParsedData(Mapping):
+    """
+    Read-only mapping of filename to parse result, kept in a temporary
+    SQLite file instead of memory. Iteration reads SPILL_READ_BATCH rows at a
+    time, so only one batch of decoded results is alive at once. The file is
+    deleted when the mapping is closed or garbage collected.
+    """
+
+    def __init__(self, directory: Optional[str] = None, batch_size: int = SPILL_READ_BATCH):
+        directory = directory or os.environ.get('JAVA_ANALYZER_SPILL_DIR') or None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix='java_analyzer_', suffix='.sqlite', dir=directory)
+        os.close(fd)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._count = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Scratch data: durability is not needed
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute(
+            'CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, data BLOB NOT NULL)')
+        self._finalizer = weakref.finalize(self, _remove, self._conn, self.path)
+
+    def put_many(self, parsed_data: Dict[str, Any]):
+        """
+        Append parse results; files already present are replaced
+        """
+        # Fast compression: the data is read back once or twice per view
+        rows = [(filename, zlib.compress(json.dumps(file_data, separators=(',', ':')).encode('utf-8'), 1))
+                for filename, file_data in parsed_data.items()]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO files (path, data) VALUES (?, ?)', rows)
+            self._conn.commit()
+            self._count = self._conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def __getitem__(self, filename: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM files WHERE path = ?', (filename,)).fetchone()
+        if row is None:
+            raise KeyError(filename)
+        return json.loads(zlib.decompress(row[0]))
+
+    def __contains__(self, filename) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM files WHERE path = ?', (filename,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for rows in self._batches('path'):
+            for _, path in rows:
+                yield path
+
+    def __len__(self) -> int:
+        return self._count
+
+    def iter_rows(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (filename, parse result) in insertion order, one batch in memory at a time
+        """
+        for rows in self._batches('path, data'):
+            for _, path, data in rows:
+                yield path, json.loads(zlib.decompress(data))
+
+    def _batches(self, columns: str):
+        # Keyset pagination: no cursor stays open between batches
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT id, {columns} FROM files WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, self.batch_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    def items(self):
+        return _SpilledItems(self)
+
+    def values(self):
+        return _SpilledValues(self)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM files').fetchone()[0]
+
+    def close(self):
+        self._finalizer()
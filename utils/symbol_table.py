@@ -0,0 +1,127 @@
+from typing import Dict, Any, List, Optional, Set
+from utils.compact_model import iter_declarations
+
+def qualified_name(package: Optional[str], name: str) -> str:
+    """
+    Fully-qualified name of a type declared in a package
+    """
+    return f"{package}.{name}" if package else name
+
+STATIC_IMPORT = 'static '
+
+def imported_type(imp: str) -> Optional[str]:
+    """
+    Type an import makes the file depend on: the imported type itself, or
+    the type whose members a static import brings in. Wildcard imports of a
+    package name no particular type and give None.
+    """
+    if imp.startswith(STATIC_IMPORT):
+        imp = imp[len(STATIC_IMPORT):]
+        return imp[:-2] if imp.endswith('.*') else imp.rpartition('.')[0] or None
+    if imp.endswith('.*'):
+        return None
+    return imp
+
+class FileScope:
+    """
+    Name-resolution scope of one source file: its package plus its explicit
+    and wildcard imports, indexed for constant-time lookups. Static imports
+    bring in members rather than types and are left out.
+    """
+
+    def __init__(self, package: Optional[str], imports: List[str]):
+        self.package = package
+        self.explicit = {}
+        self.wildcards = []
+        for imp in imports:
+            if imp.startswith(STATIC_IMPORT):
+                continue
+            if imp.endswith('.*'):
+                self.wildcards.append(imp[:-2])
+            else:
+                self.explicit[imp.rsplit('.', 1)[-1]] = imp
+
+class SymbolTable:
+    """
+    Project-wide index of type declarations by fully-qualified name.
+
+    Simple names are resolved the way javac does for top-level types:
+    explicit imports, then the file's own package, then wildcard imports.
+    Names that do not resolve to a project type are returned as imported
+    (e.g. java.util.List) or unchanged when nothing matches.
+    """
+
+    def __init__(self):
+        self.declarations: Dict[str, Dict[str, Any]] = {}
+        self.packages: Dict[Optional[str], Dict[str, str]] = {}
+
+    @classmethod
+    def build(cls, parsed_data: Dict[str, Any]) -> 'SymbolTable':
+        table = cls()
+        for declaration in iter_declarations(parsed_data):
+            table.add_declaration(*declaration)
+        return table
+
+    def add_file(self, filename: str, file_data: Dict[str, Any]):
+        package = file_data.get('package')
+        self.packages.setdefault(package, {})
+        for kind, key in (('class', 'classes'), ('interface', 'interfaces')):
+            for declaration in file_data.get(key, []):
+                self.add_declaration(filename, package, kind, declaration['name'])
+
+    def add_declaration(self, filename: str, package: Optional[str], kind: str, name: str):
+        fqn = qualified_name(package, name)
+        self.declarations[fqn] = {
+            'fqn': fqn,
+            'name': name,
+            'package': package,
+            'kind': kind,
+            'file': filename
+        }
+        self.packages.setdefault(package, {})[name] = fqn
+
+    def remove_file(self, filename: str, file_data: Dict[str, Any]):
+        package = file_data.get('package')
+        members = self.packages.get(package, {})
+        for key in ('classes', 'interfaces'):
+            for declaration in file_data.get(key, []):
+                fqn = qualified_name(package, declaration['name'])
+                # Another file may have redeclared the same name since
+                if self.declarations.get(fqn, {}).get('file') == filename:
+                    del self.declarations[fqn]
+                    members.pop(declaration['name'], None)
+        if not members:
+            self.packages.pop(package, None)
+
+    def declared_fqns(self, file_data: Dict[str, Any]) -> Set[str]:
+        """
+        Fully-qualified names declared by a parsed file
+        """
+        package = file_data.get('package')
+        return {qualified_name(package, d['name'])
+                for key in ('classes', 'interfaces') for d in file_data.get(key, [])}
+
+    def lookup(self, fqn: str) -> Optional[Dict[str, Any]]:
+        return self.declarations.get(fqn)
+
+    def resolve(self, name: str, scope: FileScope) -> str:
+        """
+        Resolve a type name as written in a file to a fully-qualified name
+        """
+        if name in self.declarations and '.' in name:
+            return name
+
+        explicit = scope.explicit.get(name)
+        if explicit is not None:
+            return explicit
+
+        fqn = self.packages.get(scope.package, {}).get(name)
+        if fqn is not None:
+            return fqn
+
+        for package in scope.wildcards:
+            fqn = self.packages.get(package, {}).get(name)
+            if fqn is not None:
+                return fqn
+
+        return name
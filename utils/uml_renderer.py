@@ -0,0 +1,209 @@
+import atexit
+import hashlib
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+import plantuml
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_SERVER_URL = 'https://www.plantuml.com/plantuml/svg/'
+_PIPE_DELIMITER = '__JAVA_ANALYZER_END__'
+
+def uml_digest(uml_source: str) -> str:
+    return hashlib.sha256(uml_source.encode('utf-8')).hexdigest()
+
+def find_plantuml_command() -> Optional[List[str]]:
+    """
+    Command that starts a local PlantUML, from JAVA_ANALYZER_PLANTUML
+    (e.g. "java -jar /opt/plantuml.jar") or a plantuml executable on PATH
+    """
+    configured = os.environ.get('JAVA_ANALYZER_PLANTUML')
+    if configured:
+        return shlex.split(configured)
+    executable = shutil.which('plantuml')
+    return [executable] if executable else None
+
+def find_server_url() -> Optional[str]:
+    """
+    PlantUML server opted into with JAVA_ANALYZER_PLANTUML_SERVER: "1" for the
+    public server, otherwise the server's URL. Diagrams contain class and
+    package names, so none is used by default.
+    """
+    configured = os.environ.get('JAVA_ANALYZER_PLANTUML_SERVER', '').strip()
+    if configured in ('', '0'):
+        return None
+    return DEFAULT_SERVER_URL if configured == '1' else configured
+
+class SvgCache:
+    """
+    Thread-safe LRU cache of rendered SVGs bounded by total size
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            svg = self._entries.get(key)
+            if svg is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return svg
+
+    def put(self, key: str, svg: bytes):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = svg
+            self.size += len(svg)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+class PlantUmlProcess:
+    """
+    Long-lived PlantUML process in pipe mode, so the JVM starts only once.
+    Diagrams are written to stdin and each SVG is read back up to a delimiter.
+    """
+
+    def __init__(self, command: List[str]):
+        self.command = command + ['-tsvg', '-pipe', '-pipedelimitor', _PIPE_DELIMITER]
+        self._process = None
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def render(self, uml_source: str) -> bytes:
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        try:
+            self._process.stdin.write(uml_source.encode('utf-8') + b'\n')
+            self._process.stdin.flush()
+            lines = []
+            while True:
+                line = self._process.stdout.readline()
+                if not line:
+                    raise RuntimeError("PlantUML process exited while rendering")
+                if line.strip() == _PIPE_DELIMITER.encode('ascii'):
+                    break
+                lines.append(line)
+        except (OSError, RuntimeError):
+            self.close()
+            raise
+        return b''.join(lines)
+
+    def close(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+class UmlRenderer:
+    """
+    Render PlantUML sources to SVG with a bounded cache keyed by source hash.
+
+    Uncached diagrams are rendered concurrently by a pool of long-lived local
+    PlantUML processes, or through a PlantUML server when no local
+    installation is available and one has been opted into. Without either,
+    available is False and rendering raises RuntimeError.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 command: Optional[List[str]] = None, server_url: Optional[str] = None):
+        if pool_size is None:
+            pool_size = int(os.environ.get('JAVA_ANALYZER_PLANTUML_PROCESSES', 0)) or min(4, os.cpu_count() or 1)
+        self.pool_size = max(1, pool_size)
+        self.cache = SvgCache(cache_bytes)
+        self.command = command if command is not None else find_plantuml_command()
+        self.server_url = server_url or find_server_url()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='plantuml')
+        self._processes = queue.Queue()
+        if self.command:
+            for _ in range(self.pool_size):
+                self._processes.put(PlantUmlProcess(self.command))
+
+    @property
+    def available(self) -> bool:
+        return bool(self.command or self.server_url)
+
+    def _render_uncached(self, uml_source: str) -> bytes:
+        if not self.command:
+            if not self.server_url:
+                raise RuntimeError("no local PlantUML and no PlantUML server configured")
+            return plantuml.PlantUML(url=self.server_url).processes(uml_source)
+
+        process = self._processes.get()
+        try:
+            return process.render(uml_source)
+        finally:
+            self._processes.put(process)
+
+    def _render_and_store(self, key: str, uml_source: str) -> bytes:
+        svg = self._render_uncached(uml_source)
+        self.cache.put(key, svg)
+        return svg
+
+    def render(self, uml_source: str) -> bytes:
+        key = uml_digest(uml_source)
+        svg = self.cache.get(key)
+        if svg is None:
+            svg = self._render_and_store(key, uml_source)
+        return svg
+
+    def render_many(self, sources: List[str]) -> Iterator[Tuple[int, Optional[bytes], Optional[str]]]:
+        """
+        Render several diagrams, yielding (index, svg, error) as each finishes.
+        Cached diagrams are yielded first without touching the pool.
+        """
+        pending = {}
+        for index, uml_source in enumerate(sources):
+            key = uml_digest(uml_source)
+            svg = self.cache.get(key)
+            if svg is not None:
+                yield index, svg, None
+            else:
+                pending[self._executor.submit(self._render_and_store, key, uml_source)] = index
+
+        for future in as_completed(pending):
+            try:
+                yield pending[future], future.result(), None
+            except Exception as e:
+                yield pending[future], None, str(e)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        while not self._processes.empty():
+            self._processes.get().close()
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+def get_uml_renderer() -> UmlRenderer:
+    """
+    Process-wide renderer shared by all sessions
+    """
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            _default_renderer = UmlRenderer()
+            atexit.register(_default_renderer.close)
+    return _default_renderer
@@ -0,0 +1,13 @@
+from typing import Any, Callable, Dict, Optional
+
+def memoize(cache: Optional[Dict[str, Any]], key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Return cache[key], computing it on first use. The cache is a plain dict
+    owned by one analysis, so results live exactly as long as the analysis.
+    Passing None disables memoization.
+    """
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
@@ -1,6 +1,137 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import plotly.graph_objects as go
 import networkx as nx
-from typing import Dict
+from typing import Dict, Tuple
+from utils.instrumentation import stage
+
+# Above this many nodes the vectorized layout replaces nx.spring_layout
+LARGE_GRAPH_NODES = 300
+# Above this many nodes or edges traces are drawn with WebGL and labels move to hover text
+WEBGL_THRESHOLD = 1000
+# Wall-clock budget for the large-graph layout, in seconds
+LAYOUT_TIME_BUDGET = 3.0
+_LAYOUT_CACHE_SIZE = 16
+# Repulsion is computed for this many nodes at a time to bound temporary arrays
+_REPULSION_CHUNK = 4096
+# Shared by all sessions, whose script runs execute on separate threads
+_layout_cache = OrderedDict()
+_layout_cache_lock = threading.Lock()
+
+def graph_digest(graph: nx.DiGraph) -> str:
+    """
+    Digest of a graph's nodes and edges, used to reuse layouts across reruns
+    """
+    digest = hashlib.sha256()
+    for node in sorted(map(str, graph.nodes())):
+        digest.update(node.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(b'\1')
+    for source, target in sorted((str(u), str(v)) for u, v in graph.edges()):
+        digest.update(f"{source}\0{target}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+def grid_force_layout(graph: nx.DiGraph, time_budget: float = LAYOUT_TIME_BUDGET,
+                      max_iterations: int = 200, seed: int = 42) -> Dict:
+    """
+    Vectorized force-directed layout for large graphs.
+
+    Attraction runs over the edge arrays; repulsion is approximated by
+    bucketing nodes into a grid and repelling each node from the cell
+    centroids, which costs O(nodes x cells) per iteration instead of
+    O(nodes^2). Iteration stops early once the time budget is used.
+    """
+    nodes = list(graph.nodes())
+    count = len(nodes)
+    if count == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1.0, 1.0, size=(count, 2))
+    k = 2.0 / np.sqrt(count)
+    grid = min(24, max(4, int(np.sqrt(count) / 2)))
+    temperature = 0.1
+    cooling = temperature / (max_iterations + 1)
+    deadline = time.perf_counter() + time_budget
+
+    for _ in range(max_iterations):
+        if time.perf_counter() > deadline:
+            break
+
+        # Repulsion from grid cell centroids
+        low = pos.min(axis=0)
+        span = np.maximum(pos.max(axis=0) - low, 1e-9)
+        cells = np.minimum(((pos - low) / span * grid).astype(np.int64), grid - 1)
+        cell_ids = cells[:, 0] * grid + cells[:, 1]
+        mass = np.bincount(cell_ids, minlength=grid * grid).astype(float)
+        occupied = mass > 0
+        centroid_x = np.bincount(cell_ids, weights=pos[:, 0], minlength=grid * grid)[occupied] / mass[occupied]
+        centroid_y = np.bincount(cell_ids, weights=pos[:, 1], minlength=grid * grid)[occupied] / mass[occupied]
+        centroids = np.stack([centroid_x, centroid_y], axis=1)[None, :, :]
+        weights = k * k * mass[occupied]
+        displacement = np.empty_like(pos)
+        for start in range(0, count, _REPULSION_CHUNK):
+            delta = pos[start:start + _REPULSION_CHUNK, None, :] - centroids
+            distance_sq = np.maximum((delta ** 2).sum(axis=2), 1e-4)
+            displacement[start:start + _REPULSION_CHUNK] = (delta * (weights / distance_sq)[:, :, None]).sum(axis=1)
+
+        # Attraction along edges
+        if len(edges):
+            edge_delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            edge_distance = np.maximum(np.sqrt((edge_delta ** 2).sum(axis=1)), 1e-9)
+            force = edge_delta * (edge_distance / k)[:, None]
+            np.add.at(displacement, edges[:, 0], -force)
+            np.add.at(displacement, edges[:, 1], force)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature = max(temperature - cooling, 1e-3)
+
+    # Rescale into [-1, 1] like nx.spring_layout
+    pos -= pos.mean(axis=0)
+    scale = np.abs(pos).max() or 1.0
+    pos /= scale
+    return {node: pos[i] for i, node in enumerate(nodes)}
+
+def compute_layout(graph: nx.DiGraph) -> Dict:
+    """
+    Node positions for a graph, cached per graph digest
+    """
+    key = graph_digest(graph)
+    with _layout_cache_lock:
+        pos = _layout_cache.get(key)
+        if pos is not None:
+            _layout_cache.move_to_end(key)
+            return pos
+
+    # Computed outside the lock so other sessions are not held up meanwhile
+    with stage('layout', items=graph.number_of_nodes()):
+        if graph.number_of_nodes() > LARGE_GRAPH_NODES:
+            pos = grid_force_layout(graph)
+        else:
+            pos = nx.spring_layout(graph, seed=42)
+
+    with _layout_cache_lock:
+        _layout_cache[key] = pos
+        _layout_cache.move_to_end(key)
+        while len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return pos
+
+def _edge_coordinates(graph: nx.DiGraph, pos: Dict) -> Tuple[list, list]:
+    # All edges in one trace, separated by None gaps
+    edge_x, edge_y = [], []
+    for source, target in graph.edges():
+        x0, y0 = pos[source]
+        x1, y1 = pos[target]
+        edge_x.extend((float(x0), float(x1), None))
+        edge_y.extend((float(y0), float(y1), None))
+    return edge_x, edge_y
 
 def create_relationship_graph(relationships: Dict) -> go.Figure:
     """
@@ -9,40 +140,38 @@ def create_relationship_graph(relationships: Dict) -> go.Figure:
     graph = relationships['graph']
     
     # Create layout
-    pos = nx.spring_layout(graph)
-    
-    # Create edge traces
-    edge_traces = []
-    for edge in graph.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        
-        edge_trace = go.Scatter(
-            x=[x0, x1],
-            y=[y0, y1],
-            line=dict(width=0.5, color='#888'),
-            hoverinfo='none',
-            mode='lines'
-        )
-        edge_traces.append(edge_trace)
+    pos = compute_layout(graph)
+    large = graph.number_of_nodes() > WEBGL_THRESHOLD or graph.number_of_edges() > WEBGL_THRESHOLD
+    scatter = go.Scattergl if large else go.Scatter
+
+    # Create a single trace for all edges
+    edge_x, edge_y = _edge_coordinates(graph, pos)
+    edge_trace = scatter(
+        x=edge_x,
+        y=edge_y,
+        line=dict(width=0.5, color='#888'),
+        hoverinfo='none',
+        mode='lines'
+    )
     
-    # Create node trace
-    node_trace = go.Scatter(
-        x=[pos[node][0] for node in graph.nodes()],
-        y=[pos[node][1] for node in graph.nodes()],
-        mode='markers+text',
+    # Create node trace; large graphs show names on hover only
+    nodes = list(graph.nodes())
+    node_trace = scatter(
+        x=[float(pos[node][0]) for node in nodes],
+        y=[float(pos[node][1]) for node in nodes],
+        mode='markers' if large else 'markers+text',
         hoverinfo='text',
-        text=[node for node in graph.nodes()],
+        text=[graph.nodes[node].get('label', node) for node in nodes],
         textposition='bottom center',
         marker=dict(
-            size=20,
+            size=8 if large else 20,
             color='lightblue',
-            line_width=2
+            line_width=1 if large else 2
         )
     )
     
     # Create figure
-    fig = go.Figure(data=edge_traces + [node_trace],
+    fig = go.Figure(data=[edge_trace, node_trace],
                    layout=go.Layout(
                        showlegend=False,
                        hovermode='closest',